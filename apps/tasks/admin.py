@@ -1,10 +1,15 @@
 from django.contrib import admin
+from django.db.models import Q
 from .models import Task
+from .repository import TaskRepository
+from .search import TaskSearchIndex
+from .utils import get_request_now
 
 @admin.register(Task)
 class TaskAdmin(admin.ModelAdmin):
     list_display = ['title', 'user', 'status', 'due_date', 'reactivation_count', 'created_at', 'is_overdue_display']
     list_filter = ['status', 'due_date', 'created_at', 'reactivation_count', 'user']
+    # Shows the search box; get_search_results() serves it from the full-text index
     search_fields = ['title', 'description', 'user__username']
     readonly_fields = ['id', 'created_at', 'reactivation_count']
     date_hierarchy = 'due_date'
@@ -22,10 +27,41 @@ class TaskAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_queryset(self, request):
+        """Annotate the due-date flags once in SQL instead of per row"""
+        return super().get_queryset(request).with_due_info(get_request_now(request))
+    
+    def save_model(self, request, obj, form, change):
+        """Save, then bump the task version of the owner (and of the previous one) so ETags change"""
+        super().save_model(request, obj, form, change)
+        TaskRepository().tasks_changed_elsewhere({obj.user_id, form.initial.get('user')})
+    
+    def delete_model(self, request, obj):
+        """Delete, then bump the owner's task version"""
+        user_id = obj.user_id
+        super().delete_model(request, obj)
+        TaskRepository().tasks_changed_elsewhere([user_id])
+    
+    def delete_queryset(self, request, queryset):
+        """Bulk "delete selected" action"""
+        user_ids = set(queryset.values_list('user_id', flat=True))
+        super().delete_queryset(request, queryset)
+        TaskRepository().tasks_changed_elsewhere(user_ids)
+    
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Match titles and descriptions through the full-text index instead of
+        LIKE scans, plus an exact (indexed) username match
+        """
+        if not search_term.strip():
+            return queryset, False
+        condition = TaskSearchIndex(using=queryset.db).filter_q(search_term) | Q(user__username=search_term.strip())
+        return queryset.filter(condition), False
+    
     def is_overdue_display(self, obj):
         """Display overdue status in admin list"""
         if obj.is_overdue:
             return "🔴 Overdue"
         return "🟢 On Time"
     is_overdue_display.short_description = 'Overdue Status'
-    is_overdue_display.boolean = True
+    is_overdue_display.admin_order_field = 'is_overdue'
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.tasks'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+        from .search import ensure_search_index
+        post_migrate.connect(ensure_search_index, sender=self)
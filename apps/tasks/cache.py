@@ -0,0 +1,118 @@
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from django.conf import settings
+from django.core.cache import caches
+from .constants import STATUS_CACHE_KEY, STATUS_CACHE_TIMEOUT_SECONDS, FRAGMENT_CACHE_KEY, FRAGMENT_CACHE_TIMEOUT_SECONDS
+
+
+class TaskStatusCache:
+    """
+    Per-user cache of the task status counts served to polling clients.
+    Entries are tagged with the user's task version (TaskUserState.version)
+    and only returned while it still matches, so writes made in another
+    process, whose invalidation may not reach this cache (e.g. the sweeper
+    with a per-process LocMem cache), still expire them.
+    """
+
+    def __init__(self, alias: Optional[str] = None, timeout: Optional[int] = None):
+        self.alias = alias or getattr(settings, "TASKS_CACHE_ALIAS", "default")
+        self.timeout = timeout if timeout is not None else getattr(
+            settings, "TASKS_STATUS_CACHE_TIMEOUT", STATUS_CACHE_TIMEOUT_SECONDS
+        )
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    @staticmethod
+    def key(user_id) -> str:
+        return STATUS_CACHE_KEY.format(user_id=user_id)
+
+    def get(self, user_id, version: int) -> Optional[Dict[str, int]]:
+        """Get the cached counts of a user at the given task version, or None on a miss"""
+        return self._counts(self.backend.get(self.key(user_id)), version)
+
+    def set(self, user_id, counts: Dict[str, int], version: int, timeout: Optional[float] = None):
+        """Cache the counts of a user at a task version, never longer than the configured timeout"""
+        self.backend.set(self.key(user_id), (version, counts), self._timeout(timeout))
+
+    async def aget(self, user_id, version: int) -> Optional[Dict[str, int]]:
+        """Async variant of get"""
+        return self._counts(await self.backend.aget(self.key(user_id)), version)
+
+    async def aset(self, user_id, counts: Dict[str, int], version: int, timeout: Optional[float] = None):
+        """Async variant of set"""
+        await self.backend.aset(self.key(user_id), (version, counts), self._timeout(timeout))
+
+    @staticmethod
+    def _counts(entry: Optional[Tuple[int, Dict[str, int]]], version: int) -> Optional[Dict[str, int]]:
+        if entry is None or entry[0] != version:
+            return None
+        return entry[1]
+
+    def _timeout(self, timeout: Optional[float]) -> int:
+        if timeout is None or timeout > self.timeout:
+            timeout = self.timeout
+        return max(1, int(timeout))
+
+    def invalidate(self, *user_ids):
+        """Drop the cached counts of the given users"""
+        self.invalidate_many(user_ids)
+
+    def invalidate_many(self, user_ids: Iterable):
+        """Drop the cached counts of many users at once"""
+        keys = [self.key(user_id) for user_id in set(user_ids)]
+        if keys:
+            self.backend.delete_many(keys)
+
+
+class TaskFragmentCache:
+    """
+    Cache of rendered task cards keyed by task id and version. Every write
+    bumps the version, so stale fragments are never read and simply expire.
+    """
+
+    def __init__(self, alias: Optional[str] = None, timeout: Optional[int] = None):
+        self.alias = alias or getattr(settings, "TASKS_CACHE_ALIAS", "default")
+        self.timeout = timeout if timeout is not None else getattr(
+            settings, "TASKS_FRAGMENT_CACHE_TIMEOUT", FRAGMENT_CACHE_TIMEOUT_SECONDS
+        )
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    @staticmethod
+    def key(template: str, task, variant="") -> str:
+        return FRAGMENT_CACHE_KEY.format(template=template, task_id=task.pk, version=task.version, variant=variant)
+
+    def get_or_render(self, template: str, tasks: Sequence, render: Callable, variant: Callable = lambda task: "") -> List[str]:
+        """
+        Get the fragments of many tasks with one cache round trip, rendering
+        and storing only the misses. `variant` returns the time-dependent
+        part of a card (e.g. its "due soon" badge) that is part of the key.
+        """
+        keys = [self.key(template, task, variant(task)) for task in tasks]
+        fragments, missing = self._fill(keys, tasks, self.backend.get_many(keys), render)
+        if missing:
+            self.backend.set_many(missing, self.timeout)
+        return fragments
+
+    async def aget_or_render(self, template: str, tasks: Sequence, render: Callable, variant: Callable = lambda task: "") -> List[str]:
+        """Async variant of get_or_render; rendering itself stays synchronous"""
+        keys = [self.key(template, task, variant(task)) for task in tasks]
+        fragments, missing = self._fill(keys, tasks, await self.backend.aget_many(keys), render)
+        if missing:
+            await self.backend.aset_many(missing, self.timeout)
+        return fragments
+
+    @staticmethod
+    def _fill(keys: List[str], tasks: Sequence, cached: Dict[str, str], render: Callable) -> Tuple[List[str], Dict[str, str]]:
+        """Complete the cached fragments by rendering the misses"""
+        missing = {}
+        fragments = []
+        for key, task in zip(keys, tasks):
+            fragment = cached.get(key)
+            if fragment is None:
+                fragment = missing[key] = render(task)
+            fragments.append(fragment)
+        return fragments, missing
@@ -0,0 +1,107 @@
+import hashlib
+from asgiref.sync import iscoroutinefunction
+from datetime import datetime
+from functools import wraps
+from typing import Optional
+from django.conf import settings
+from django.contrib import messages
+from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from .models import TaskUserState
+from .repository import TaskUserStateRepository
+from .utils import aget_request_user
+
+
+def get_request_task_state(request) -> Optional[TaskUserState]:
+    """
+    Get the task state row of the requesting user, memoized on the request
+    so the conditional check and the view share a single lookup.
+    """
+    if not hasattr(request, "_task_user_state"):
+        state = None
+        if request.user.is_authenticated:
+            state = TaskUserStateRepository().get_by_user_id(request.user.pk)
+        request._task_user_state = state
+    return request._task_user_state
+
+
+async def aget_request_task_state(request) -> Optional[TaskUserState]:
+    """Async variant of get_request_task_state, sharing the same memo"""
+    if not hasattr(request, "_task_user_state"):
+        state = None
+        user = await aget_request_user(request)
+        if user.is_authenticated:
+            state = await TaskUserStateRepository().aget_by_user_id(user.pk)
+        request._task_user_state = state
+    return request._task_user_state
+
+
+def _get_user_state(request) -> Optional[TaskUserState]:
+    """
+    Get the state validators are derived from. Returns None when no
+    validator can be trusted: anonymous users, users without a state row,
+    or users whose overdue tasks need reconciliation (the view itself would
+    change the response).
+    """
+    state = get_request_task_state(request)
+    if state is not None and state.needs_reconciliation(timezone.now()):
+        return None
+    return state
+
+
+def _freshness_bucket() -> datetime:
+    """
+    Start of the current hour; rendered pages contain relative dates
+    ("2 days remaining"), so validators roll over at least hourly.
+    """
+    return timezone.now().replace(minute=0, second=0, microsecond=0)
+
+
+def _has_pending_messages(request) -> bool:
+    """Flash messages are rendered once, so such responses must not be a 304"""
+    return len(messages.get_messages(request)) > 0
+
+
+def task_etag(request, *args, **kwargs) -> Optional[str]:
+    """ETag derived from the user's task version, without querying tasks"""
+    state = _get_user_state(request)
+    if state is None or _has_pending_messages(request):
+        return None
+    raw = ":".join([
+        str(state.user_id),
+        str(state.version),
+        _freshness_bucket().isoformat(),
+        request.get_full_path(),
+        # Pages embed CSRF tokens bound to the cookie secret
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ""),
+    ])
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def task_last_modified(request, *args, **kwargs) -> Optional[datetime]:
+    """Last-Modified derived from the user's last task write"""
+    state = _get_user_state(request)
+    if state is None or state.modified_at is None or _has_pending_messages(request):
+        return None
+    return max(state.modified_at, _freshness_bucket())
+
+
+def task_condition(view_func):
+    """
+    Answer If-None-Match / If-Modified-Since with a 304 from the user's
+    TaskUserState row alone. Responses are private and always revalidated.
+    Must be applied below login_required.
+    """
+    conditional_view = condition(etag_func=task_etag, last_modified_func=task_last_modified)(view_func)
+    cached_view = cache_control(private=True, no_cache=True)(conditional_view)
+    if not iscoroutinefunction(view_func):
+        return cached_view
+    
+    # condition() calls the validators synchronously even for async views,
+    # so the state row they read is fetched beforehand
+    async def _view_wrapper(request, *args, **kwargs):
+        await aget_request_task_state(request)
+        return await cached_view(request, *args, **kwargs)
+    
+    return wraps(view_func)(_view_wrapper)
@@ -7,6 +7,9 @@ TASK_STATUS_ACTIVE = "active"
 TASK_STATUS_COMPLETED = "completed"
 TASK_STATUS_FAILED = "failed"
 
+# Statuses a task can be completed from
+TASK_COMPLETABLE_STATUSES = (TASK_STATUS_ACTIVE, TASK_STATUS_FAILED)
+
 # Task Status Choices List
 TASK_STATUS_CHOICES = [
     (TASK_STATUS_ACTIVE, "Active"),
@@ -21,6 +24,31 @@ TASK_STATUS_LABELS = {
     TASK_STATUS_FAILED: "Failed",
 }
 
+# Task Event Types (status transitions recorded in TaskEvent)
+TASK_EVENT_COMPLETED = "completed"
+TASK_EVENT_FAILED = "failed"
+TASK_EVENT_REACTIVATED = "reactivated"
+
+TASK_EVENT_CHOICES = [
+    (TASK_EVENT_COMPLETED, "Completed"),
+    (TASK_EVENT_FAILED, "Failed"),
+    (TASK_EVENT_REACTIVATED, "Reactivated"),
+]
+
+# Event recorded when a task enters each status
+TASK_STATUS_EVENTS = {
+    TASK_STATUS_ACTIVE: TASK_EVENT_REACTIVATED,
+    TASK_STATUS_COMPLETED: TASK_EVENT_COMPLETED,
+    TASK_STATUS_FAILED: TASK_EVENT_FAILED,
+}
+
+# Daily rollup counter bumped by each event (see TaskDailyStats)
+TASK_EVENT_STATS = {
+    TASK_EVENT_COMPLETED: "completed_count",
+    TASK_EVENT_FAILED: "failed_count",
+    TASK_EVENT_REACTIVATED: "reactivated_count",
+}
+
 # Task Status Colors (for Bootstrap badges)
 TASK_STATUS_COLORS = {
     TASK_STATUS_ACTIVE: "success",
@@ -37,4 +65,78 @@ VALIDATION_MESSAGES = {
     "unable_to_complete": "Unable to complete task",
     "unable_to_reactivate": "Unable to reactivate task",
     "unable_to_delete": "Unable to delete task",
+    "invalid_cursor": "Invalid page cursor",
+    "invalid_timeline_filter": "Invalid task or page cursor",
+    "invalid_trend_months": "Months must be a number between 1 and 60",
+    "search_query_required": "Provide a search query with at least one word",
+    "invalid_bulk_request": "Provide a list of task ids",
+    "too_many_ids": "Too many task ids in one request",
 }
+
+# Overdue Sweeper Defaults (overridable via settings)
+OVERDUE_SWEEP_INTERVAL_SECONDS = 60
+OVERDUE_SWEEP_BATCH_SIZE = 500
+
+# Due-Date Scheduler Defaults (overridable via settings)
+DUE_SCHEDULER_POLL_INTERVAL_SECONDS = 5
+
+# Pagination
+TASK_LIST_PAGE_SIZE = 20
+TASK_API_PAGE_SIZE = 50
+TASK_API_MAX_PAGE_SIZE = 200
+TASK_TIMELINE_PAGE_SIZE = 50
+
+# Daily Statistics Rollups
+TASK_STATS_FIELDS = ("created_count", "completed_count", "failed_count", "reactivated_count", "backlog_change")
+TASK_TRENDS_MONTHS = 12
+TASK_TRENDS_MAX_MONTHS = 60
+STATS_REBUILD_CHUNK_SIZE = 200
+
+# Full-text Search
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 100
+# bm25 column weights (SQLite); PostgreSQL scales them to its A/B weights
+SEARCH_TITLE_WEIGHT = 10.0
+SEARCH_DESCRIPTION_WEIGHT = 1.0
+# Text search configuration of the PostgreSQL tsvector column (language-agnostic)
+SEARCH_PG_CONFIG = "simple"
+
+# Status Cache Defaults (overridable via settings)
+STATUS_CACHE_KEY = "tasks:status:{user_id}"
+STATUS_CACHE_TIMEOUT_SECONDS = 300
+
+# Server-Sent Events Defaults (overridable via settings)
+EVENTS_HEARTBEAT_SECONDS = 15
+EVENTS_MAX_STREAM_SECONDS = 300
+EVENTS_RETRY_MILLISECONDS = 5000
+
+# Bulk Operations
+BULK_MAX_TASK_IDS = 1000
+BULK_RESULT_COMPLETED = "completed"
+BULK_RESULT_REACTIVATED = "reactivated"
+BULK_RESULT_DELETED = "deleted"
+BULK_RESULT_NOT_FOUND = "not_found"
+BULK_RESULT_INVALID_STATUS = "invalid_status"
+
+# Import / Export
+IMPORT_BATCH_SIZE = 1000
+IMPORT_MAX_REPORTED_ERRORS = 100
+TASK_FILE_FORMATS = ("csv", "jsonl")
+EXPORT_CHUNK_SIZE = 2000
+
+# Field projections for user-scoped queries
+TASK_DETAIL_FIELDS = ("id", "user", "title", "description", "due_date", "created_at", "status", "reactivation_count")
+TASK_FORM_FIELDS = ("id", "user", "title", "description", "due_date", "status", "version")
+
+# Performance Instrumentation (opt-in, see apps/tasks/instrumentation.py)
+PERF_WINDOW_SIZE = 500
+PERF_SNAPSHOT_CACHE_KEY = "tasks:perf:snapshot"
+PERF_SNAPSHOT_INTERVAL_SECONDS = 5
+
+# Read Replica Routing (see apps/tasks/routing.py)
+REPLICA_STICKY_CACHE_KEY = "tasks:primary:{user_id}"
+REPLICA_STICKY_SECONDS = 5
+
+# Task Card Fragment Cache (overridable via settings)
+FRAGMENT_CACHE_KEY = "tasks:card:{template}:{task_id}:{version}:{variant}"
+FRAGMENT_CACHE_TIMEOUT_SECONDS = 24 * 60 * 60
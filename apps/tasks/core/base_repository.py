@@ -1,6 +1,7 @@
 from typing import TypeVar, Generic, Type, Optional, List, Dict, Any
 from django.db import models
-from django.db.models import QuerySet
+from django.db.models import QuerySet, Q
+from .pagination import KeysetPage, encode_cursor, decode_cursor
 
 T = TypeVar("T", bound=models.Model)
 
@@ -32,6 +33,10 @@ class BaseRepository(Generic[T]):
         instance.save()
         return instance
     
+    def bulk_create(self, instances: List[T], batch_size: Optional[int] = None) -> List[T]:
+        """Bulk create multiple instances"""
+        return self.model.objects.bulk_create(instances, batch_size=batch_size)
+    
     def bulk_update(self, instances: List[T], fields: List[str]) -> int:
         """Bulk update multiple instances"""
         return self.model.objects.bulk_update(instances, fields)
@@ -58,4 +63,95 @@ class BaseRepository(Generic[T]):
     
     def get_or_create(self, defaults: Dict[str, Any] = None, **kwargs) -> tuple[T, bool]:
         """Get an instance or create it if it doesn't exist"""
-        return self.model.objects.get_or_create(defaults=defaults, **kwargs)
\ No newline at end of file
+        return self.model.objects.get_or_create(defaults=defaults, **kwargs)
+    
+    def get_keyset_page(
+        self,
+        queryset: QuerySet[T],
+        cursor: Optional[str] = None,
+        page_size: int = 20,
+        order_field: str = "created_at",
+    ) -> KeysetPage[T]:
+        """
+        Get a page of a queryset ordered by (order_field, pk) descending.
+        The cursor encodes the last row of the previous page, so every page
+        costs the same regardless of how deep the client has scrolled.
+        Raises ValueError if the cursor is malformed.
+        """
+        items = list(self._keyset_queryset(queryset, cursor, order_field)[:page_size + 1])
+        return self._keyset_page(items, page_size, order_field)
+    
+    def _keyset_queryset(self, queryset: QuerySet[T], cursor: Optional[str], order_field: str) -> QuerySet[T]:
+        queryset = queryset.order_by(f"-{order_field}", "-pk")
+        if cursor:
+            value, pk = decode_cursor(cursor, queryset.model._meta.pk)
+            queryset = queryset.filter(
+                Q(**{f"{order_field}__lt": value}) | Q(**{order_field: value, "pk__lt": pk})
+            )
+        return queryset
+    
+    @staticmethod
+    def _keyset_page(items: List[T], page_size: int, order_field: str) -> KeysetPage[T]:
+        # One extra row was fetched to detect whether a next page exists
+        next_cursor = None
+        if len(items) > page_size:
+            items = items[:page_size]
+            last = items[-1]
+            next_cursor = encode_cursor(getattr(last, order_field), last.pk)
+        return KeysetPage(items=items, next_cursor=next_cursor)
+    
+    # Async variants for async views, built on Django's async ORM methods.
+    # They keep the signatures and return values of their sync counterparts.
+    
+    async def acreate(self, **kwargs) -> T:
+        """Create a new instance of the model"""
+        return await self.model.objects.acreate(**kwargs)
+    
+    async def aget_by_id(self, id: str) -> Optional[T]:
+        """Get an instance by its ID"""
+        try:
+            return await self.model.objects.aget(id=id)
+        except self.model.DoesNotExist:
+            return None
+    
+    async def aupdate(self, instance: T, **kwargs) -> T:
+        """Update an instance of the model"""
+        for field, value in kwargs.items():
+            setattr(instance, field, value)
+        await instance.asave()
+        return instance
+    
+    async def adelete(self, instance: T) -> bool:
+        """Delete an instance of the model"""
+        try:
+            await instance.adelete()
+            return True
+        except Exception:
+            return False
+    
+    async def aexists(self, **kwargs) -> bool:
+        """Check if any instance exists with the given criteria"""
+        return await self.model.objects.filter(**kwargs).aexists()
+    
+    async def acount(self, **kwargs) -> int:
+        """Count instances matching the criteria"""
+        return await self.model.objects.filter(**kwargs).acount()
+    
+    async def aget_or_create(self, defaults: Dict[str, Any] = None, **kwargs) -> tuple[T, bool]:
+        """Get an instance or create it if it doesn't exist"""
+        return await self.model.objects.aget_or_create(defaults=defaults, **kwargs)
+    
+    async def aget_keyset_page(
+        self,
+        queryset: QuerySet[T],
+        cursor: Optional[str] = None,
+        page_size: int = 20,
+        order_field: str = "created_at",
+    ) -> KeysetPage[T]:
+        """
+        Async variant of get_keyset_page.
+        Raises ValueError if the cursor is malformed.
+        """
+        queryset = self._keyset_queryset(queryset, cursor, order_field)
+        items = [item async for item in queryset[:page_size + 1]]
+        return self._keyset_page(items, page_size, order_field)
@@ -0,0 +1,48 @@
+import base64
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Generic, Iterator, List, Optional, Tuple, TypeVar
+from django.core.exceptions import ValidationError
+
+T = TypeVar("T")
+
+
+@dataclass
+class KeysetPage(Generic[T]):
+    """A page of results with an opaque cursor pointing to the next page"""
+    items: List[T] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+def encode_cursor(value: datetime, pk) -> str:
+    """Encode the ordering value and primary key of the last row of a page"""
+    raw = f"{value.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, pk_field=None) -> Tuple[datetime, Any]:
+    """
+    Decode a cursor produced by encode_cursor, converting the primary key
+    with `pk_field` (a model field) when given
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, pk = base64.urlsafe_b64decode(padded.encode()).decode().split("|", 1)
+        if pk_field is not None:
+            pk = pk_field.to_python(pk)
+        return datetime.fromisoformat(value), pk
+    except (ValueError, UnicodeDecodeError, ValidationError) as exc:
+        raise ValueError("Invalid cursor") from exc
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Set
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from .constants import EVENTS_HEARTBEAT_SECONDS, EVENTS_MAX_STREAM_SECONDS, EVENTS_RETRY_MILLISECONDS
+
+
+class TaskSubscription:
+    """A single listener for one user's task events, bound to an event loop"""
+
+    def __init__(self, user_id, loop: asyncio.AbstractEventLoop):
+        self.user_id = user_id
+        self.loop = loop
+        # One pending notification is enough: listeners re-read the current state
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+
+    def notify(self, event: Dict[str, Any]):
+        """Deliver an event from any thread without blocking"""
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event: Dict[str, Any]):
+        if not self.queue.full():
+            self.queue.put_nowait(event)
+
+    async def wait(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Wait for the next event, returning None on timeout"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class TaskEventBroker:
+    """In-process publish/subscribe hub for per-user task change events"""
+
+    def __init__(self):
+        self._subscriptions: Dict[Any, Set[TaskSubscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id) -> TaskSubscription:
+        """Subscribe the running event loop to a user's events"""
+        subscription = TaskSubscription(user_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: TaskSubscription):
+        """Remove a subscription"""
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def subscriber_count(self, user_id) -> int:
+        """Number of open subscriptions of a user"""
+        with self._lock:
+            return len(self._subscriptions.get(user_id, ()))
+
+    def publish(self, user_id, event: Dict[str, Any]):
+        """Publish an event to every subscription of a user"""
+        self.publish_many([user_id], event)
+
+    def publish_many(self, user_ids: Iterable, event: Dict[str, Any]):
+        """Publish the same event to several users"""
+        with self._lock:
+            subscriptions = [
+                subscription
+                for user_id in set(user_ids)
+                for subscription in self._subscriptions.get(user_id, ())
+            ]
+        for subscription in subscriptions:
+            subscription.notify(event)
+
+
+_broker = TaskEventBroker()
+
+
+def get_broker() -> TaskEventBroker:
+    """Get the process-wide task event broker"""
+    return _broker
+
+
+def set_broker(broker: TaskEventBroker) -> TaskEventBroker:
+    """Replace the process-wide broker (e.g. with a stand-in in tests); returns the previous one"""
+    global _broker
+    previous, _broker = _broker, broker
+    return previous
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Format a Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_status_events(user, heartbeat: Optional[float] = None, max_duration: Optional[float] = None) -> AsyncIterator[str]:
+    """
+    Stream the user's task status counts as Server-Sent Events.
+    The first message carries every count, later ones only the counts that
+    changed. Counts are re-read when the broker signals a change, and at
+    least every `heartbeat` seconds so overdue transitions made by other
+    processes are picked up; idle heartbeats send a comment to keep the
+    connection alive. The stream ends after `max_duration` seconds and the
+    client reconnects.
+    """
+    from .repository import TaskRepository
+
+    if heartbeat is None:
+        heartbeat = getattr(settings, "TASKS_EVENTS_HEARTBEAT", EVENTS_HEARTBEAT_SECONDS)
+    if max_duration is None:
+        max_duration = getattr(settings, "TASKS_EVENTS_MAX_STREAM", EVENTS_MAX_STREAM_SECONDS)
+
+    repository = TaskRepository()
+    get_counts = sync_to_async(repository.get_cached_status_counts_by_user)
+    broker = get_broker()
+    subscription = broker.subscribe(user.pk)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_duration
+    last_counts: Optional[Dict[str, int]] = None
+
+    try:
+        yield f"retry: {EVENTS_RETRY_MILLISECONDS}\n\n"
+        while True:
+            counts, updated_count = await get_counts(user)
+            delta = {
+                key: value for key, value in counts.items()
+                if last_counts is None or last_counts.get(key) != value
+            }
+            if delta or updated_count:
+                yield format_sse("status", {**delta, "updated_count": updated_count})
+                last_counts = counts
+            else:
+                yield ": keepalive\n\n"
+
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            await subscription.wait(min(heartbeat, remaining))
+    finally:
+        broker.unsubscribe(subscription)
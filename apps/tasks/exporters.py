@@ -0,0 +1,102 @@
+import csv
+import json
+from datetime import datetime
+from itertools import islice
+from typing import Any, AsyncIterator, Iterable, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from .repository import TaskRepository
+from .constants import EXPORT_CHUNK_SIZE, TASK_FILE_FORMATS
+
+EXPORT_FIELDS = ("id", "title", "description", "due_date", "created_at", "status", "reactivation_count")
+EXPORT_CONTENT_TYPES = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+
+
+class _EchoBuffer:
+    """File-like object handing each written CSV line back to the caller"""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def _to_text(value: Any) -> Any:
+    """Convert values_list values to JSON/CSV friendly types"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def export_fields(include_user: bool = False) -> Tuple[str, ...]:
+    """Fields of an export, with the owner's username for multi-user exports"""
+    return EXPORT_FIELDS + ("user__username",) if include_user else EXPORT_FIELDS
+
+
+def iter_export_rows(user: Optional[User], fields: Sequence[str], chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[tuple]:
+    """
+    Stream tuples of the given fields straight from the database cursor,
+    without instantiating models or caching the QuerySet.
+    """
+    queryset = TaskRepository().get_export_queryset(user)
+    return queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+
+
+def render_csv(rows: Iterable[tuple], fields: Sequence[str]) -> Iterator[str]:
+    """Render rows as CSV lines, header first"""
+    writer = csv.writer(_EchoBuffer())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([_to_text(value) for value in row])
+
+
+def render_jsonl(rows: Iterable[tuple], fields: Sequence[str]) -> Iterator[str]:
+    """Render rows as JSON Lines"""
+    for row in rows:
+        yield json.dumps({name: _to_text(value) for name, value in zip(fields, row)}) + "\n"
+
+
+def render_export(user: Optional[User], file_format: str, include_user: bool = False, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Lazily render an export of a user's tasks, or of all tasks when user is None.
+
+    Raises:
+        ValueError: If the format is not supported
+    """
+    if file_format not in TASK_FILE_FORMATS:
+        raise ValueError(f"Unsupported format: {file_format}")
+    fields = export_fields(include_user)
+    rows = iter_export_rows(user, fields, chunk_size)
+    render = render_csv if file_format == "csv" else render_jsonl
+    return render(rows, fields)
+
+
+async def arender_export(user: Optional[User], file_format: str, include_user: bool = False, chunk_size: int = EXPORT_CHUNK_SIZE) -> AsyncIterator[str]:
+    """
+    Async variant of render_export for ASGI responses, which would otherwise
+    consume a sync iterator whole before sending the first byte. Lines are
+    pulled `chunk_size` at a time on the ORM thread, so the database cursor
+    stays on the thread that opened it and memory stays bounded.
+
+    Raises:
+        ValueError: If the format is not supported
+    """
+    lines = render_export(user, file_format, include_user, chunk_size)
+    next_chunk = sync_to_async(_next_chunk)
+    try:
+        while True:
+            chunk = await next_chunk(lines, chunk_size)
+            if not chunk:
+                return
+            yield "".join(chunk)
+    finally:
+        # Release the server-side cursor when the client disconnects early
+        await sync_to_async(lines.close)()
+
+
+def _next_chunk(lines: Iterator[str], size: int) -> List[str]:
+    return list(islice(lines, size))
@@ -0,0 +1,159 @@
+import csv
+import io
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+from django.contrib.auth.models import User
+from django.db import transaction
+from .forms import TaskForm
+from .models import Task
+from .repository import TaskRepository
+from .constants import IMPORT_BATCH_SIZE, IMPORT_MAX_REPORTED_ERRORS, TASK_FILE_FORMATS
+
+IMPORT_FIELDS = ("title", "description", "due_date")
+
+
+@dataclass
+class ImportReport:
+    """Outcome of a task import"""
+    created: int = 0
+    failed: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    elapsed: float = 0.0
+    # Set when the file itself cannot be read further (bad encoding, broken CSV)
+    file_error: Optional[str] = None
+
+    @property
+    def rows(self) -> int:
+        return self.created + self.failed
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Serialize the report for JSON responses"""
+        return {
+            "created": self.created,
+            "failed": self.failed,
+            "rows": self.rows,
+            "elapsed": round(self.elapsed, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+            "errors": self.errors,
+            "file_error": self.file_error,
+        }
+
+
+def detect_format(filename: str, default: str = "csv") -> str:
+    """Guess the file format from its extension"""
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if extension in ("jsonl", "ndjson"):
+        return "jsonl"
+    if extension == "csv":
+        return "csv"
+    return default
+
+
+def iter_task_rows(lines: Iterable[str], file_format: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Lazily parse CSV or JSON Lines text into (line number, row) pairs.
+    Malformed JSON lines are yielded as rows with an "__error__" key.
+
+    Raises:
+        ValueError: If the format is not supported
+    """
+    if file_format not in TASK_FILE_FORMATS:
+        raise ValueError(f"Unsupported format: {file_format}")
+
+    if file_format == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            row = {"__error__": f"Invalid JSON: {exc}"}
+        if not isinstance(row, dict):
+            row = {"__error__": "Each line must be a JSON object"}
+        yield line_number, row
+
+
+def open_text_stream(binary_file: IO[bytes]) -> IO[str]:
+    """Wrap a binary file (e.g. an upload) as a UTF-8 text stream read line by line"""
+    return io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline="")
+
+
+class TaskImporter:
+    """Validate task rows with TaskForm and save them in bulk_create batches"""
+
+    def __init__(self, user: User, batch_size: int = IMPORT_BATCH_SIZE, repository: Optional[TaskRepository] = None):
+        self.user = user
+        self.batch_size = batch_size
+        self.repository = repository or TaskRepository()
+
+    def run(self, rows: Iterable[Tuple[int, Dict[str, Any]]], on_batch=None) -> ImportReport:
+        """
+        Import rows, keeping at most one batch of tasks in memory.
+        Each batch is saved inside its own transaction; `on_batch` is called
+        with the running report after every batch.
+
+        A file that cannot be decoded or parsed stops the import with
+        `file_error` set: batches already saved stay committed (`created`),
+        the pending one is discarded.
+        """
+        report = ImportReport()
+        started = time.perf_counter()
+        batch: List[Task] = []
+        rows = iter(rows)
+        line_number = 0
+
+        while True:
+            try:
+                line_number, row = next(rows)
+            except StopIteration:
+                break
+            except (UnicodeDecodeError, csv.Error) as exc:
+                report.file_error = f"Unreadable file after line {line_number}: {exc}"
+                batch = []
+                break
+
+            task, errors = self.build_task(row)
+            if task is None:
+                report.failed += 1
+                if len(report.errors) < IMPORT_MAX_REPORTED_ERRORS:
+                    report.errors.append({"line": line_number, "errors": errors})
+                continue
+
+            batch.append(task)
+            if len(batch) >= self.batch_size:
+                self._flush(batch, report, started, on_batch)
+                batch = []
+
+        if batch:
+            self._flush(batch, report, started, on_batch)
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    def build_task(self, row: Dict[str, Any]) -> Tuple[Optional[Task], Dict[str, List[str]]]:
+        """Validate a row with the TaskForm rules and build an unsaved Task"""
+        if "__error__" in row:
+            return None, {"__all__": [row["__error__"]]}
+
+        form = TaskForm(data={name: row.get(name) or "" for name in IMPORT_FIELDS})
+        if not form.is_valid():
+            return None, {name: list(messages) for name, messages in form.errors.items()}
+        return Task(user=self.user, **form.cleaned_data), {}
+
+    def _flush(self, batch: List[Task], report: ImportReport, started: float, on_batch):
+        with transaction.atomic():
+            self.repository.bulk_create(batch)
+        report.created += len(batch)
+        if on_batch:
+            report.elapsed = time.perf_counter() - started
+            on_batch(report)
@@ -0,0 +1,159 @@
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.template.backends.django import DjangoTemplates
+from .constants import PERF_WINDOW_SIZE, PERF_SNAPSHOT_CACHE_KEY, PERF_SNAPSHOT_INTERVAL_SECONDS
+
+PERF_METRICS = ("queries", "sql_ms", "view_ms", "template_ms")
+PERF_PERCENTILES = (50, 95, 99)
+
+_current_sample: ContextVar[Optional[Dict[str, float]]] = ContextVar("task_perf_sample", default=None)
+
+
+def _new_sample() -> Dict[str, float]:
+    return {metric: 0 for metric in PERF_METRICS}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values), max(1, math.ceil(pct / 100 * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+
+class PerfStats:
+    """Thread-safe rolling window of per-URL-name request samples"""
+
+    def __init__(self, window: int = PERF_WINDOW_SIZE):
+        self.window = window
+        self._samples: Dict[str, Deque[Dict[str, float]]] = defaultdict(lambda: deque(maxlen=self.window))
+        self._totals: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._last_snapshot = 0.0
+
+    def record(self, url_name: str, sample: Dict[str, float]):
+        """Record the metrics of one request"""
+        with self._lock:
+            self._samples[url_name].append(sample)
+            self._totals[url_name] += 1
+
+    def reset(self):
+        """Drop every recorded sample"""
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Percentiles of every metric per URL name over the rolling window"""
+        with self._lock:
+            samples = {name: list(window) for name, window in self._samples.items()}
+            totals = dict(self._totals)
+
+        report = {}
+        for url_name, window in sorted(samples.items()):
+            entry: Dict[str, Any] = {"requests": totals[url_name], "window": len(window)}
+            for metric in PERF_METRICS:
+                values = sorted(sample[metric] for sample in window)
+                entry[metric] = {f"p{pct}": round(percentile(values, pct), 3) for pct in PERF_PERCENTILES}
+                entry[metric]["max"] = round(values[-1], 3) if values else 0
+            report[url_name] = entry
+        return report
+
+    def publish(self, force: bool = False):
+        """
+        Store the snapshot in the cache every few seconds so other processes
+        (e.g. the task_perf_report command) can read it.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_snapshot < PERF_SNAPSHOT_INTERVAL_SECONDS:
+            return
+        self._last_snapshot = now
+        alias = getattr(settings, "TASKS_CACHE_ALIAS", "default")
+        caches[alias].set(PERF_SNAPSHOT_CACHE_KEY, self.snapshot(), None)
+
+
+perf_stats = PerfStats(getattr(settings, "TASKS_PERF_WINDOW", PERF_WINDOW_SIZE))
+
+
+class _QueryRecorder:
+    """connection.execute_wrapper hook counting queries and SQL time"""
+
+    def __init__(self, sample: Dict[str, float]):
+        self.sample = sample
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sample["queries"] += 1
+            self.sample["sql_ms"] += (time.perf_counter() - started) * 1000
+
+
+class TaskPerfMiddleware:
+    """
+    Opt-in middleware recording, per URL name, the query count, SQL time,
+    view time and template render time of every request. Place it last in
+    MIDDLEWARE so the measured view time covers only the view.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sample = _new_sample()
+        token = _current_sample.set(sample)
+        recorder = _QueryRecorder(sample)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(recorder))
+                response = self.get_response(request)
+        finally:
+            _current_sample.reset(token)
+        sample["view_ms"] = (time.perf_counter() - started) * 1000
+
+        match = getattr(request, "resolver_match", None)
+        if match is not None and match.view_name:
+            perf_stats.record(match.view_name, sample)
+            perf_stats.publish()
+        return response
+
+
+class _InstrumentedTemplate:
+    """Template wrapper adding its render time to the current request sample"""
+
+    def __init__(self, template):
+        self._template = template
+
+    def __getattr__(self, name):
+        return getattr(self._template, name)
+
+    def render(self, context=None, request=None):
+        sample = _current_sample.get()
+        if sample is None:
+            return self._template.render(context, request)
+        started = time.perf_counter()
+        try:
+            return self._template.render(context, request)
+        finally:
+            sample["template_ms"] += (time.perf_counter() - started) * 1000
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Django template backend whose templates report their render time"""
+
+    def from_string(self, template_code):
+        return _InstrumentedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return _InstrumentedTemplate(super().get_template(template_name))
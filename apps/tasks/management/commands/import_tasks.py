@@ -0,0 +1,64 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from apps.tasks.importers import TaskImporter, detect_format, iter_task_rows
+from apps.tasks.constants import IMPORT_BATCH_SIZE, TASK_FILE_FORMATS
+
+
+class Command(BaseCommand):
+    help = 'Import tasks for a user from a CSV or JSON Lines file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import (columns: title, description, due_date)')
+        parser.add_argument(
+            '--user',
+            required=True,
+            help='Username owning the imported tasks',
+        )
+        parser.add_argument(
+            '--format',
+            choices=TASK_FILE_FORMATS,
+            default=None,
+            help='File format (default: guessed from the extension)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help='Rows saved per bulk_create batch and transaction',
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f'User "{options["user"]}" does not exist')
+
+        file_format = options['format'] or detect_format(options['path'])
+        importer = TaskImporter(user, batch_size=options['batch_size'])
+
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as source:
+                report = importer.run(iter_task_rows(source, file_format), on_batch=self._report_batch)
+        except OSError as exc:
+            raise CommandError(f'Unable to read {options["path"]}: {exc}')
+
+        for error in report.errors:
+            self.stdout.write(self.style.ERROR(f'Line {error["line"]}: {error["errors"]}'))
+
+        if report.file_error:
+            raise CommandError(
+                f'{report.file_error} ({report.created} tasks already imported, {report.failed} rejected)'
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Imported {report.created} tasks ({report.failed} rejected) '
+                f'in {report.elapsed:.2f}s - {report.rows_per_second:.0f} rows/sec'
+            )
+        )
+
+    def _report_batch(self, report):
+        """Report progress after each batch"""
+        if self.verbosity > 1:
+            self.stdout.write(f'{report.created} tasks imported ({report.rows_per_second:.0f} rows/sec)')
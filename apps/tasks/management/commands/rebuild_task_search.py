@@ -0,0 +1,21 @@
+import time
+from django.core.management.base import BaseCommand
+from apps.tasks.search import TaskSearchIndex
+
+
+class Command(BaseCommand):
+    help = 'Recreate the full-text search index and its sync triggers and refill it from every task'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default=None,
+            help='Database alias to rebuild (default: the one tasks are written to)',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        indexed_count = TaskSearchIndex(using=options['database']).rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f'Indexed {indexed_count} tasks in {time.perf_counter() - started:.2f}s')
+        )
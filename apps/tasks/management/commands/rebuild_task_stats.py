@@ -0,0 +1,43 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from apps.tasks.rollups import TaskStatsRebuilder
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily task statistics rollups from tasks and their events'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            action='append',
+            dest='usernames',
+            default=None,
+            help='Only rebuild the rollups of this user (repeatable)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Number of worker processes (default: TASKS_STATS_REBUILD_WORKERS or the CPU count; 1 runs inline)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=None,
+            help='Number of users rebuilt per transaction (default: TASKS_STATS_REBUILD_CHUNK_SIZE)',
+        )
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options['usernames']:
+            users = dict(User.objects.filter(username__in=options['usernames']).values_list('username', 'id'))
+            missing = sorted(set(options['usernames']) - set(users))
+            if missing:
+                raise CommandError(f'Unknown users: {", ".join(missing)}')
+            user_ids = users.values()
+
+        rebuilder = TaskStatsRebuilder(workers=options['workers'], chunk_size=options['chunk_size'])
+        user_count, row_count = rebuilder.rebuild(user_ids)
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt {row_count} daily statistics rows for {user_count} users')
+        )
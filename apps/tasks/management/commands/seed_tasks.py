@@ -0,0 +1,61 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from apps.tasks.seeding import SeedProfile, TaskSeeder, parse_weights
+from apps.tasks.constants import IMPORT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Generate users and tasks with configurable distributions for load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10, help='Number of users')
+        parser.add_argument('--tasks-per-user', type=int, default=100, help='Tasks generated for each user')
+        parser.add_argument('--prefix', default='seed', help='Username prefix (users are <prefix>0, <prefix>1, ...)')
+        parser.add_argument('--password', default='loadtest123', help='Password of the created users')
+        parser.add_argument(
+            '--status-weights',
+            default='active=5,completed=3,failed=2',
+            help='Relative weight of each status',
+        )
+        parser.add_argument('--overdue-ratio', type=float, default=0.05, help='Share of active tasks already past due')
+        parser.add_argument('--due-window-days', type=int, default=30, help='Due dates fall within this many days of now')
+        parser.add_argument('--due-skew', type=float, default=2.0, help='Values above 1 pack due dates near now')
+        parser.add_argument(
+            '--description-size',
+            default='0:500',
+            help='Description length range as MIN:MAX characters',
+        )
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible data')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help='Rows per bulk_create batch')
+
+    def handle(self, *args, **options):
+        try:
+            weights = parse_weights(options['status_weights'])
+            description_min, _, description_max = options['description_size'].partition(':')
+            profile = SeedProfile(
+                status_weights=weights,
+                overdue_ratio=options['overdue_ratio'],
+                due_window_days=options['due_window_days'],
+                due_skew=options['due_skew'],
+                description_min=int(description_min),
+                description_max=int(description_max or description_min),
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        total = options['users'] * options['tasks_per_user']
+        seeder = TaskSeeder(profile, seed=options['seed'], batch_size=options['batch_size'])
+        started = time.perf_counter()
+        users = seeder.create_users(options['users'], options['prefix'], options['password'])
+        created = seeder.seed(
+            [user.pk for user in users],
+            options['tasks_per_user'],
+            on_batch=lambda created: self.stdout.write(f'Seeded {created}/{total} tasks', ending='\r'),
+        )
+
+        elapsed = time.perf_counter() - started
+        rate = created / elapsed if elapsed > 0 else 0
+        self.stdout.write('')
+        self.stdout.write(
+            self.style.SUCCESS(f'Seeded {created} tasks for {len(users)} users in {elapsed:.2f}s ({rate:.0f} tasks/s)')
+        )
@@ -0,0 +1,84 @@
+import json
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+from apps.tasks.instrumentation import PERF_METRICS, perf_stats
+from apps.tasks.constants import PERF_SNAPSHOT_CACHE_KEY
+
+# Read-only views exercised by --exercise
+EXERCISED_URLS = ("tasks:task_list", "tasks:api_task_status", "tasks:api_task_list")
+
+
+class Command(BaseCommand):
+    help = 'Report per-URL query counts and SQL/view/template time percentiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--exercise',
+            metavar='USERNAME',
+            default=None,
+            help='Request the main task views in-process as this user and report on them '
+                 '(default: report the snapshot published by instrumented servers)',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=20,
+            help='Requests per view with --exercise',
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print the raw report as JSON',
+        )
+
+    def handle(self, *args, **options):
+        if options['exercise']:
+            report = self.exercise(options['exercise'], options['requests'])
+        else:
+            alias = getattr(settings, 'TASKS_CACHE_ALIAS', 'default')
+            report = caches[alias].get(PERF_SNAPSHOT_CACHE_KEY)
+            if report is None:
+                raise CommandError(
+                    'No snapshot found: run the server with DJANGO_TASKS_PERF=1 and a shared '
+                    'cache backend, or use --exercise USERNAME'
+                )
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f'{"view":<28} {"reqs":>6} ' + ' '.join(f'{metric + " p50/p95/p99":>26}' for metric in PERF_METRICS))
+        for url_name, entry in report.items():
+            columns = ' '.join(
+                f'{entry[metric]["p50"]:>8.1f}/{entry[metric]["p95"]:>8.1f}/{entry[metric]["p99"]:>8.1f}'
+                for metric in PERF_METRICS
+            )
+            self.stdout.write(f'{url_name:<28} {entry["requests"]:>6} {columns}')
+
+    def exercise(self, username, requests):
+        """Run the read-only task views with the instrumentation enabled"""
+        try:
+            user = User.objects.get(username=username)
+        except User.DoesNotExist:
+            raise CommandError(f'User "{username}" does not exist')
+
+        middleware = list(settings.MIDDLEWARE)
+        if 'apps.tasks.instrumentation.TaskPerfMiddleware' not in middleware:
+            middleware.append('apps.tasks.instrumentation.TaskPerfMiddleware')
+        templates = [{**settings.TEMPLATES[0], 'BACKEND': 'apps.tasks.instrumentation.InstrumentedDjangoTemplates'}]
+
+        perf_stats.reset()
+        with override_settings(MIDDLEWARE=middleware, TEMPLATES=templates, ALLOWED_HOSTS=['testserver']):
+            client = Client()
+            client.force_login(user)
+            for url_name in EXERCISED_URLS:
+                url = reverse(url_name)
+                for _ in range(requests):
+                    response = client.get(url)
+                    if response.status_code != 200:
+                        raise CommandError(f'{url} returned {response.status_code}')
+        return perf_stats.snapshot()
@@ -1,6 +1,8 @@
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from apps.tasks.repository import TaskRepository
+from apps.tasks.scheduler import DueDateScheduler
+from apps.tasks.sweeper import OverdueTaskSweeper
 
 
 class Command(BaseCommand):
@@ -12,28 +14,98 @@ class Command(BaseCommand):
             action='store_true',
             help='Force update all overdue tasks',
         )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Run as a long-lived sweeper, repeating every --interval seconds',
+        )
+        parser.add_argument(
+            '--schedule',
+            action='store_true',
+            help='Run the event-driven due-date scheduler, failing tasks as they come due',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=None,
+            help=(
+                'Seconds between sweeps in --loop mode (default: TASKS_OVERDUE_SWEEP_INTERVAL), '
+                'or between checks for rescheduled users in --schedule mode (default: TASKS_DUE_SCHEDULER_POLL_INTERVAL)'
+            ),
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Maximum number of tasks updated per query (default: TASKS_OVERDUE_SWEEP_BATCH_SIZE)',
+        )
+        parser.add_argument(
+            '--max-runs',
+            type=int,
+            default=None,
+            help='Stop the --loop sweeper or the --schedule scheduler after this many runs',
+        )
 
     def handle(self, *args, **options):
         repository = TaskRepository()
-        
+        self.verbosity = options['verbosity']
+
+        if options['schedule']:
+            scheduler = DueDateScheduler(repository=repository, poll_interval=options['interval'])
+            self.stdout.write(
+                self.style.WARNING(f'Starting due-date scheduler (poll interval: {scheduler.poll_interval}s)')
+            )
+            try:
+                scheduler.run(max_runs=options['max_runs'], on_run=self._report_sweep)
+            except KeyboardInterrupt:
+                self.stdout.write(self.style.WARNING('Due-date scheduler stopped'))
+            return
+
+        if options['loop']:
+            sweeper = OverdueTaskSweeper(
+                repository=repository,
+                interval=options['interval'],
+                batch_size=options['batch_size'],
+            )
+            self.stdout.write(
+                self.style.WARNING(
+                    f'Starting overdue task sweeper (interval: {sweeper.interval}s, batch size: {sweeper.batch_size})'
+                )
+            )
+            try:
+                sweeper.run(max_runs=options['max_runs'], on_sweep=self._report_sweep)
+            except KeyboardInterrupt:
+                self.stdout.write(self.style.WARNING('Overdue task sweeper stopped'))
+            return
+
         if options['force']:
             updated_count = repository.force_update_all_overdue_tasks()
             self.stdout.write(
                 self.style.SUCCESS(f'Force updated {updated_count} overdue tasks')
             )
         else:
-            updated_count = repository.ensure_overdue_tasks_are_failed()
+            sweeper = OverdueTaskSweeper(repository=repository, batch_size=options['batch_size'])
+            updated_count = sweeper.sweep()
             self.stdout.write(
                 self.style.SUCCESS(f'Updated {updated_count} overdue tasks to failed status')
             )
-        
+
         # Show current statistics
-        active_count = repository.get_active_tasks().count()
-        completed_count = repository.get_completed_tasks().count()
-        failed_count = repository.get_failed_tasks().count()
-        
+        counts = repository.get_status_counts()
+
         self.stdout.write(
             self.style.WARNING(
-                f'Current task status: Active: {active_count}, Completed: {completed_count}, Failed: {failed_count}'
+                f'Current task status: Active: {counts["active_count"]}, '
+                f'Completed: {counts["completed_count"]}, Failed: {counts["failed_count"]}'
             )
         )
+
+    def _report_sweep(self, updated_count: int):
+        """Report the outcome of a single run in --loop or --schedule mode"""
+        if updated_count or self.verbosity > 1:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'[{timezone.localtime(timezone.now()):%Y-%m-%d %H:%M:%S}] '
+                    f'Updated {updated_count} overdue tasks to failed status'
+                )
+            )
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-17 22:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskUserState',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='task_state', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='User')),
+                ('next_due_at', models.DateTimeField(blank=True, null=True, verbose_name='Next Due At')),
+                ('is_stale', models.BooleanField(default=True, verbose_name='Is Stale')),
+            ],
+            options={
+                'verbose_name': 'Task User State',
+                'verbose_name_plural': 'Task User States',
+            },
+        ),
+    ]
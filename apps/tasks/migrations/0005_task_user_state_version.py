@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-17 22:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_task_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskuserstate',
+            name='modified_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Modified At'),
+        ),
+        migrations.AddField(
+            model_name='taskuserstate',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0, verbose_name='Version'),
+        ),
+    ]
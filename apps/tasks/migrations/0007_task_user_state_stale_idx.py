@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-17 23:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_task_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='taskuserstate',
+            index=models.Index(condition=models.Q(('is_stale', True)), fields=['user'], name='task_state_stale_idx'),
+        ),
+    ]
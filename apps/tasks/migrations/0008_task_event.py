@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-17 23:07
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_task_user_state_stale_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.UUIDField(verbose_name='Task')),
+                ('event', models.CharField(choices=[('created', 'Created'), ('completed', 'Completed'), ('failed', 'Failed'), ('reactivated', 'Reactivated')], max_length=20, verbose_name='Event')),
+                ('occurred_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Occurred At')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_events', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Task Event',
+                'verbose_name_plural': 'Task Events',
+            },
+        ),
+    ]
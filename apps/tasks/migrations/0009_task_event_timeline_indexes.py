@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-17 23:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_task_event'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='taskevent',
+            name='event',
+            field=models.CharField(choices=[('completed', 'Completed'), ('failed', 'Failed'), ('reactivated', 'Reactivated')], max_length=20, verbose_name='Event'),
+        ),
+        migrations.AlterField(
+            model_name='taskevent',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='task_events', to=settings.AUTH_USER_MODEL, verbose_name='User'),
+        ),
+        migrations.AddIndex(
+            model_name='taskevent',
+            index=models.Index(fields=['user', '-occurred_at', '-id'], name='task_event_user_page_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskevent',
+            index=models.Index(fields=['task_id', '-occurred_at', '-id'], name='task_event_task_page_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-17 23:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0009_task_event_timeline_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Day')),
+                ('created_count', models.PositiveIntegerField(default=0, verbose_name='Created')),
+                ('completed_count', models.PositiveIntegerField(default=0, verbose_name='Completed')),
+                ('failed_count', models.PositiveIntegerField(default=0, verbose_name='Failed')),
+                ('reactivated_count', models.PositiveIntegerField(default=0, verbose_name='Reactivated')),
+                ('backlog_change', models.IntegerField(default=0, verbose_name='Overdue Backlog Change')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='task_daily_stats', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Task Daily Stats',
+                'verbose_name_plural': 'Task Daily Stats',
+                'constraints': [models.UniqueConstraint(fields=('user', 'day'), name='task_daily_stats_user_day_uniq')],
+            },
+        ),
+    ]
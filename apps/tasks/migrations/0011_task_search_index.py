@@ -0,0 +1,70 @@
+from django.db import migrations
+
+# The schema is frozen here rather than imported from apps.tasks.search, so
+# the migration keeps creating the same objects when the app code changes.
+SQLITE_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS tasks_task_search_ids (docid INTEGER PRIMARY KEY, task_id char(32) NOT NULL UNIQUE)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_task_fts USING fts5("
+    "owner, title, description, tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    """CREATE TRIGGER IF NOT EXISTS tasks_task_fts_insert AFTER INSERT ON tasks_task BEGIN
+        INSERT INTO tasks_task_search_ids (task_id) VALUES (new.id);
+        INSERT INTO tasks_task_fts (rowid, owner, title, description)
+        VALUES (last_insert_rowid(), 'u' || new.user_id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_task_fts_update AFTER UPDATE OF title, description, user_id ON tasks_task
+    WHEN old.title IS NOT new.title OR old.description IS NOT new.description OR old.user_id IS NOT new.user_id BEGIN
+        UPDATE tasks_task_fts SET owner = 'u' || new.user_id, title = new.title, description = new.description
+        WHERE rowid = (SELECT docid FROM tasks_task_search_ids WHERE task_id = old.id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_task_fts_delete AFTER DELETE ON tasks_task BEGIN
+        DELETE FROM tasks_task_fts WHERE rowid = (SELECT docid FROM tasks_task_search_ids WHERE task_id = old.id);
+        DELETE FROM tasks_task_search_ids WHERE task_id = old.id;
+    END""",
+    # Index the tasks that already exist; the triggers only see later writes
+    "INSERT INTO tasks_task_search_ids (task_id) SELECT id FROM tasks_task",
+    "INSERT INTO tasks_task_fts (rowid, owner, title, description) "
+    "SELECT ids.docid, 'u' || task.user_id, task.title, task.description "
+    "FROM tasks_task AS task JOIN tasks_task_search_ids AS ids ON ids.task_id = task.id",
+]
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS tasks_task_fts_insert",
+    "DROP TRIGGER IF EXISTS tasks_task_fts_update",
+    "DROP TRIGGER IF EXISTS tasks_task_fts_delete",
+    "DROP TABLE IF EXISTS tasks_task_fts",
+    "DROP TABLE IF EXISTS tasks_task_search_ids",
+]
+# A stored generated column is computed for existing rows when it is added
+POSTGRESQL_SCHEMA = [
+    """ALTER TABLE tasks_task ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple'::regconfig, coalesce(title, '')), 'A')
+        || setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'B')
+    ) STORED""",
+    "CREATE INDEX IF NOT EXISTS task_search_vector_idx ON tasks_task USING GIN (search_vector)",
+]
+POSTGRESQL_DROP = [
+    "DROP INDEX IF EXISTS task_search_vector_idx",
+    "ALTER TABLE tasks_task DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def install_search_index(apps, schema_editor):
+    """Create the index and its sync triggers and fill it; a no-op on backends without one"""
+    for statement in {"sqlite": SQLITE_SCHEMA, "postgresql": POSTGRESQL_SCHEMA}.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def uninstall_search_index(apps, schema_editor):
+    for statement in {"sqlite": SQLITE_DROP, "postgresql": POSTGRESQL_DROP}.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0010_task_daily_stats'),
+    ]
+
+    operations = [
+        # FTS5 table and triggers on SQLite, generated tsvector column and GIN index on PostgreSQL
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
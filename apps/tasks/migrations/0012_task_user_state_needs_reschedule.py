@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-17 23:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0011_task_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='taskuserstate',
+            name='task_state_stale_idx',
+        ),
+        migrations.AddField(
+            model_name='taskuserstate',
+            name='needs_reschedule',
+            field=models.BooleanField(default=True, verbose_name='Needs Reschedule'),
+        ),
+        migrations.AddIndex(
+            model_name='taskuserstate',
+            index=models.Index(condition=models.Q(('needs_reschedule', True)), fields=['user'], name='task_state_reschedule_idx'),
+        ),
+    ]
@@ -11,10 +11,9 @@ class TaskAccessMixin:
     def get_task_or_redirect(self, task_id: str, user: User, error_message: str = 'Task not found.') -> Optional[Task]:
         """Get task by ID and user, redirect if not found or not owned by user"""
         from .repository import TaskRepository
-        repository = TaskRepository()
-        task = repository.get_by_id(task_id)
+        task = TaskRepository().for_user(user).get_by_id(task_id)
         
-        if not task or task.user != user:
+        if not task:
             messages.error(self.request, error_message)
             return None
             
@@ -22,7 +21,8 @@ class TaskAccessMixin:
     
     def ensure_user_owns_task(self, task: Task, user: User) -> bool:
         """Check if user owns the task"""
-        return task.user == user
+        # Compare ids so the related User is never loaded
+        return task.user_id == user.pk
 
 
 class OverdueTaskMixin:
@@ -1,7 +1,8 @@
 from django.db import models
 from django.utils import timezone
 from django.contrib.auth.models import User
-from .constants import TASK_STATUS_CHOICES, TASK_STATUS_ACTIVE
+from .constants import TASK_STATUS_CHOICES, TASK_STATUS_ACTIVE, TASK_EVENT_CHOICES
+from .querysets import TaskQuerySet
 import uuid
 
 class Task(models.Model):
@@ -14,6 +15,9 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created At")
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=TASK_STATUS_ACTIVE, verbose_name="Status")
     reactivation_count = models.PositiveIntegerField(default=0, verbose_name="Reactivation Count")
+    # Bumped by every write (save() and TaskQuerySet.update_versioned); keys the card fragment cache
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Updated At")
+    version = models.PositiveIntegerField(default=0, verbose_name="Version")
     user = models.ForeignKey(
         User, 
         on_delete=models.CASCADE, 
@@ -21,32 +25,178 @@ class Task(models.Model):
         verbose_name="User"
     )
 
+    objects = TaskQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Task"
         verbose_name_plural = "Tasks"
         ordering = ["-created_at"]
+        indexes = [
+            # Per-user status lists, keyset-paginated on (created_at, id) (task_list)
+            models.Index(fields=["user", "status", "-created_at", "-id"], name="task_user_status_page_idx"),
+            # Per-user listing across statuses (api_task_list)
+            models.Index(fields=["user", "-created_at", "-id"], name="task_user_page_idx"),
+            # Per-user counts, overdue reconciliation and next-due watermark
+            models.Index(fields=["user", "status", "due_date"], name="task_user_status_due_idx"),
+            # Global status counts and forced overdue updates
+            models.Index(fields=["status", "due_date"], name="task_status_due_idx"),
+            # Overdue sweep: only active tasks can become overdue
+            models.Index(
+                fields=["due_date"],
+                name="task_active_due_idx",
+                condition=models.Q(status=TASK_STATUS_ACTIVE),
+            ),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.user.username}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            self.version += 1
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "version", "updated_at"}
+        super().save(*args, **kwargs)
     
+    # The properties below return the values annotated by
+    # TaskQuerySet.with_due_info() when present, so rendering a list does no
+    # per-row date math; otherwise they are computed against the current time.
+
     @property
     def is_overdue(self):
-        """Check if the task is overdue using local time"""
-        now = timezone.localtime(timezone.now())
-        due_local = timezone.localtime(self.due_date)
-        return now > due_local
+        """Check if the task is overdue"""
+        if "_is_overdue" in self.__dict__:
+            return self._is_overdue
+        return timezone.now() > self.due_date
+
+    @is_overdue.setter
+    def is_overdue(self, value):
+        self._is_overdue = value
     
     @property
     def days_until_due(self):
-        """Calculate the number of days until the task is due using local time"""
-        now = timezone.localtime(timezone.now())
-        due_local = timezone.localtime(self.due_date)
-        delta = due_local - now
-        return delta.days
+        """Calculate the number of whole days until the task is due (negative once overdue)"""
+        if "_days_until_due" in self.__dict__:
+            return self._days_until_due
+        return (self.due_date - timezone.now()).days
+
+    @days_until_due.setter
+    def days_until_due(self, value):
+        self._days_until_due = value
     
     @property
     def overdue_days(self):
-        """Calculate the number of days the task is overdue (positive number) using local time"""
+        """Calculate the number of days the task is overdue (positive number)"""
+        if "_overdue_days" in self.__dict__:
+            return self._overdue_days
         if self.is_overdue:
             return abs(self.days_until_due)
         return 0
+
+    @overdue_days.setter
+    def overdue_days(self, value):
+        self._overdue_days = value
+
+
+class TaskUserState(models.Model):
+    """Per-user bookkeeping used to skip redundant task maintenance"""
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='task_state',
+        verbose_name="User"
+    )
+    next_due_at = models.DateTimeField(null=True, blank=True, verbose_name="Next Due At")
+    # Set by writes; cleared by request-time reconciliation
+    is_stale = models.BooleanField(default=True, verbose_name="Is Stale")
+    # Set by the same writes; cleared only by the due-date scheduler
+    needs_reschedule = models.BooleanField(default=True, verbose_name="Needs Reschedule")
+    version = models.PositiveBigIntegerField(default=0, verbose_name="Version")
+    modified_at = models.DateTimeField(null=True, blank=True, verbose_name="Modified At")
+
+    class Meta:
+        verbose_name = "Task User State"
+        verbose_name_plural = "Task User States"
+        indexes = [
+            # Users the due-date scheduler must reschedule after a write
+            models.Index(fields=["user"], name="task_state_reschedule_idx", condition=models.Q(needs_reschedule=True)),
+        ]
+
+    def __str__(self):
+        return f"Task state - {self.user_id}"
+
+    def needs_reconciliation(self, now) -> bool:
+        """Check whether any active task can have become overdue since the last reconciliation"""
+        if self.is_stale:
+            return True
+        return self.next_due_at is not None and self.next_due_at <= now
+
+
+class TaskEvent(models.Model):
+    """
+    Append-only log of task status transitions, inserted in bulk in the
+    transaction of the UPDATE it records
+    """
+
+    # Not a foreign key: the history outlives deleted tasks
+    task_id = models.UUIDField(verbose_name="Task")
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='task_events',
+        # Covered by task_event_user_page_idx
+        db_index=False,
+        verbose_name="User"
+    )
+    event = models.CharField(max_length=20, choices=TASK_EVENT_CHOICES, verbose_name="Event")
+    occurred_at = models.DateTimeField(default=timezone.now, verbose_name="Occurred At")
+
+    class Meta:
+        verbose_name = "Task Event"
+        verbose_name_plural = "Task Events"
+        indexes = [
+            # Per-user timeline, keyset-paginated on (occurred_at, id)
+            models.Index(fields=["user", "-occurred_at", "-id"], name="task_event_user_page_idx"),
+            # Per-task timeline
+            models.Index(fields=["task_id", "-occurred_at", "-id"], name="task_event_task_page_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.event} - {self.task_id}"
+
+
+class TaskDailyStats(models.Model):
+    """
+    Per-user daily rollup of task activity, maintained incrementally by the
+    repository writes so trends never scan tasks. `backlog_change` is the
+    net change of the user's failed tasks that day; the overdue backlog at
+    any date is the running sum.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='task_daily_stats',
+        # Covered by the (user, day) unique constraint
+        db_index=False,
+        verbose_name="User"
+    )
+    day = models.DateField(verbose_name="Day")
+    created_count = models.PositiveIntegerField(default=0, verbose_name="Created")
+    completed_count = models.PositiveIntegerField(default=0, verbose_name="Completed")
+    failed_count = models.PositiveIntegerField(default=0, verbose_name="Failed")
+    reactivated_count = models.PositiveIntegerField(default=0, verbose_name="Reactivated")
+    backlog_change = models.IntegerField(default=0, verbose_name="Overdue Backlog Change")
+
+    class Meta:
+        verbose_name = "Task Daily Stats"
+        verbose_name_plural = "Task Daily Stats"
+        constraints = [
+            models.UniqueConstraint(fields=["user", "day"], name="task_daily_stats_user_day_uniq"),
+        ]
+
+    def __str__(self):
+        return f"Task stats - {self.user_id} - {self.day}"
@@ -0,0 +1,169 @@
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+from django.db import connections, models
+from django.db.models import Case, F, Func, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Abs
+from django.db.models.sql import DeleteQuery, UpdateQuery
+from django.utils import timezone
+
+
+class DaysUntil(Func):
+    """
+    Whole days from `now` until a datetime column, floored like
+    timedelta.days (due in 2 hours -> 0, due 2 hours ago -> -1).
+    Datetimes are stored in UTC, so no time zone conversion is needed.
+    """
+    output_field = models.IntegerField()
+
+    def __init__(self, expression, now: datetime, **extra):
+        super().__init__(expression, Value(now, output_field=models.DateTimeField()), **extra)
+
+    def _compile_operands(self, compiler, connection):
+        due, now = self.get_source_expressions()
+        due_sql, due_params = compiler.compile(due)
+        now_sql, now_params = compiler.compile(now)
+        return due_sql, tuple(due_params), now_sql, tuple(now_params)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        # PostgreSQL and other backends supporting EXTRACT(EPOCH FROM interval)
+        due_sql, due_params, now_sql, now_params = self._compile_operands(compiler, connection)
+        return f"CAST(FLOOR(EXTRACT(EPOCH FROM ({due_sql} - {now_sql})) / 86400) AS INTEGER)", due_params + now_params
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # CAST truncates toward zero; subtract one for negative fractions to floor
+        due_sql, due_params, now_sql, now_params = self._compile_operands(compiler, connection)
+        days = f"(julianday({due_sql}) - julianday({now_sql}))"
+        return f"(CAST({days} AS INTEGER) - ({days} < CAST({days} AS INTEGER)))", (due_params + now_params) * 3
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        due_sql, due_params, now_sql, now_params = self._compile_operands(compiler, connection)
+        return f"FLOOR(TIMESTAMPDIFF(SECOND, {now_sql}, {due_sql}) / 86400)", now_params + due_params
+
+
+def supports_update_returning(connection) -> bool:
+    """Whether the backend runs UPDATE ... RETURNING with a LIMITed IN subquery"""
+    if connection.vendor == "postgresql":
+        return True
+    # RETURNING arrived in SQLite 3.35 along with INSERT ... RETURNING
+    return connection.vendor == "sqlite" and connection.features.can_return_columns_from_insert
+
+
+def fetch_returning(connection, sql: str, params, fields: Sequence[models.Field]) -> List[Tuple]:
+    """Run a statement returning rows of the given fields, converted to their Python values"""
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    return [tuple(field.to_python(value) for field, value in zip(fields, row)) for row in rows]
+
+
+class TaskQuerySet(models.QuerySet):
+    """QuerySet with due-date annotations computed by the database"""
+
+    def update_versioned(self, **kwargs) -> int:
+        """
+        UPDATE the rows and bump their version and updated_at, which
+        QuerySet.update() skips, so cached card fragments go stale
+        """
+        return self.update(version=F("version") + 1, updated_at=timezone.now(), **kwargs)
+
+    async def aupdate_versioned(self, **kwargs) -> int:
+        """Async variant of update_versioned"""
+        return await self.aupdate(version=F("version") + 1, updated_at=timezone.now(), **kwargs)
+
+    def update_versioned_sql(self, **kwargs) -> Tuple[str, tuple]:
+        """The SQL and parameters of update_versioned(), for composing larger statements"""
+        self._for_write = True
+        query = self.query.chain(UpdateQuery)
+        query.add_update_values({"version": F("version") + 1, "updated_at": timezone.now(), **kwargs})
+        query.annotations = {}
+        return query.get_compiler(self.db).as_sql()
+
+    def update_versioned_returning_sql(
+        self, returning: Sequence[str], previous: Sequence[str] = (), **kwargs
+    ) -> Tuple[str, str, tuple, List[models.Field]]:
+        """
+        The parts of update_versioned() ... RETURNING, for composing larger
+        statements: the CTEs to prepend (empty without `previous`), the
+        UPDATE returning the `returning` fields of each updated row followed
+        by the values of its `previous` fields before the update, the
+        parameters of both and the fields of the returned columns.
+        Previous values come from a materialized CTE, read (and locked on
+        PostgreSQL) before the rows change. Requires a backend passing
+        supports_update_returning().
+        """
+        self._for_write = True
+        connection = connections[self.db]
+        qn = connection.ops.quote_name
+        table = qn(self.model._meta.db_table)
+        fields = [self.model._meta.get_field(name) for name in returning]
+        columns = [f"{table}.{qn(field.column)}" for field in fields]
+        if not previous:
+            update_sql, params = self.update_versioned_sql(**kwargs)
+            return "", f"{update_sql} RETURNING {', '.join(columns)}", tuple(params), fields
+
+        pk = qn(self.model._meta.pk.column)
+        previous_fields = [self.model._meta.get_field(name) for name in previous]
+        previous_columns = [qn(field.column) for field in previous_fields]
+        previous_rows = self.order_by().values_list("pk", *previous)
+        if connection.features.has_select_for_update:
+            previous_rows = previous_rows.select_for_update()
+        select_sql, select_params = previous_rows.query.get_compiler(self.db).as_sql()
+        update_sql, update_params = self.filter(
+            pk__in=RawSQL(f"SELECT {pk} FROM previous_rows", ())
+        ).update_versioned_sql(**kwargs)
+        columns += [
+            f"(SELECT previous_rows.{column} FROM previous_rows WHERE previous_rows.{pk} = {table}.{pk}) "
+            f"AS {qn('previous_' + field.column)}"
+            for field, column in zip(previous_fields, previous_columns)
+        ]
+        ctes = f"previous_rows ({pk}, {', '.join(previous_columns)}) AS MATERIALIZED ({select_sql})"
+        return ctes, f"{update_sql} RETURNING {', '.join(columns)}", (*select_params, *update_params), fields + previous_fields
+
+    def update_versioned_returning(self, returning: Sequence[str], previous: Sequence[str] = (), **kwargs) -> List[Tuple]:
+        """
+        update_versioned() in the same single statement, also returning the
+        `returning` fields of each updated row, followed by the values its
+        `previous` fields had before the update. Requires a backend passing
+        supports_update_returning().
+        """
+        ctes, sql, params, fields = self.update_versioned_returning_sql(returning, previous, **kwargs)
+        return fetch_returning(connections[self.db], f"WITH {ctes} {sql}" if ctes else sql, params, fields)
+
+    def delete_returning(self, returning: Sequence[str]) -> List[Tuple]:
+        """
+        DELETE the rows with a single statement returning the `returning`
+        fields of each deleted row. Like QuerySet._raw_delete() it skips
+        signals and cascades, which tasks have none of. Requires a backend
+        passing supports_update_returning().
+        """
+        self._for_write = True
+        connection = connections[self.db]
+        query = self.query.clone()
+        query.__class__ = DeleteQuery
+        sql, params = query.get_compiler(self.db).as_sql()
+        fields = [self.model._meta.get_field(name) for name in returning]
+        columns = ", ".join(connection.ops.quote_name(field.column) for field in fields)
+        return fetch_returning(connection, f"{sql} RETURNING {columns}", params, fields)
+
+    def with_due_info(self, now: Optional[datetime] = None) -> "TaskQuerySet":
+        """
+        Annotate is_overdue, days_until_due and overdue_days relative to a
+        single `now` (e.g. one per request). Task properties return these
+        annotations instead of recomputing them per row.
+        """
+        now = now or timezone.now()
+        days_until_due = DaysUntil("due_date", now)
+        return self.annotate(
+            is_overdue=Case(
+                When(due_date__lt=now, then=Value(True)),
+                default=Value(False),
+                output_field=models.BooleanField(),
+            ),
+            days_until_due=days_until_due,
+            overdue_days=Case(
+                When(due_date__lt=now, then=Abs(days_until_due)),
+                default=Value(0),
+                output_field=models.IntegerField(),
+            ),
+        )
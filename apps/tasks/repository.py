@@ -1,16 +1,465 @@
+from asgiref.sync import sync_to_async
 from django.utils import timezone
-from django.db.models import QuerySet
+from django.db import connections, router, transaction
+from django.db.models import QuerySet, Min, Count, Q, F, Sum
+from django.db.models.functions import TruncMonth
 from django.contrib.auth.models import User
-from typing import Optional
-from .models import Task
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from collections import Counter, defaultdict
+from datetime import date, datetime
+import asyncio
+import uuid
+from .models import Task, TaskDailyStats, TaskEvent, TaskUserState
 from .core.base_repository import BaseRepository
-from .constants import TASK_STATUS_ACTIVE, TASK_STATUS_COMPLETED, TASK_STATUS_FAILED
+from .core.pagination import KeysetPage
+from .cache import TaskStatusCache
+from .events import get_broker
+from .querysets import fetch_returning, supports_update_returning
+from .search import TaskSearchIndex
+from .routing import record_write
+from .constants import (
+    TASK_STATUS_ACTIVE,
+    TASK_STATUS_COMPLETED,
+    TASK_STATUS_FAILED,
+    TASK_COMPLETABLE_STATUSES,
+    TASK_EVENT_COMPLETED,
+    TASK_EVENT_FAILED,
+    TASK_EVENT_REACTIVATED,
+    TASK_STATUS_EVENTS,
+    TASK_EVENT_STATS,
+    TASK_STATS_FIELDS,
+    TASK_TRENDS_MONTHS,
+    OVERDUE_SWEEP_BATCH_SIZE,
+    TASK_LIST_PAGE_SIZE,
+    TASK_TIMELINE_PAGE_SIZE,
+    SEARCH_PAGE_SIZE,
+    BULK_RESULT_COMPLETED,
+    BULK_RESULT_REACTIVATED,
+    BULK_RESULT_DELETED,
+    BULK_RESULT_NOT_FOUND,
+    BULK_RESULT_INVALID_STATUS,
+    TASK_DETAIL_FIELDS,
+)
+
+class TaskUserStateRepository(BaseRepository[TaskUserState]):
+    """Repository for TaskUserState model"""
+
+    def __init__(self):
+        super().__init__(TaskUserState)
+    
+    def get_for_user(self, user: User) -> TaskUserState:
+        """Get the state row for a user, creating a stale one if missing"""
+        state, _ = self.get_or_create(user=user)
+        return state
+    
+    def get_by_user_id(self, user_id) -> Optional[TaskUserState]:
+        """Get the state row for a user without creating it"""
+        return self.filter(user_id=user_id).first()
+    
+    async def aget_for_user(self, user: User) -> TaskUserState:
+        """Async variant of get_for_user"""
+        state, _ = await self.aget_or_create(user=user)
+        return state
+    
+    async def aget_by_user_id(self, user_id) -> Optional[TaskUserState]:
+        """Async variant of get_by_user_id"""
+        return await self.filter(user_id=user_id).afirst()
+    
+    def touch(self, user_ids: Iterable, reschedule: bool = True) -> int:
+        """
+        Bump the task version of the given users in a single UPDATE.
+        `reschedule` also invalidates their due-date watermark, both for
+        request-time reconciliation and for the due-date scheduler.
+        """
+        user_ids = set(user_ids)
+        now = timezone.now()
+        changes = {"version": F("version") + 1, "modified_at": now}
+        if reschedule:
+            changes["is_stale"] = True
+            changes["needs_reschedule"] = True
+        
+        updated_count = self.filter(user_id__in=user_ids).update(**changes)
+        if updated_count < len(user_ids):
+            existing = set(self.filter(user_id__in=user_ids).values_list("user_id", flat=True))
+            self.model.objects.bulk_create(
+                [
+                    TaskUserState(user_id=user_id, version=1, modified_at=now)
+                    for user_id in user_ids - existing
+                ],
+                ignore_conflicts=True,
+            )
+        return len(user_ids)
+    
+    def claim(self, user_id) -> int:
+        """Mark the watermark as fresh before recomputing it; concurrent writers re-stale it"""
+        return self.filter(user_id=user_id).update(is_stale=False)
+    
+    def store_watermark(self, user_id, next_due_at) -> int:
+        """Store a recomputed watermark unless it was invalidated in the meantime"""
+        return self.filter(user_id=user_id, is_stale=False).update(next_due_at=next_due_at)
+    
+    def claim_reschedule(self, user_ids: Iterable) -> int:
+        """
+        The scheduler's claim(): clear its own reschedule flag with a single
+        UPDATE, leaving is_stale to request-time reconciliation so neither
+        consumes the other's signal
+        """
+        return self.filter(user_id__in=set(user_ids)).update(needs_reschedule=False)
+    
+    def store_scheduled_watermarks(self, next_due_dates: Dict[int, Optional[datetime]]) -> int:
+        """
+        Store watermarks recomputed by the scheduler unless a write flagged
+        the user again; users without active tasks share one UPDATE
+        """
+        updated_count = 0
+        cleared = [user_id for user_id, next_due_at in next_due_dates.items() if next_due_at is None]
+        if cleared:
+            updated_count += self.filter(user_id__in=cleared, needs_reschedule=False).update(next_due_at=None)
+        for user_id, next_due_at in next_due_dates.items():
+            if next_due_at is not None:
+                updated_count += self.filter(user_id=user_id, needs_reschedule=False).update(next_due_at=next_due_at)
+        return updated_count
+    
+    def get_reschedule_user_ids(self) -> List[int]:
+        """Get the users written to since the scheduler last computed their due date"""
+        return list(self.filter(needs_reschedule=True).values_list("user_id", flat=True))
+    
+    def get_scheduled(self) -> List[Tuple[int, datetime]]:
+        """Get the stored watermark of every user with active tasks, as last computed for the scheduler"""
+        return list(self.filter(needs_reschedule=False, next_due_at__isnull=False).values_list("user_id", "next_due_at"))
+    
+    async def aclaim(self, user_id) -> int:
+        """Async variant of claim"""
+        return await self.filter(user_id=user_id).aupdate(is_stale=False)
+    
+    async def astore_watermark(self, user_id, next_due_at) -> int:
+        """Async variant of store_watermark"""
+        return await self.filter(user_id=user_id, is_stale=False).aupdate(next_due_at=next_due_at)
+
+
+class TaskEventRepository(BaseRepository[TaskEvent]):
+    """Repository for TaskEvent model"""
+
+    def __init__(self):
+        super().__init__(TaskEvent)
+    
+    def log(self, rows: Iterable[Tuple[uuid.UUID, int]], event: str, occurred_at: Optional[datetime] = None) -> List[TaskEvent]:
+        """Append one event per (task_id, user_id) row with a single INSERT"""
+        if occurred_at is None:
+            occurred_at = timezone.now()
+        return self.bulk_create([
+            TaskEvent(task_id=task_id, user_id=user_id, event=event, occurred_at=occurred_at)
+            for task_id, user_id in rows
+        ])
+    
+    def log_update(
+        self,
+        queryset: QuerySet[Task],
+        event: str,
+        occurred_at: datetime,
+        returning: Sequence[str] = ("id", "user_id"),
+        previous: Sequence[str] = (),
+        **changes,
+    ) -> List[Tuple]:
+        """
+        PostgreSQL only: update_versioned() the tasks of `queryset` and append
+        their events in one statement, feeding UPDATE ... RETURNING into the
+        INSERT through a CTE. Returns the `returning` fields (starting with
+        id and user_id) and the `previous` values of the changed tasks.
+        """
+        ctes, update_sql, params, fields = queryset.update_versioned_returning_sql(returning, previous, **changes)
+        connection = connections[queryset.db]
+        qn = connection.ops.quote_name
+        sql = (
+            f"WITH {ctes + ', ' if ctes else ''}changed AS ({update_sql}), "
+            f"logged AS (INSERT INTO {qn(self.model._meta.db_table)} ({qn('task_id')}, {qn('user_id')}, {qn('event')}, {qn('occurred_at')}) "
+            f"SELECT {qn('id')}, {qn('user_id')}, %s, %s FROM changed) "
+            f"SELECT * FROM changed"
+        )
+        return fetch_returning(connection, sql, (*params, event, connection.ops.adapt_datetimefield_value(occurred_at)), fields)
+    
+    def get_timeline_page(
+        self,
+        user: User,
+        task_id: Optional[uuid.UUID] = None,
+        cursor: Optional[str] = None,
+        page_size: int = TASK_TIMELINE_PAGE_SIZE,
+    ) -> KeysetPage[TaskEvent]:
+        """
+        Get a keyset-paginated page of a user's events (optionally of one
+        task), newest first. Raises ValueError if the cursor is malformed.
+        """
+        queryset = self.filter(user=user)
+        if task_id is not None:
+            queryset = queryset.filter(task_id=task_id)
+        return self.get_keyset_page(queryset, cursor=cursor, page_size=page_size, order_field="occurred_at")
+
+
+class TaskDailyStatsRepository(BaseRepository[TaskDailyStats]):
+    """Repository for TaskDailyStats model"""
+
+    def __init__(self):
+        super().__init__(TaskDailyStats)
+    
+    def record(self, deltas: Dict[Tuple[int, date], Dict[str, int]]) -> int:
+        """
+        Add counter changes to the (user_id, day) rollup rows, creating the
+        missing ones. SQLite and PostgreSQL apply them all with one
+        INSERT ... ON CONFLICT DO UPDATE; other backends update row by row.
+        Returns the number of rollup rows changed.
+        """
+        deltas = {key: changes for key, changes in deltas.items() if any(changes.values())}
+        if not deltas:
+            return 0
+        connection = connections[router.db_for_write(TaskDailyStats)]
+        if connection.vendor not in ("sqlite", "postgresql"):
+            for (user_id, day), changes in deltas.items():
+                increments = {field: F(field) + value for field, value in changes.items()}
+                if not self.filter(user_id=user_id, day=day).update(**increments):
+                    _, created = self.get_or_create(user_id=user_id, day=day, defaults=dict(changes))
+                    if not created:
+                        self.filter(user_id=user_id, day=day).update(**increments)
+            return len(deltas)
+        
+        qn = connection.ops.quote_name
+        table = qn(self.model._meta.db_table)
+        columns = ", ".join(qn(column) for column in ("user_id", "day", *TASK_STATS_FIELDS))
+        row = "(" + ", ".join(["%s"] * (len(TASK_STATS_FIELDS) + 2)) + ")"
+        increments = ", ".join(f"{qn(field)} = {table}.{qn(field)} + excluded.{qn(field)}" for field in TASK_STATS_FIELDS)
+        params = []
+        for (user_id, day), changes in deltas.items():
+            params += [user_id, connection.ops.adapt_datefield_value(day)]
+            params += [changes.get(field, 0) for field in TASK_STATS_FIELDS]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) VALUES {', '.join([row] * len(deltas))} "
+                f"ON CONFLICT ({qn('user_id')}, {qn('day')}) DO UPDATE SET {increments}",
+                params,
+            )
+        return len(deltas)
+    
+    def get_monthly_trends(self, user: User, months: int = TASK_TRENDS_MONTHS, today: Optional[date] = None) -> List[Dict]:
+        """
+        Get the user's monthly totals over the last `months` months (oldest
+        first, current month included) from the rollups alone: one grouped
+        query for the months and one for the backlog level before them.
+        Each month carries its completion rate (completed out of completed
+        and failed, None without either) and the overdue backlog at its end.
+        """
+        today = today or timezone.localdate()
+        month_index = today.year * 12 + today.month - 1 - (months - 1)
+        start = date(month_index // 12, month_index % 12 + 1, 1)
+        
+        totals = {
+            row.pop("month"): row
+            for row in self.filter(user=user, day__gte=start, day__lte=today)
+            .annotate(month=TruncMonth("day"))
+            .order_by()
+            .values("month")
+            .annotate(**{field: Sum(field) for field in TASK_STATS_FIELDS})
+        }
+        backlog = self.filter(user=user, day__lt=start).aggregate(level=Sum("backlog_change"))["level"] or 0
+        
+        trends = []
+        for index in range(month_index, month_index + months):
+            month = date(index // 12, index % 12 + 1, 1)
+            row = totals.get(month, {})
+            counts = {field: row.get(field) or 0 for field in TASK_STATS_FIELDS}
+            backlog += counts.pop("backlog_change")
+            resolved = counts["completed_count"] + counts["failed_count"]
+            trends.append({
+                "month": month,
+                **counts,
+                "completion_rate": counts["completed_count"] / resolved if resolved else None,
+                "overdue_backlog": backlog,
+            })
+        return trends
+
 
 class TaskRepository(BaseRepository[Task]):
     """Repository for Task model"""
 
     def __init__(self):
         super().__init__(Task)
+        self.user_states = TaskUserStateRepository()
+        self.events = TaskEventRepository()
+        self.daily_stats = TaskDailyStatsRepository()
+        self.search_index = TaskSearchIndex()
+        self.status_cache = TaskStatusCache()
+    
+    def create(self, **kwargs) -> Task:
+        """Create a task, count it in the daily stats and invalidate its owner's derived state"""
+        with transaction.atomic(savepoint=False):
+            task = super().create(**kwargs)
+            self._record_stats(self._creation_stats([task]))
+            self._tasks_changed([task.user_id])
+        return task
+    
+    def update(self, instance: Task, **kwargs) -> Task:
+        """Update a task, record a status change and invalidate its owner's derived state"""
+        previous_status = instance.status
+        with transaction.atomic(savepoint=False):
+            task = super().update(instance, **kwargs)
+            if task.status != previous_status:
+                event = TASK_STATUS_EVENTS[task.status]
+                self.events.log([(task.pk, task.user_id)], event)
+                self._record_stats([(task.user_id, self._transition_stats(event, previous_status, task.status))])
+            self._tasks_changed([task.user_id])
+        return task
+    
+    def bulk_create(self, instances, batch_size: Optional[int] = None):
+        """Bulk create tasks, count them in the daily stats and invalidate their owners' derived state"""
+        with transaction.atomic(savepoint=False):
+            tasks = super().bulk_create(instances, batch_size=batch_size)
+            self._record_stats(self._creation_stats(tasks))
+            self._tasks_changed(task.user_id for task in tasks)
+        return tasks
+    
+    def delete(self, instance: Task) -> bool:
+        """Delete a task, shrink the overdue backlog if it was failed and invalidate its owner's derived state"""
+        user_id, status = instance.user_id, instance.status
+        with transaction.atomic(savepoint=False):
+            deleted = super().delete(instance)
+            if deleted:
+                self._record_stats(self._deletion_stats([(user_id, status)]))
+                self._tasks_changed([user_id])
+        return deleted
+    
+    async def acreate(self, **kwargs) -> Task:
+        """Async variant of create; it runs on the ORM thread since async code has no transactions"""
+        return await sync_to_async(self.create)(**kwargs)
+    
+    async def aupdate(self, instance: Task, **kwargs) -> Task:
+        """Async variant of update; it runs on the ORM thread since async code has no transactions"""
+        return await sync_to_async(self.update)(instance, **kwargs)
+    
+    async def adelete(self, instance: Task) -> bool:
+        """Async variant of delete; it runs on the ORM thread since async code has no transactions"""
+        return await sync_to_async(self.delete)(instance)
+    
+    def _tasks_changed(self, user_ids: Iterable, reschedule: bool = True):
+        """
+        Invalidate per-user derived state after tasks of these users changed:
+        pins their reads to the primary, bumps their task version, drops
+        their cached counts and, once the transaction commits, notifies
+        their open event streams.
+        `reschedule` also invalidates the due-date watermark; status-only
+        transitions to failed can skip it since an early watermark is harmless.
+        """
+        user_ids = set(user_ids)
+        if not user_ids:
+            return
+        # Later reads of these users must not hit a lagging replica
+        record_write(user_ids)
+        self.user_states.touch(user_ids, reschedule=reschedule)
+        self.status_cache.invalidate_many(user_ids)
+        transaction.on_commit(lambda: get_broker().publish_many(user_ids, {"type": "tasks_changed"}))
+    
+    def tasks_changed_elsewhere(self, user_ids: Iterable):
+        """
+        Invalidate the derived state (task version, cached counts, due-date
+        watermark) of users whose tasks were saved or deleted outside the
+        repository, e.g. from the admin
+        """
+        self._tasks_changed(user_id for user_id in user_ids if user_id is not None)
+    
+    async def _atasks_changed(self, user_ids: Iterable, reschedule: bool = True):
+        """
+        Async variant of _tasks_changed. It runs on the thread owning the
+        database connection, so on_commit hooks join the right transaction.
+        """
+        await sync_to_async(self._tasks_changed)(set(user_ids), reschedule=reschedule)
+    
+    def _record_stats(self, changes: Iterable[Tuple[int, Dict[str, int]]], now: Optional[datetime] = None):
+        """Add the counter changes of each (user_id, changes) pair to the users' rollup row of the day"""
+        day = timezone.localdate(now)
+        deltas: Dict[Tuple[int, date], Counter] = defaultdict(Counter)
+        for user_id, task_changes in changes:
+            deltas[(user_id, day)].update(task_changes)
+        self.daily_stats.record(deltas)
+    
+    @staticmethod
+    def _transition_stats(event: str, previous_status: str, status: str) -> Dict[str, int]:
+        """Rollup changes of one task moving from `previous_status` to `status`"""
+        return {
+            TASK_EVENT_STATS[event]: 1,
+            "backlog_change": (status == TASK_STATUS_FAILED) - (previous_status == TASK_STATUS_FAILED),
+        }
+    
+    @staticmethod
+    def _creation_stats(tasks: Iterable[Task]) -> Iterator[Tuple[int, Dict[str, int]]]:
+        for task in tasks:
+            yield task.user_id, {"created_count": 1, "backlog_change": int(task.status == TASK_STATUS_FAILED)}
+    
+    @staticmethod
+    def _deletion_stats(rows: Iterable[Tuple[int, str]]) -> Iterator[Tuple[int, Dict[str, int]]]:
+        for user_id, status in rows:
+            if status == TASK_STATUS_FAILED:
+                yield user_id, {"backlog_change": -1}
+    
+    def _transition(
+        self,
+        queryset: QuerySet[Task],
+        event: str,
+        previous_status: Union[str, Tuple[str, ...]],
+        reschedule: bool = False,
+        limit: Optional[int] = None,
+        now: Optional[datetime] = None,
+        returning: Sequence[str] = (),
+        **changes,
+    ) -> List[Tuple]:
+        """
+        Apply a status transition from `previous_status` (or any of several
+        statuses) to the tasks of `queryset` (at most `limit` of them), which
+        must all have that status, and append one TaskEvent and a daily stats
+        change per changed task, in one transaction:
+        a single statement on PostgreSQL, UPDATE ... RETURNING plus one bulk
+        INSERT on SQLite, and locked reads before the UPDATE elsewhere.
+        Returns the (id, user_id, *returning) of the changed tasks, followed
+        by their previous status when several were possible.
+        """
+        if now is None:
+            now = timezone.now()
+        returning = ("id", "user_id", *returning)
+        previous = ("status",) if isinstance(previous_status, tuple) else ()
+        connection = connections[router.db_for_write(Task)]
+        if limit is not None and connection.features.allow_sliced_subqueries_with_in:
+            queryset = self._limit_subquery(queryset, limit)
+            limit = None
+        
+        # No savepoint: callers' transactions roll back as a whole on errors
+        with transaction.atomic(savepoint=False):
+            if connection.vendor == "postgresql":
+                rows = self.events.log_update(queryset, event, now, returning=returning, previous=previous, **changes)
+            elif supports_update_returning(connection):
+                rows = queryset.update_versioned_returning(returning, previous=previous, **changes)
+                if rows:
+                    self.events.log([row[:2] for row in rows], event, occurred_at=now)
+            else:
+                rows = list(queryset.select_for_update().order_by("pk").values_list(*returning, *previous)[:limit])
+                if rows:
+                    self.filter(id__in=[row[0] for row in rows]).update_versioned(**changes)
+                    self.events.log([row[:2] for row in rows], event, occurred_at=now)
+            if rows:
+                self._record_stats(
+                    ((row[1], self._transition_stats(event, row[-1] if previous else previous_status, changes["status"])) for row in rows),
+                    now,
+                )
+                self._tasks_changed((row[1] for row in rows), reschedule=reschedule)
+        return rows
+    
+    @staticmethod
+    def _limit_subquery(queryset: QuerySet[Task], limit: int) -> QuerySet[Task]:
+        """
+        At most `limit` tasks of `queryset`, picked by an unordered LIMIT
+        subquery so any index on its filters can serve it; the outer filters
+        re-check rows changed since the subquery read them
+        """
+        return queryset.filter(pk__in=queryset.order_by().values("pk")[:limit])
+    
+    def for_user(self, user: User) -> "UserTaskRepository":
+        """Get a repository whose every query is restricted to the user's tasks"""
+        return UserTaskRepository(self, user)
     
     def get_tasks_by_status_and_user(self, status: str, user: User) -> QuerySet[Task]:
         """Get tasks by status for a specific user"""
@@ -28,6 +477,48 @@ class TaskRepository(BaseRepository[Task]):
         """Get all failed tasks for a user"""
         return self.get_tasks_by_status_and_user(TASK_STATUS_FAILED, user)
     
+    def get_tasks_page_by_user(
+        self,
+        user: User,
+        status: Optional[str] = None,
+        cursor: Optional[str] = None,
+        page_size: int = TASK_LIST_PAGE_SIZE,
+        now: Optional[datetime] = None,
+    ) -> KeysetPage[Task]:
+        """
+        Get a keyset-paginated page of a user's tasks, newest first, optionally
+        by status. With `now`, the tasks carry due-date annotations relative to it.
+        """
+        return self.get_keyset_page(self._tasks_page_queryset(user, status, now), cursor=cursor, page_size=page_size)
+    
+    async def aget_tasks_page_by_user(
+        self,
+        user: User,
+        status: Optional[str] = None,
+        cursor: Optional[str] = None,
+        page_size: int = TASK_LIST_PAGE_SIZE,
+        now: Optional[datetime] = None,
+    ) -> KeysetPage[Task]:
+        """Async variant of get_tasks_page_by_user"""
+        return await self.aget_keyset_page(self._tasks_page_queryset(user, status, now), cursor=cursor, page_size=page_size)
+    
+    def _tasks_page_queryset(self, user: User, status: Optional[str], now: Optional[datetime]) -> QuerySet[Task]:
+        queryset = self.filter(user=user)
+        if status:
+            queryset = queryset.filter(status=status)
+        if now is not None:
+            queryset = queryset.with_due_info(now)
+        return queryset
+    
+    def get_export_queryset(self, user: Optional[User] = None) -> QuerySet[Task]:
+        """
+        Get the tasks to export: a user's tasks newest first (served by the
+        keyset index), or all tasks unordered so streaming starts immediately.
+        """
+        if user is None:
+            return self.get_all().order_by()
+        return self.filter(user=user).order_by("-created_at", "-id")
+    
     def get_overdue_tasks_by_user(self, user: User) -> QuerySet[Task]:
         """Get all overdue tasks (regardless of status) using local time"""
         now = timezone.localtime(timezone.now())
@@ -54,25 +545,39 @@ class TaskRepository(BaseRepository[Task]):
         now = timezone.localtime(timezone.now())
         return self.filter(due_date__lt=now)
     
+    def get_status_counts_by_user(self, user: User, now=None) -> Dict[str, int]:
+        """Get per-status and overdue task counts for a user in a single query"""
+        return self._aggregate_status_counts(self.filter(user=user), now)
+    
+    def get_status_counts(self, now=None) -> Dict[str, int]:
+        """Get per-status and overdue task counts (all users) in a single query"""
+        return self._aggregate_status_counts(self.get_all(), now)
+    
+    async def aget_status_counts_by_user(self, user: User, now=None) -> Dict[str, int]:
+        """Async variant of get_status_counts_by_user"""
+        return await self.filter(user=user).aaggregate(**self._status_count_aggregates(now))
+    
+    def _aggregate_status_counts(self, queryset: QuerySet[Task], now=None) -> Dict[str, int]:
+        """Count tasks per status with conditional aggregation"""
+        return queryset.aggregate(**self._status_count_aggregates(now))
+    
+    @staticmethod
+    def _status_count_aggregates(now=None) -> Dict[str, Count]:
+        if now is None:
+            now = timezone.now()
+        return {
+            "active_count": Count("id", filter=Q(status=TASK_STATUS_ACTIVE)),
+            "completed_count": Count("id", filter=Q(status=TASK_STATUS_COMPLETED)),
+            "failed_count": Count("id", filter=Q(status=TASK_STATUS_FAILED)),
+            "overdue_count": Count("id", filter=Q(due_date__lt=now)),
+        }
+    
     def update_task_status(self) -> int:
         """
         Automatically update task status based on due date and current date.
         Returns the number of tasks that were updated.
         """
-        # Find all active tasks that are overdue using local time
-        now = timezone.localtime(timezone.now())
-        overdue_active_tasks = self.filter(
-            status=TASK_STATUS_ACTIVE, 
-            due_date__lt=now
-        )
-        
-        updated_count = overdue_active_tasks.count()
-        
-        if updated_count > 0:
-            # Update all overdue active tasks to failed status
-            overdue_active_tasks.update(status="failed")
-        
-        return updated_count
+        return self.ensure_overdue_tasks_are_failed()
     
     def ensure_overdue_tasks_are_failed(self) -> int:
         """
@@ -80,50 +585,434 @@ class TaskRepository(BaseRepository[Task]):
         This is a more comprehensive method that checks all tasks.
         Returns the number of tasks that were updated.
         """
-        # Find all overdue tasks that are still active using local time
-        now = timezone.localtime(timezone.now())
-        overdue_active_tasks = self.filter(
-            status="active", 
-            due_date__lt=now
+        return sum(self.fail_overdue_tasks_in_batches())
+    
+    def _overdue_active_tasks(self, now: datetime) -> QuerySet[Task]:
+        return self.filter(status=TASK_STATUS_ACTIVE, due_date__lt=now)
+    
+    def get_overdue_sweep_chunk(self, batch_size: int = OVERDUE_SWEEP_BATCH_SIZE, now=None) -> QuerySet[Task]:
+        """The tasks one chunk of fail_overdue_tasks_in_batches() updates, e.g. to explain its plan"""
+        return self._limit_subquery(self._overdue_active_tasks(now or timezone.now()), batch_size)
+    
+    def fail_overdue_tasks_in_batches(self, batch_size: int = OVERDUE_SWEEP_BATCH_SIZE, now=None) -> Iterator[int]:
+        """
+        Mark overdue active tasks as failed in chunks of at most `batch_size`,
+        so memory and lock time stay bounded. Each chunk runs in its own
+        transaction with its TaskEvent rows.
+        Yields the number of tasks updated per chunk.
+        """
+        if now is None:
+            now = timezone.now()
+        
+        # Failed rows stop matching, so the next chunk needs no cursor
+        overdue_active_tasks = self._overdue_active_tasks(now)
+        while True:
+            rows = self._transition(
+                overdue_active_tasks,
+                TASK_EVENT_FAILED,
+                TASK_STATUS_ACTIVE,
+                limit=batch_size,
+                now=now,
+                status=TASK_STATUS_FAILED,
+            )
+            if rows:
+                yield len(rows)
+            if len(rows) < batch_size:
+                return
+    
+    def reconcile_overdue_tasks_for_user(self, user: User, state: Optional[TaskUserState] = None) -> int:
+        """
+        Mark the user's overdue active tasks as failed.
+        Does nothing until the user's earliest active due date (the watermark)
+        has passed or the watermark was invalidated by a write.
+        An already fetched `state` row saves the watermark lookup.
+        Returns the number of tasks that were updated.
+        """
+        now = timezone.now()
+        if state is None:
+            state = self.user_states.get_for_user(user)
+        if not state.needs_reconciliation(now):
+            return 0
+        
+        self.user_states.claim(user.pk)
+        updated_count = len(self._transition(
+            self.filter(user=user, status=TASK_STATUS_ACTIVE, due_date__lt=now),
+            TASK_EVENT_FAILED,
+            TASK_STATUS_ACTIVE,
+            now=now,
+            status=TASK_STATUS_FAILED,
+        ))
+        
+        next_due_at = self.filter(user=user, status=TASK_STATUS_ACTIVE).aggregate(
+            next_due_at=Min("due_date")
+        )["next_due_at"]
+        self.user_states.store_watermark(user.pk, next_due_at)
+        
+        return updated_count
+    
+    def fail_due_tasks_for_users(self, user_ids: Iterable, now: Optional[datetime] = None) -> int:
+        """
+        Mark the overdue active tasks of the given users as failed with a
+        single UPDATE. Returns the number of tasks that were updated.
+        """
+        if now is None:
+            now = timezone.now()
+        return len(self._transition(
+            self.filter(user_id__in=set(user_ids), status=TASK_STATUS_ACTIVE, due_date__lt=now),
+            TASK_EVENT_FAILED,
+            TASK_STATUS_ACTIVE,
+            now=now,
+            status=TASK_STATUS_FAILED,
+        ))
+    
+    def refresh_next_due_dates(self, user_ids: Iterable) -> Dict[int, Optional[datetime]]:
+        """
+        Recompute and store the watermark of the given users with one grouped
+        query. Returns each user's earliest active due date (None without
+        active tasks).
+        """
+        user_ids = set(user_ids)
+        self.user_states.claim_reschedule(user_ids)
+        next_due_dates = dict.fromkeys(user_ids)
+        next_due_dates.update(
+            self.filter(user_id__in=user_ids, status=TASK_STATUS_ACTIVE)
+            .order_by()
+            .values("user_id")
+            .annotate(next_due_at=Min("due_date"))
+            .values_list("user_id", "next_due_at")
+        )
+        self.user_states.store_scheduled_watermarks(next_due_dates)
+        return next_due_dates
+    
+    def get_unscheduled_user_ids(self) -> List[int]:
+        """Get the users owning active tasks but no TaskUserState row"""
+        return list(
+            self.filter(status=TASK_STATUS_ACTIVE, user__task_state__isnull=True)
+            .order_by()
+            .values_list("user_id", flat=True)
+            .distinct()
         )
+    
+    async def areconcile_overdue_tasks_for_user(self, user: User, state: Optional[TaskUserState] = None) -> int:
+        """Async variant of reconcile_overdue_tasks_for_user"""
+        now = timezone.now()
+        if state is None:
+            state = await self.user_states.aget_for_user(user)
+        if not state.needs_reconciliation(now):
+            return 0
         
-        updated_count = overdue_active_tasks.count()
+        await self.user_states.aclaim(user.pk)
+        # Transactions are not available to async code: the transition runs on the ORM thread
+        rows = await sync_to_async(self._transition)(
+            self.filter(user=user, status=TASK_STATUS_ACTIVE, due_date__lt=now),
+            TASK_EVENT_FAILED,
+            TASK_STATUS_ACTIVE,
+            now=now,
+            status=TASK_STATUS_FAILED,
+        )
+        updated_count = len(rows)
         
-        if updated_count > 0:
-            # Use bulk update for better performance
-            tasks_to_update = list(overdue_active_tasks)
-            for task in tasks_to_update:
-                task.status = TASK_STATUS_FAILED
-            
-            self.bulk_update(tasks_to_update, ['status'])
+        next_due_at = (await self.filter(user=user, status=TASK_STATUS_ACTIVE).aaggregate(
+            next_due_at=Min("due_date")
+        ))["next_due_at"]
+        await self.user_states.astore_watermark(user.pk, next_due_at)
         
         return updated_count
     
     def force_update_all_overdue_tasks(self) -> int:
         """Force update all overdue tasks regardless of current status"""
-        all_overdue_tasks = self.filter(due_date__lt=timezone.now())
-        active_overdue_tasks = all_overdue_tasks.filter(status=TASK_STATUS_ACTIVE)
-        updated_count = active_overdue_tasks.count()
-        if updated_count > 0:
-            active_overdue_tasks.update(status=TASK_STATUS_FAILED)
-        return updated_count
+        # Only active tasks can transition to failed
+        return self.ensure_overdue_tasks_are_failed()
+    
+    def get_cached_status_counts_by_user(self, user: User, state: Optional[TaskUserState] = None) -> Tuple[Dict[str, int], int]:
+        """
+        Read-through cached variant of get_status_counts_by_user for polling clients.
+        Cached counts are only trusted while the user's task version is
+        unchanged, so writes of other processes are seen even when their
+        invalidation cannot reach this cache. On a miss the user's overdue
+        tasks are reconciled first, and the entry never outlives the user's
+        next due date so it cannot hide a transition.
+        An already fetched `state` row saves the version lookup.
+        Returns the counts and the number of tasks marked as failed.
+        """
+        if state is None:
+            state = self.user_states.get_by_user_id(user.pk)
+        if state is not None:
+            counts = self.status_cache.get(user.pk, state.version)
+            if counts is not None:
+                return counts, 0
+        
+        updated_count = self.reconcile_overdue_tasks_for_user(user, state)
+        # The version is read before counting: a write in between leaves the entry stale, never wrong
+        state = self.user_states.get_for_user(user)
+        now = timezone.now()
+        counts = self.get_status_counts_by_user(user, now=now)
+        timeout = (state.next_due_at - now).total_seconds() if state.next_due_at else None
+        self.status_cache.set(user.pk, counts, state.version, timeout)
+        return counts, updated_count
+    
+    async def aget_cached_status_counts_by_user(self, user: User, state: Optional[TaskUserState] = None) -> Tuple[Dict[str, int], int]:
+        """Async variant of get_cached_status_counts_by_user"""
+        if state is None:
+            state = await self.user_states.aget_by_user_id(user.pk)
+        if state is not None:
+            counts = await self.status_cache.aget(user.pk, state.version)
+            if counts is not None:
+                return counts, 0
+        
+        updated_count = await self.areconcile_overdue_tasks_for_user(user, state)
+        state = await self.user_states.aget_for_user(user)
+        now = timezone.now()
+        counts = await self.aget_status_counts_by_user(user, now=now)
+        timeout = (state.next_due_at - now).total_seconds() if state.next_due_at else None
+        await self.status_cache.aset(user.pk, counts, state.version, timeout)
+        return counts, updated_count
     
     def complete_task(self, task_id: str, user: User) -> Optional[Task]:
-        """Mark a task as completed"""
-        task = self.get_by_id(task_id)
-        if task and task.user == user and task.status != TASK_STATUS_COMPLETED:
-            return self.update(task, status=TASK_STATUS_COMPLETED)
+        """Mark a task as completed and return it, or None if not possible"""
+        scoped = self.for_user(user)
+        if scoped.complete_task(task_id):
+            return scoped.get_by_id(task_id)
         return None
     
     def reactivate_task(self, task_id: str, user: User, new_due_date) -> Optional[Task]:
-        """Reactivate a failed task with a new date"""
-        task = self.get_by_id(task_id)
-        if task and task.user == user and task.status == TASK_STATUS_FAILED and new_due_date > timezone.now():
-            task.reactivation_count += 1
-            return self.update(
-                task, 
-                status=TASK_STATUS_ACTIVE, 
-                due_date=new_due_date, 
-                reactivation_count=task.reactivation_count
-            )
+        """Reactivate a failed task with a new date and return it, or None if not possible"""
+        scoped = self.for_user(user)
+        if scoped.reactivate_task(task_id, new_due_date):
+            return scoped.get_by_id(task_id)
         return None
+    
+    def complete_tasks(self, task_ids: Iterable[str], user: User) -> Dict[str, str]:
+        """Mark many of the user's tasks as completed with one UPDATE; returns a result per id"""
+        with transaction.atomic():
+            results, statuses = self._lock_owned_tasks(task_ids, user)
+            eligible = {task_id for task_id, status in statuses.items() if status != TASK_STATUS_COMPLETED}
+            if eligible:
+                self.filter(user=user, id__in=eligible).update_versioned(status=TASK_STATUS_COMPLETED)
+                self.events.log(((task_id, user.pk) for task_id in eligible), TASK_EVENT_COMPLETED)
+                self._record_stats(
+                    (user.pk, self._transition_stats(TASK_EVENT_COMPLETED, statuses[task_id], TASK_STATUS_COMPLETED))
+                    for task_id in eligible
+                )
+                self._tasks_changed([user.pk])
+            return self._bulk_results(results, statuses, eligible, BULK_RESULT_COMPLETED)
+    
+    def reactivate_tasks(self, task_ids: Iterable[str], user: User, new_due_date) -> Dict[str, str]:
+        """Reactivate many of the user's failed tasks with one UPDATE; returns a result per id"""
+        with transaction.atomic():
+            results, statuses = self._lock_owned_tasks(task_ids, user)
+            eligible = set()
+            if new_due_date > timezone.now():
+                eligible = {task_id for task_id, status in statuses.items() if status == TASK_STATUS_FAILED}
+            if eligible:
+                self.filter(user=user, id__in=eligible).update_versioned(
+                    status=TASK_STATUS_ACTIVE,
+                    due_date=new_due_date,
+                    reactivation_count=F("reactivation_count") + 1,
+                )
+                self.events.log(((task_id, user.pk) for task_id in eligible), TASK_EVENT_REACTIVATED)
+                stats = self._transition_stats(TASK_EVENT_REACTIVATED, TASK_STATUS_FAILED, TASK_STATUS_ACTIVE)
+                self._record_stats((user.pk, stats) for _ in eligible)
+                self._tasks_changed([user.pk])
+            return self._bulk_results(results, statuses, eligible, BULK_RESULT_REACTIVATED)
+    
+    def delete_tasks(self, task_ids: Iterable[str], user: User) -> Dict[str, str]:
+        """Delete many of the user's tasks with one DELETE; returns a result per id"""
+        with transaction.atomic():
+            results, statuses = self._lock_owned_tasks(task_ids, user)
+            if statuses:
+                self.filter(user=user, id__in=statuses.keys()).delete()
+                self._record_stats(self._deletion_stats((user.pk, status) for status in statuses.values()))
+                self._tasks_changed([user.pk])
+            return self._bulk_results(results, statuses, set(statuses), BULK_RESULT_DELETED)
+    
+    def _lock_owned_tasks(self, task_ids: Iterable[str], user: User) -> Tuple[Dict[str, Optional[uuid.UUID]], Dict[uuid.UUID, str]]:
+        """
+        Fetch the status of the requested tasks owned by the user in one query,
+        locking the rows where the backend supports it.
+        Returns the requested ids mapped to their parsed UUID (or None when
+        malformed) and the current status of each owned task.
+        """
+        requested: Dict[str, Optional[uuid.UUID]] = {}
+        for task_id in task_ids:
+            try:
+                requested[str(task_id)] = uuid.UUID(str(task_id))
+            except ValueError:
+                requested[str(task_id)] = None
+        
+        valid_ids = [task_uuid for task_uuid in requested.values() if task_uuid is not None]
+        statuses = dict(
+            self.filter(user=user, id__in=valid_ids).select_for_update().values_list("id", "status")
+        ) if valid_ids else {}
+        return requested, statuses
+    
+    def _bulk_results(self, requested: Dict[str, Optional[uuid.UUID]], statuses: Dict[uuid.UUID, str], changed: set, label: str) -> Dict[str, str]:
+        """Map every requested id to the outcome of a bulk operation"""
+        results = {}
+        for task_id, task_uuid in requested.items():
+            if task_uuid not in statuses:
+                results[task_id] = BULK_RESULT_NOT_FOUND
+            elif task_uuid in changed:
+                results[task_id] = label
+            else:
+                results[task_id] = BULK_RESULT_INVALID_STATUS
+        return results
+
+
+class UserTaskRepository:
+    """
+    Task repository scoped to a single user.
+    Every query is pre-filtered by user_id, so ownership is enforced by the
+    database instead of comparing task.user in Python (which loads the User).
+    """
+
+    def __init__(self, repository: TaskRepository, user: User):
+        self.repository = repository
+        self.user = user
+        self.user_id = user.pk
+    
+    def filter(self, **kwargs) -> QuerySet[Task]:
+        """Filter the user's tasks"""
+        return self.repository.filter(user_id=self.user_id, **kwargs)
+    
+    def get_by_id(self, task_id: str, fields=TASK_DETAIL_FIELDS, now: Optional[datetime] = None) -> Optional[Task]:
+        """Get one of the user's tasks, loading only the given fields (and due-date annotations with `now`)"""
+        task_uuid = self._parse_id(task_id)
+        if task_uuid is None:
+            return None
+        queryset = self.filter(id=task_uuid).only(*fields)
+        if now is not None:
+            queryset = queryset.with_due_info(now)
+        return queryset.first()
+    
+    async def aget_by_id(self, task_id: str, fields=TASK_DETAIL_FIELDS, now: Optional[datetime] = None) -> Optional[Task]:
+        """Async variant of get_by_id"""
+        task_uuid = self._parse_id(task_id)
+        if task_uuid is None:
+            return None
+        queryset = self.filter(id=task_uuid).only(*fields)
+        if now is not None:
+            queryset = queryset.with_due_info(now)
+        return await queryset.afirst()
+    
+    def update(self, task: Task, **kwargs) -> Task:
+        """Update the given fields of one of the user's tasks"""
+        for field, value in kwargs.items():
+            setattr(task, field, value)
+        task.save(update_fields=list(kwargs))
+        self.repository._tasks_changed([self.user_id])
+        return task
+    
+    def complete_task(self, task_id: str) -> Optional[str]:
+        """
+        Mark an active or failed task as completed with a single conditional
+        UPDATE, which also reports the previous status for the daily stats.
+        Returns the task's title, or None if it cannot be completed.
+        """
+        task_uuid = self._parse_id(task_id)
+        if task_uuid is None:
+            return None
+        rows = self.repository._transition(
+            self.filter(id=task_uuid, status__in=TASK_COMPLETABLE_STATUSES),
+            TASK_EVENT_COMPLETED,
+            TASK_COMPLETABLE_STATUSES,
+            returning=("title",),
+            status=TASK_STATUS_COMPLETED,
+        )
+        return rows[0][2] if rows else None
+    
+    def reactivate_task(self, task_id: str, new_due_date) -> Optional[str]:
+        """
+        Reactivate a failed task with a new date with a single conditional
+        UPDATE. Returns the task's title, or None if it cannot be reactivated.
+        """
+        task_uuid = self._parse_id(task_id)
+        if task_uuid is None or new_due_date <= timezone.now():
+            return None
+        rows = self.repository._transition(
+            self.filter(id=task_uuid, status=TASK_STATUS_FAILED),
+            TASK_EVENT_REACTIVATED,
+            TASK_STATUS_FAILED,
+            reschedule=True,
+            returning=("title",),
+            status=TASK_STATUS_ACTIVE,
+            due_date=new_due_date,
+            reactivation_count=F("reactivation_count") + 1,
+        )
+        return rows[0][2] if rows else None
+    
+    def delete_task(self, task_id: str) -> Optional[str]:
+        """
+        Delete one of the user's tasks with a single DELETE, returning its
+        status for the daily stats where the backend supports it.
+        Returns the task's title, or None if there is no such task.
+        """
+        task_uuid = self._parse_id(task_id)
+        if task_uuid is None:
+            return None
+        queryset = self.filter(id=task_uuid)
+        with transaction.atomic(savepoint=False):
+            if supports_update_returning(connections[router.db_for_write(Task)]):
+                rows = queryset.delete_returning(("status", "title"))
+            else:
+                rows = list(queryset.select_for_update().values_list("status", "title"))
+                if rows:
+                    queryset.delete()
+            if rows:
+                self.repository._record_stats(self.repository._deletion_stats((self.user_id, status) for status, _ in rows))
+                self.repository._tasks_changed([self.user_id])
+        return rows[0][1] if rows else None
+    
+    def get_timeline_page(
+        self,
+        task_id: Optional[str] = None,
+        cursor: Optional[str] = None,
+        page_size: int = TASK_TIMELINE_PAGE_SIZE,
+    ) -> KeysetPage[TaskEvent]:
+        """
+        Get a page of the user's task events, newest first, optionally of one
+        task. Each event carries the title of its task (None once deleted),
+        fetched with one query for the whole page.
+        Raises ValueError if the task id or the cursor is malformed.
+        """
+        task_uuid = None
+        if task_id:
+            task_uuid = self._parse_id(task_id)
+            if task_uuid is None:
+                raise ValueError("Invalid task id")
+        page = self.repository.events.get_timeline_page(self.user, task_uuid, cursor=cursor, page_size=page_size)
+        if page:
+            titles = dict(self.filter(id__in={event.task_id for event in page}).values_list("id", "title"))
+            for event in page:
+                event.task_title = titles.get(event.task_id)
+        return page
+    
+    def search(self, query: str, limit: int = SEARCH_PAGE_SIZE, now: Optional[datetime] = None) -> List[Task]:
+        """
+        Ranked full-text search over the titles and descriptions of the
+        user's tasks, best match first. Each task carries its `search_rank`
+        (None on backends without ranking) and, with `now`, due-date
+        annotations. Costs one index query and one query for the tasks.
+        """
+        ranks = self.repository.search_index.search(query, user_id=self.user_id, limit=limit)
+        if not ranks:
+            return []
+        queryset = self.filter(id__in=[task_id for task_id, _ in ranks])
+        if now is not None:
+            queryset = queryset.with_due_info(now)
+        tasks = {task.pk: task for task in queryset}
+        results = []
+        for task_id, rank in ranks:
+            # Tasks deleted since the index was read are skipped
+            if task_id in tasks:
+                task = tasks[task_id]
+                task.search_rank = rank
+                results.append(task)
+        return results
+    
+    @staticmethod
+    def _parse_id(task_id) -> Optional[uuid.UUID]:
+        try:
+            return uuid.UUID(str(task_id))
+        except ValueError:
+            return None
@@ -0,0 +1,121 @@
+import os
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+import django
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from .models import Task, TaskDailyStats, TaskEvent
+from .constants import (
+    TASK_STATUS_FAILED,
+    TASK_EVENT_FAILED,
+    TASK_EVENT_STATS,
+    TASK_STATS_FIELDS,
+    STATS_REBUILD_CHUNK_SIZE,
+)
+
+
+class TaskStatsRebuilder:
+    """
+    Recompute the TaskDailyStats rollups from tasks and their events, e.g.
+    to backfill them or repair drift. Users are processed in chunks, each
+    rebuilt in its own transaction; with several workers the chunks run in
+    parallel processes, each with its own database connection.
+    """
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: Optional[int] = None):
+        self.workers = workers or getattr(settings, "TASKS_STATS_REBUILD_WORKERS", None) or os.cpu_count() or 1
+        self.chunk_size = chunk_size or getattr(settings, "TASKS_STATS_REBUILD_CHUNK_SIZE", STATS_REBUILD_CHUNK_SIZE)
+
+    def rebuild(self, user_ids: Optional[Iterable[int]] = None) -> Tuple[int, int]:
+        """
+        Rebuild the rollups of the given users (all users owning tasks or
+        rollups by default). Returns the number of users and of rows written.
+        """
+        if user_ids is None:
+            user_ids = set(Task.objects.order_by().values_list("user_id", flat=True).distinct())
+            user_ids |= set(TaskDailyStats.objects.order_by().values_list("user_id", flat=True).distinct())
+        user_ids = sorted(set(user_ids))
+        chunks = [user_ids[start:start + self.chunk_size] for start in range(0, len(user_ids), self.chunk_size)]
+
+        workers = min(self.workers, len(chunks))
+        if workers <= 1:
+            return len(user_ids), sum(map(rebuild_users, chunks))
+
+        # Forked workers must not share the parent's open connections
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as executor:
+            return len(user_ids), sum(executor.map(rebuild_users, chunks))
+
+
+def rebuild_users(user_ids: List[int]) -> int:
+    """Replace the rollups of the given users in one transaction; returns the number of rows written"""
+    rows = [
+        TaskDailyStats(user_id=user_id, day=day, **counts)
+        for (user_id, day), counts in compute_daily_stats(user_ids).items()
+        if any(counts.values())
+    ]
+    with transaction.atomic():
+        TaskDailyStats.objects.filter(user_id__in=user_ids).delete()
+        TaskDailyStats.objects.bulk_create(rows)
+    return len(rows)
+
+
+def compute_daily_stats(user_ids: List[int], today: Optional[date] = None) -> Dict[Tuple[int, date], Counter]:
+    """
+    Compute the rollup counters of the given users per (user_id, day).
+
+    Creations come from the tasks (deleted tasks are not counted anymore)
+    and transitions from their events, replayed per task to know whether a
+    completion or reactivation left the overdue backlog. Tasks failed
+    without an event (e.g. seeded) or deleted while failed are reconciled
+    on today's row, so the backlog always ends at the current failed count.
+    """
+    today = today or timezone.localdate()
+    stats: Dict[Tuple[int, date], Counter] = defaultdict(Counter)
+
+    created = (
+        Task.objects.filter(user_id__in=user_ids)
+        .annotate(day=TruncDate("created_at", tzinfo=timezone.get_current_timezone()))
+        .order_by()
+        .values("user_id", "day")
+        .annotate(count=Count("id"))
+        .values_list("user_id", "day", "count")
+    )
+    for user_id, day, count in created:
+        stats[(user_id, day)]["created_count"] += count
+
+    backlog: Counter = Counter()
+    current_task_id, failed = None, False
+    events = (
+        TaskEvent.objects.filter(user_id__in=user_ids)
+        .order_by("task_id", "occurred_at", "id")
+        .values_list("task_id", "user_id", "event", "occurred_at")
+    )
+    for task_id, user_id, event, occurred_at in events.iterator(chunk_size=2000):
+        if task_id != current_task_id:
+            current_task_id, failed = task_id, False
+        change = (event == TASK_EVENT_FAILED) - failed
+        failed = event == TASK_EVENT_FAILED
+        row = stats[(user_id, timezone.localdate(occurred_at))]
+        row[TASK_EVENT_STATS[event]] += 1
+        row["backlog_change"] += change
+        backlog[user_id] += change
+
+    failed_counts = dict(
+        Task.objects.filter(user_id__in=user_ids, status=TASK_STATUS_FAILED)
+        .order_by()
+        .values("user_id")
+        .annotate(count=Count("id"))
+        .values_list("user_id", "count")
+    )
+    for user_id in user_ids:
+        correction = failed_counts.get(user_id, 0) - backlog[user_id]
+        if correction:
+            stats[(user_id, today)]["backlog_change"] += correction
+
+    return {key: Counter({field: counts[field] for field in TASK_STATS_FIELDS}) for key, counts in stats.items()}
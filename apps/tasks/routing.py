@@ -0,0 +1,131 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterable, Optional
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from .constants import REPLICA_STICKY_CACHE_KEY, REPLICA_STICKY_SECONDS
+
+# True while reads must see the primary: after a write in this request, or
+# for a user who wrote within the sticky window
+_primary_pinned: ContextVar[bool] = ContextVar("task_primary_pinned", default=False)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def get_replica_alias() -> Optional[str]:
+    """The configured read replica alias, or None when reads stay on the primary"""
+    alias = getattr(settings, "TASKS_REPLICA_DATABASE", None)
+    if alias and alias != DEFAULT_DB_ALIAS and alias in connections.settings:
+        return alias
+    return None
+
+
+def is_pinned_to_primary() -> bool:
+    return _primary_pinned.get()
+
+
+@contextmanager
+def use_primary():
+    """Send every task read in the block to the primary"""
+    token = _primary_pinned.set(True)
+    try:
+        yield
+    finally:
+        _primary_pinned.reset(token)
+
+
+def _sticky_cache():
+    return caches[getattr(settings, "TASKS_CACHE_ALIAS", "default")]
+
+
+def record_write(user_ids: Iterable):
+    """
+    Read-your-writes: pin the current context to the primary and keep the
+    users' next requests there for the sticky window, which should exceed
+    the replica lag.
+    """
+    if get_replica_alias() is None:
+        return
+    _primary_pinned.set(True)
+    timeout = getattr(settings, "TASKS_REPLICA_STICKY_SECONDS", REPLICA_STICKY_SECONDS)
+    _sticky_cache().set_many({REPLICA_STICKY_CACHE_KEY.format(user_id=user_id): 1 for user_id in user_ids}, timeout)
+
+
+def wrote_recently(user_id) -> bool:
+    """Whether the user changed tasks within the sticky window"""
+    return _sticky_cache().get(REPLICA_STICKY_CACHE_KEY.format(user_id=user_id)) is not None
+
+
+async def awrote_recently(user_id) -> bool:
+    """Async variant of wrote_recently"""
+    return await _sticky_cache().aget(REPLICA_STICKY_CACHE_KEY.format(user_id=user_id)) is not None
+
+
+class TaskReplicaRouter:
+    """
+    Route reads of the tasks app to the replica and every write to the
+    primary. Other apps (auth, sessions) stay on the primary, so a fresh
+    login never depends on replication.
+    """
+    route_app_labels = {"tasks"}
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in self.route_app_labels or _primary_pinned.get():
+            return None
+        return get_replica_alias()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        aliases = {DEFAULT_DB_ALIAS, get_replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Keep a request on the primary when it is not a safe method or when its
+    user changed tasks within the sticky window. Place it after
+    AuthenticationMiddleware. Supports both sync and async request stacks.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if get_replica_alias() is None:
+            return self.get_response(request)
+
+        pinned = request.method not in SAFE_METHODS or (
+            request.user.is_authenticated and wrote_recently(request.user.pk)
+        )
+        token = _primary_pinned.set(pinned)
+        try:
+            return self.get_response(request)
+        finally:
+            _primary_pinned.reset(token)
+
+    async def __acall__(self, request):
+        if get_replica_alias() is None:
+            return await self.get_response(request)
+
+        pinned = request.method not in SAFE_METHODS
+        if not pinned:
+            user = await request.auser()
+            pinned = user.is_authenticated and await awrote_recently(user.pk)
+        token = _primary_pinned.set(pinned)
+        try:
+            return await self.get_response(request)
+        finally:
+            _primary_pinned.reset(token)
@@ -0,0 +1,154 @@
+import heapq
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from django.conf import settings
+from django.utils import timezone
+from .repository import TaskRepository
+from .routing import use_primary
+from .constants import DUE_SCHEDULER_POLL_INTERVAL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class DueDateScheduler:
+    """
+    Event-driven replacement for the periodic overdue sweep.
+
+    Keeps an in-process min-heap with each user's earliest active due date,
+    persisted as the TaskUserState watermark, and fails a user's overdue
+    tasks when that date passes instead of scanning all tasks. Writes that
+    may move a due date earlier set the user's `needs_reschedule` flag,
+    which only the scheduler clears (request-time reconciliation has its
+    own `is_stale` flag); flagged users are rescheduled every poll through
+    a partial index. Its reads go to the primary: a lagging replica would
+    hide new due dates and flags.
+    """
+
+    def __init__(
+        self,
+        repository: Optional[TaskRepository] = None,
+        poll_interval: Optional[float] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], datetime] = timezone.now,
+    ):
+        self.repository = repository or TaskRepository()
+        self.poll_interval = poll_interval if poll_interval is not None else getattr(
+            settings, "TASKS_DUE_SCHEDULER_POLL_INTERVAL", DUE_SCHEDULER_POLL_INTERVAL_SECONDS
+        )
+        self.sleep = sleep
+        self.clock = clock
+        self._heap: List[Tuple[datetime, int]] = []
+        # Current due date of each scheduled user; heap entries that no
+        # longer match are skipped when popped (lazy deletion)
+        self._scheduled: Dict[int, datetime] = {}
+
+    def __len__(self) -> int:
+        return len(self._scheduled)
+
+    def next_due_at(self) -> Optional[datetime]:
+        """Earliest scheduled due date, or None when nothing is scheduled"""
+        self._discard_outdated()
+        return self._heap[0][0] if self._heap else None
+
+    def schedule(self, user_id, due_at: Optional[datetime]):
+        """Schedule a user at its earliest active due date (None unschedules it)"""
+        if due_at is None:
+            self._scheduled.pop(user_id, None)
+            return
+        if self._scheduled.get(user_id) == due_at:
+            return
+        self._scheduled[user_id] = due_at
+        heapq.heappush(self._heap, (due_at, user_id))
+
+    def rebuild(self) -> int:
+        """
+        Rebuild the heap from the database, e.g. at startup: recompute the
+        watermarks of stale users (and users without a state row), then load
+        every stored one. Returns the number of scheduled users.
+        """
+        self._heap = []
+        self._scheduled = {}
+        with use_primary():
+            unscheduled_user_ids = self.repository.get_unscheduled_user_ids()
+            if unscheduled_user_ids:
+                self.repository.user_states.touch(unscheduled_user_ids)
+            self.refresh()
+            for user_id, due_at in self.repository.user_states.get_scheduled():
+                self.schedule(user_id, due_at)
+        return len(self)
+
+    def refresh(self) -> int:
+        """Reschedule the users whose tasks changed since the last poll; returns their number"""
+        with use_primary():
+            user_ids = self.repository.user_states.get_reschedule_user_ids()
+            if not user_ids:
+                return 0
+            next_due_dates = self.repository.refresh_next_due_dates(user_ids)
+        for user_id, due_at in next_due_dates.items():
+            self.schedule(user_id, due_at)
+        return len(user_ids)
+
+    def run_due(self, now: Optional[datetime] = None) -> int:
+        """
+        Fail the tasks of every user whose due date has passed and schedule
+        their next one. Returns the number of tasks marked as failed.
+        """
+        now = now or self.clock()
+        user_ids = []
+        while self._heap and self._heap[0][0] < now:
+            due_at, user_id = heapq.heappop(self._heap)
+            if self._scheduled.get(user_id) == due_at:
+                del self._scheduled[user_id]
+                user_ids.append(user_id)
+        if not user_ids:
+            return 0
+
+        with use_primary():
+            updated_count = self.repository.fail_due_tasks_for_users(user_ids, now=now)
+            next_due_dates = self.repository.refresh_next_due_dates(user_ids)
+        for user_id, due_at in next_due_dates.items():
+            self.schedule(user_id, due_at)
+        return updated_count
+
+    def seconds_until_next(self, now: Optional[datetime] = None) -> float:
+        """Time to sleep: until the next due date, but never past the next poll"""
+        now = now or self.clock()
+        next_due_at = self.next_due_at()
+        if next_due_at is None:
+            return self.poll_interval
+        return max(0.0, min(self.poll_interval, (next_due_at - now).total_seconds()))
+
+    def run(self, max_runs: Optional[int] = None, on_run: Optional[Callable[[int], None]] = None) -> int:
+        """
+        Rebuild the heap, then wake up at each due date (or poll) until
+        stopped. Stops after `max_runs` wake-ups when given.
+        Returns the total number of tasks marked as failed.
+        """
+        self.rebuild()
+        total_updated = 0
+        runs = 0
+        while max_runs is None or runs < max_runs:
+            try:
+                self.refresh()
+                updated_count = self.run_due()
+            except Exception:
+                # Keep the loop alive on transient database errors
+                logger.exception("Due-date scheduler run failed")
+                updated_count = 0
+
+            total_updated += updated_count
+            runs += 1
+            if on_run:
+                on_run(updated_count)
+
+            if max_runs is not None and runs >= max_runs:
+                break
+            self.sleep(self.seconds_until_next())
+
+        return total_updated
+
+    def _discard_outdated(self):
+        while self._heap and self._scheduled.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
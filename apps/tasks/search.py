@@ -0,0 +1,213 @@
+"""
+Full-text search over task titles and descriptions.
+
+The index lives in the database and is kept in sync by the database itself,
+so every write path (repository, admin, bulk imports, cascading user
+deletes) is covered:
+
+- SQLite: an FTS5 table filled by triggers on ``tasks_task``. FTS5 needs
+  stable integer rowids, which UUID-keyed tasks lack (VACUUM and table
+  rebuilds renumber implicit rowids), so ``tasks_task_search_ids`` maps
+  each task to its document. The owner is indexed as a token, so per-user
+  searches are answered from the index alone; results are ranked by bm25
+  with titles weighing more than descriptions.
+- PostgreSQL: a generated ``tsvector`` column on ``tasks_task`` (title
+  weighted A, description B) with a GIN index, ranked by ts_rank.
+- Other backends: unranked ``icontains`` matching.
+
+Migration 0011 creates and fills the index with its own frozen copy of the
+schema; the statements here serve ``rebuild()`` and the post_migrate check
+that restores SQLite triggers dropped by later table rebuilds.
+
+Search terms are reduced to words and matched as prefixes, so user input
+can never inject query syntax.
+"""
+
+import re
+from typing import List, Optional, Tuple
+from django.db import connections, router, transaction
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from .models import Task
+from .constants import SEARCH_TITLE_WEIGHT, SEARCH_DESCRIPTION_WEIGHT, SEARCH_PG_CONFIG
+
+FTS_TABLE = "tasks_task_fts"
+FTS_IDS_TABLE = "tasks_task_search_ids"
+PG_SEARCH_COLUMN = "search_vector"
+PG_SEARCH_INDEX = "task_search_vector_idx"
+SEARCH_MIGRATION = "0011_task_search_index"
+
+SQLITE_SCHEMA = [
+    f"CREATE TABLE IF NOT EXISTS {FTS_IDS_TABLE} (docid INTEGER PRIMARY KEY, task_id char(32) NOT NULL UNIQUE)",
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "owner, title, description, tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    f"""CREATE TRIGGER IF NOT EXISTS tasks_task_fts_insert AFTER INSERT ON tasks_task BEGIN
+        INSERT INTO {FTS_IDS_TABLE} (task_id) VALUES (new.id);
+        INSERT INTO {FTS_TABLE} (rowid, owner, title, description)
+        VALUES (last_insert_rowid(), 'u' || new.user_id, new.title, new.description);
+    END""",
+    # Status transitions never touch the text, and full saves only reindex real changes
+    f"""CREATE TRIGGER IF NOT EXISTS tasks_task_fts_update AFTER UPDATE OF title, description, user_id ON tasks_task
+    WHEN old.title IS NOT new.title OR old.description IS NOT new.description OR old.user_id IS NOT new.user_id BEGIN
+        UPDATE {FTS_TABLE} SET owner = 'u' || new.user_id, title = new.title, description = new.description
+        WHERE rowid = (SELECT docid FROM {FTS_IDS_TABLE} WHERE task_id = old.id);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS tasks_task_fts_delete AFTER DELETE ON tasks_task BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = (SELECT docid FROM {FTS_IDS_TABLE} WHERE task_id = old.id);
+        DELETE FROM {FTS_IDS_TABLE} WHERE task_id = old.id;
+    END""",
+]
+SQLITE_OBJECTS = (
+    FTS_IDS_TABLE, FTS_TABLE, "tasks_task_fts_insert", "tasks_task_fts_update", "tasks_task_fts_delete",
+)
+POSTGRESQL_SCHEMA = [
+    f"""ALTER TABLE tasks_task ADD COLUMN IF NOT EXISTS {PG_SEARCH_COLUMN} tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('{SEARCH_PG_CONFIG}'::regconfig, coalesce(title, '')), 'A')
+        || setweight(to_tsvector('{SEARCH_PG_CONFIG}'::regconfig, coalesce(description, '')), 'B')
+    ) STORED""",
+    f"CREATE INDEX IF NOT EXISTS {PG_SEARCH_INDEX} ON tasks_task USING GIN ({PG_SEARCH_COLUMN})",
+]
+
+WORD_RE = re.compile(r"\w+")
+
+
+def search_terms(query: str) -> List[str]:
+    """The words of a search query, lowercased; punctuation and operators are dropped"""
+    return WORD_RE.findall(query.lower())
+
+
+def ensure_search_index(sender, using, **kwargs):
+    """
+    post_migrate handler: on SQLite, migrations that rebuild ``tasks_task``
+    drop its triggers, so recreate and refill the index when any part of it
+    is missing (once the migration creating it is applied)
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return
+    if ("tasks", SEARCH_MIGRATION) not in MigrationRecorder(connection).applied_migrations():
+        return
+    with connection.cursor() as cursor:
+        placeholders = ", ".join(["%s"] * len(SQLITE_OBJECTS))
+        cursor.execute(f"SELECT count(*) FROM sqlite_master WHERE name IN ({placeholders})", SQLITE_OBJECTS)
+        if cursor.fetchone()[0] < len(SQLITE_OBJECTS):
+            TaskSearchIndex(using=using).rebuild()
+
+
+class TaskSearchIndex:
+    """Ranked full-text search over the tasks of the configured database"""
+
+    def __init__(self, using: Optional[str] = None):
+        self.using = using
+
+    @property
+    def connection(self):
+        return connections[self.using or router.db_for_read(Task)]
+
+    def search(self, query: str, user_id=None, limit: Optional[int] = None) -> List[Tuple]:
+        """
+        Get the (task_id, rank) of the tasks matching every word of `query`
+        as a prefix, best first (higher rank is better; None when the
+        backend cannot rank), optionally of one user only.
+        """
+        terms = search_terms(query)
+        if not terms:
+            return []
+        connection = self.connection
+        if connection.vendor not in ("sqlite", "postgresql"):
+            queryset = Task.objects.using(connection.alias).filter(self._fallback_filter(terms)).order_by("-created_at")
+            if user_id is not None:
+                queryset = queryset.filter(user_id=user_id)
+            return [(task_id, None) for task_id in queryset.values_list("id", flat=True)[:limit]]
+
+        sql, params = self._match_sql(connection, terms, user_id, ranked=True)
+        if limit is not None:
+            sql += " LIMIT %s"
+            params.append(limit)
+        id_field = Task._meta.pk
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [(id_field.to_python(task_id), rank) for task_id, rank in cursor.fetchall()]
+
+    def filter_q(self, query: str) -> Q:
+        """
+        A filter for task querysets matching `query` through the index as a
+        subquery, e.g. for the admin changelist. Matches nothing without words.
+        """
+        terms = search_terms(query)
+        if not terms:
+            return Q(pk__in=[])
+        connection = self.connection
+        if connection.vendor not in ("sqlite", "postgresql"):
+            return self._fallback_filter(terms)
+        sql, params = self._match_sql(connection, terms, None, ranked=False)
+        return Q(pk__in=RawSQL(sql, params))
+
+    def rebuild(self) -> int:
+        """
+        Recreate missing parts of the index (e.g. triggers dropped when a
+        migration rebuilds the SQLite table) and refill it from every task.
+        Returns the number of indexed tasks.
+        """
+        connection = connections[self.using or router.db_for_write(Task)]
+        statements = []
+        if connection.vendor == "sqlite":
+            statements = [
+                *SQLITE_SCHEMA,
+                f"DELETE FROM {FTS_TABLE}",
+                f"DELETE FROM {FTS_IDS_TABLE}",
+                f"INSERT INTO {FTS_IDS_TABLE} (task_id) SELECT id FROM tasks_task",
+                f"INSERT INTO {FTS_TABLE} (rowid, owner, title, description) "
+                f"SELECT ids.docid, 'u' || task.user_id, task.title, task.description "
+                f"FROM tasks_task AS task JOIN {FTS_IDS_TABLE} AS ids ON ids.task_id = task.id",
+                # Merge the index b-trees for faster queries
+                f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')",
+            ]
+        elif connection.vendor == "postgresql":
+            # The generated column is always current; only the index can bloat
+            statements = [*POSTGRESQL_SCHEMA, f"REINDEX INDEX {PG_SEARCH_INDEX}"]
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+        return Task.objects.using(connection.alias).count()
+
+    @staticmethod
+    def _fallback_filter(terms: List[str]) -> Q:
+        condition = Q()
+        for term in terms:
+            condition &= Q(title__icontains=term) | Q(description__icontains=term)
+        return condition
+
+    @staticmethod
+    def _match_sql(connection, terms: List[str], user_id, ranked: bool) -> Tuple[str, list]:
+        """SELECT task ids (and ranks, best first) matching every term as a prefix"""
+        if connection.vendor == "sqlite":
+            match = "{title description} : (" + " AND ".join(f'"{term}"*' for term in terms) + ")"
+            if user_id is not None:
+                match = f"owner : u{int(user_id)} AND {match}"
+            sql = (
+                f"SELECT ids.task_id"
+                + (f", -bm25({FTS_TABLE}, 0, {SEARCH_TITLE_WEIGHT}, {SEARCH_DESCRIPTION_WEIGHT}) AS score" if ranked else "")
+                + f" FROM {FTS_TABLE} JOIN {FTS_IDS_TABLE} AS ids ON ids.docid = {FTS_TABLE}.rowid"
+                f" WHERE {FTS_TABLE} MATCH %s"
+                + (" ORDER BY score DESC" if ranked else "")
+            )
+            return sql, [match]
+
+        # PostgreSQL: weights are {D, C, B, A}, so A (title) and B (description)
+        tsquery = " & ".join(f"{term}:*" for term in terms)
+        weights = f"'{{0, 0, {SEARCH_DESCRIPTION_WEIGHT / SEARCH_TITLE_WEIGHT}, 1}}'::float4[]"
+        sql = (
+            "SELECT id"
+            + (f", ts_rank({weights}, {PG_SEARCH_COLUMN}, query) AS score" if ranked else "")
+            + f" FROM tasks_task, to_tsquery('{SEARCH_PG_CONFIG}'::regconfig, %s) AS query"
+            f" WHERE {PG_SEARCH_COLUMN} @@ query"
+        )
+        params = [tsquery]
+        if user_id is not None:
+            sql += " AND user_id = %s"
+            params.append(user_id)
+        if ranked:
+            sql += " ORDER BY score DESC"
+        return sql, params
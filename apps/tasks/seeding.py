@@ -0,0 +1,111 @@
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Sequence
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.utils import timezone
+from .models import Task
+from .repository import TaskRepository
+from .constants import TASK_STATUS_ACTIVE, TASK_STATUS_COMPLETED, TASK_STATUS_FAILED, IMPORT_BATCH_SIZE
+
+
+def parse_weights(value: str) -> Dict[str, float]:
+    """
+    Parse "active=5,completed=3,failed=2" into a weight per status.
+
+    Raises:
+        ValueError: If a status is unknown or a weight is not a positive number
+    """
+    weights = {}
+    for item in value.split(","):
+        status, _, weight = item.partition("=")
+        status = status.strip()
+        if status not in (TASK_STATUS_ACTIVE, TASK_STATUS_COMPLETED, TASK_STATUS_FAILED):
+            raise ValueError(f"Unknown status: {status}")
+        weights[status] = float(weight)
+        if weights[status] < 0:
+            raise ValueError(f"Negative weight for {status}")
+    if not any(weights.values()):
+        raise ValueError("At least one status needs a positive weight")
+    return weights
+
+
+@dataclass
+class SeedProfile:
+    """Distributions of the generated tasks"""
+    status_weights: Dict[str, float] = field(default_factory=lambda: {
+        TASK_STATUS_ACTIVE: 5, TASK_STATUS_COMPLETED: 3, TASK_STATUS_FAILED: 2,
+    })
+    # Share of active tasks whose due date has already passed (left for the sweeper)
+    overdue_ratio: float = 0.05
+    # Due dates are spread over this many days; skew > 1 packs them near "now"
+    due_window_days: int = 30
+    due_skew: float = 2.0
+    description_min: int = 0
+    description_max: int = 500
+
+
+class TaskSeeder:
+    """Generate users and tasks reproducibly and save them with bulk_create"""
+
+    def __init__(self, profile: Optional[SeedProfile] = None, seed: Optional[int] = None,
+                 batch_size: int = IMPORT_BATCH_SIZE, repository: Optional[TaskRepository] = None):
+        self.profile = profile or SeedProfile()
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.repository = repository or TaskRepository()
+
+    def create_users(self, count: int, prefix: str = "seed", password: str = "loadtest123") -> List[User]:
+        """Create the missing `<prefix><n>` users (the password is hashed once) and return all of them"""
+        usernames = [f"{prefix}{i}" for i in range(count)]
+        existing = set(User.objects.filter(username__in=usernames).values_list("username", flat=True))
+        password_hash = make_password(password)
+        User.objects.bulk_create(
+            [User(username=username, password=password_hash) for username in usernames if username not in existing],
+            batch_size=self.batch_size,
+        )
+        return list(User.objects.filter(username__in=usernames).order_by("id"))
+
+    def generate_tasks(self, user_ids: Sequence[int], tasks_per_user: int, now: Optional[datetime] = None) -> Iterator[Task]:
+        """Lazily build unsaved tasks following the profile"""
+        now = now or timezone.now()
+        profile = self.profile
+        statuses = list(profile.status_weights)
+        weights = list(profile.status_weights.values())
+        window_minutes = profile.due_window_days * 24 * 60
+
+        for user_id in user_ids:
+            for i in range(tasks_per_user):
+                status = self.random.choices(statuses, weights)[0]
+                offset = int(window_minutes * self.random.random() ** profile.due_skew) + 1
+                if status == TASK_STATUS_ACTIVE:
+                    overdue = self.random.random() < profile.overdue_ratio
+                else:
+                    # Completed tasks can have any due date, failed ones are always past due
+                    overdue = status == TASK_STATUS_FAILED or self.random.random() < 0.5
+                description_size = self.random.randint(profile.description_min, profile.description_max)
+                yield Task(
+                    user_id=user_id,
+                    title=f"Seeded task {i}",
+                    description=("lorem ipsum " * (description_size // 12 + 1))[:description_size],
+                    due_date=now - timedelta(minutes=offset) if overdue else now + timedelta(minutes=offset),
+                    status=status,
+                )
+
+    def seed(self, user_ids: Sequence[int], tasks_per_user: int, on_batch=None) -> int:
+        """Save the generated tasks in batches, returning how many were created"""
+        created = 0
+        batch: List[Task] = []
+        for task in self.generate_tasks(user_ids, tasks_per_user):
+            batch.append(task)
+            if len(batch) >= self.batch_size:
+                created += len(self.repository.bulk_create(batch))
+                batch = []
+                if on_batch:
+                    on_batch(created)
+        if batch:
+            created += len(self.repository.bulk_create(batch))
+            if on_batch:
+                on_batch(created)
+        return created
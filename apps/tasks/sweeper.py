@@ -0,0 +1,70 @@
+import logging
+import time
+from typing import Callable, Optional
+from django.conf import settings
+from django.utils import timezone
+from .repository import TaskRepository
+from .routing import use_primary
+from .constants import OVERDUE_SWEEP_INTERVAL_SECONDS, OVERDUE_SWEEP_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class OverdueTaskSweeper:
+    """Background sweeper that marks overdue active tasks as failed"""
+
+    def __init__(
+        self,
+        repository: Optional[TaskRepository] = None,
+        interval: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.repository = repository or TaskRepository()
+        self.interval = interval if interval is not None else getattr(
+            settings, "TASKS_OVERDUE_SWEEP_INTERVAL", OVERDUE_SWEEP_INTERVAL_SECONDS
+        )
+        self.batch_size = batch_size if batch_size is not None else getattr(
+            settings, "TASKS_OVERDUE_SWEEP_BATCH_SIZE", OVERDUE_SWEEP_BATCH_SIZE
+        )
+        self.sleep = sleep
+
+    def sweep(self) -> int:
+        """
+        Run a single sweep and return the number of tasks marked as failed.
+        Reads go to the primary, so tasks not yet replicated are not missed.
+        """
+        now = timezone.now()
+        updated_count = 0
+        with use_primary():
+            for batch_count in self.repository.fail_overdue_tasks_in_batches(self.batch_size, now=now):
+                updated_count += batch_count
+        return updated_count
+
+    def run(self, max_runs: Optional[int] = None, on_sweep: Optional[Callable[[int], None]] = None) -> int:
+        """
+        Sweep repeatedly, sleeping `interval` seconds between runs.
+        Stops after `max_runs` sweeps when given, otherwise loops forever.
+        Returns the total number of tasks marked as failed.
+        """
+        total_updated = 0
+        runs = 0
+        while max_runs is None or runs < max_runs:
+            started = time.monotonic()
+            try:
+                updated_count = self.sweep()
+            except Exception:
+                # Keep the loop alive on transient database errors
+                logger.exception("Overdue task sweep failed")
+                updated_count = 0
+
+            total_updated += updated_count
+            runs += 1
+            if on_sweep:
+                on_sweep(updated_count)
+
+            if max_runs is not None and runs >= max_runs:
+                break
+            self.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+        return total_updated
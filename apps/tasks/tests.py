@@ -1,9 +1,45 @@
-from django.test import TestCase
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connection, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.template.loader import render_to_string
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
 from django.utils import timezone
 from datetime import timedelta
-from .models import Task
+from io import StringIO
+from pathlib import Path
+import os
+import re
+import tempfile
+import time
+from contextlib import contextmanager
+from unittest import mock
+import json
+import asyncio
+from asgiref.sync import sync_to_async
+from config.myproject.database import database_config
+from .models import Task, TaskDailyStats, TaskEvent
 from .repository import TaskRepository
+from .sweeper import OverdueTaskSweeper
+from .scheduler import DueDateScheduler
+from .utils import TaskStatistics, CSRF_PLACEHOLDER, format_task_message
+from .cache import TaskStatusCache
+from .events import TaskEventBroker, set_broker
+from .instrumentation import perf_stats, percentile
+from .seeding import TaskSeeder
+from . import exporters
+from .routing import use_primary, wrote_recently
+from .core.pagination import encode_cursor
+from .rollups import TaskStatsRebuilder
+from .search import FTS_TABLE, TaskSearchIndex
 
 # Create your tests here.
 
@@ -116,6 +152,17 @@ class TaskRepositoryTest(TestCase):
         self.assertEqual(reactivated_task.reactivation_count, 1)
         self.assertEqual(reactivated_task.due_date, new_due_date)
 
+    def test_get_status_counts_by_user(self):
+        """All per-status and overdue counts come from one aggregate query"""
+        with self.assertNumQueries(1):
+            statistics = TaskStatistics.for_user(self.user, self.repository)
+        self.assertEqual(statistics.active_count, 2)
+        self.assertEqual(statistics.completed_count, 1)
+        self.assertEqual(statistics.failed_count, 0)
+        self.assertEqual(statistics.overdue_count, 1)
+        self.assertEqual(statistics.total_count, 3)
+        self.assertEqual(statistics.as_dict()['total_count'], 3)
+
     def test_complete_task(self):
         """Test completing a task"""
         completed_task = self.repository.complete_task(
@@ -129,3 +176,1609 @@ class TaskRepositoryTest(TestCase):
         # Verify it's now in completed tasks
         completed_tasks = self.repository.get_completed_tasks_by_user(self.user)
         self.assertEqual(completed_tasks.count(), 2)  # original + newly completed
+
+
+class OverdueTaskSweeperTest(TestCase):
+    def setUp(self):
+        """Set up overdue tasks across several users"""
+        cache.clear()
+        self.repository = TaskRepository()
+        self.users = [
+            User.objects.create_user(username=f'sweepuser{i}', password='testpass123')
+            for i in range(3)
+        ]
+        for user in self.users:
+            for i in range(4):
+                self.repository.create(
+                    user=user,
+                    title=f"Overdue {i}",
+                    due_date=timezone.now() - timedelta(hours=i + 1)
+                )
+            self.repository.create(
+                user=user,
+                title="Future",
+                due_date=timezone.now() + timedelta(days=1)
+            )
+
+    def test_fail_overdue_tasks_in_batches(self):
+        """Overdue tasks are failed in chunks no larger than the batch size"""
+        batches = list(self.repository.fail_overdue_tasks_in_batches(batch_size=5))
+        self.assertEqual(batches, [5, 5, 2])
+        self.assertEqual(self.repository.get_failed_tasks().count(), 12)
+        self.assertEqual(self.repository.get_active_tasks().count(), 3)
+
+    def test_overdue_chunks_are_logged(self):
+        """Each chunk records one failed event per task it updated"""
+        now = timezone.now()
+        batches = list(self.repository.fail_overdue_tasks_in_batches(batch_size=5, now=now))
+        self.assertEqual(batches, [5, 5, 2])
+        events = TaskEvent.objects.filter(event='failed')
+        self.assertEqual(
+            sorted(events.values_list('task_id', flat=True)),
+            sorted(self.repository.get_failed_tasks().values_list('id', flat=True)),
+        )
+        self.assertEqual(set(events.values_list('occurred_at', flat=True)), {now})
+
+    def test_overdue_chunks_without_returning(self):
+        """Backends without UPDATE ... RETURNING lock each chunk before updating it"""
+        with mock.patch('apps.tasks.repository.supports_update_returning', return_value=False):
+            batches = list(self.repository.fail_overdue_tasks_in_batches(batch_size=5))
+        self.assertEqual(batches, [5, 5, 2])
+        self.assertEqual(TaskEvent.objects.count(), 12)
+        self.assertEqual(self.repository.get_active_tasks().count(), 3)
+
+    def test_update_versioned_returning(self):
+        """The set-based UPDATE returns typed values and bumps versions"""
+        task = self.repository.get_active_tasks().filter(user=self.users[0]).first()
+        rows = Task.objects.filter(pk=task.pk).update_versioned_returning(('id', 'user_id'), status='completed')
+        self.assertEqual(rows, [(task.pk, self.users[0].pk)])
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.version), ('completed', 1))
+
+    def test_update_versioned_returning_previous_values(self):
+        """Previous values are read by the same statement, before the rows change"""
+        tasks = list(self.repository.filter(user=self.users[0]).order_by('id')[:2])
+        Task.objects.filter(pk=tasks[0].pk).update(status='failed')
+        with self.assertNumQueries(1):
+            rows = Task.objects.filter(pk__in=[task.pk for task in tasks], status__in=('active', 'failed')).update_versioned_returning(
+                ('id', 'title'), previous=('status',), status='completed'
+            )
+        self.assertEqual(sorted(rows), [(tasks[0].pk, tasks[0].title, 'failed'), (tasks[1].pk, tasks[1].title, 'active')])
+        self.assertEqual(set(Task.objects.filter(pk__in=[task.pk for task in tasks]).values_list('status', flat=True)), {'completed'})
+
+    def test_sweeper_run_loop(self):
+        """The sweeper loops with the configured interval"""
+        sleeps = []
+        sweeper = OverdueTaskSweeper(interval=10, batch_size=4, sleep=sleeps.append)
+        total_updated = sweeper.run(max_runs=3)
+        self.assertEqual(total_updated, 12)
+        self.assertEqual(len(sleeps), 2)
+        self.assertTrue(all(0 <= seconds <= 10 for seconds in sleeps))
+
+    def test_command_loop_mode(self):
+        """The management command can run the sweeper for a bounded number of runs"""
+        out = StringIO()
+        call_command('update_overdue_tasks', loop=True, max_runs=1, interval=0, batch_size=2, stdout=out)
+        self.assertIn('Updated 12 overdue tasks', out.getvalue())
+        self.assertEqual(self.repository.get_failed_tasks().count(), 12)
+
+    def test_views_only_reconcile_current_user(self):
+        """Page views reconcile the requesting user's tasks, never the whole table"""
+        self.client.force_login(self.users[0])
+        response = self.client.get(reverse('tasks:task_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.repository.get_failed_tasks().count(), 4)
+        self.assertEqual(self.repository.get_failed_tasks_by_user(self.users[0]).count(), 4)
+        
+        response = self.client.get(reverse('tasks:api_task_status'))
+        self.assertEqual(response.json()['updated_count'], 0)
+        self.assertEqual(response.json()['failed_count'], 4)
+        self.assertEqual(response.json()['active_count'], 1)
+
+    def test_dashboard_query_count_is_constant(self):
+        """The dashboard query count does not depend on the number of tasks"""
+        self.client.force_login(self.users[0])
+        self.client.get(reverse('tasks:task_list'))
+        with self.assertNumQueries(7):
+            self.client.get(reverse('tasks:task_list'))
+        
+        for i in range(10):
+            self.repository.create(user=self.users[0], title=f"Extra {i}", due_date=timezone.now() + timedelta(days=2))
+        self.client.get(reverse('tasks:task_list'))
+        with self.assertNumQueries(7):
+            self.client.get(reverse('tasks:task_list'))
+
+
+class TaskWatermarkTest(TestCase):
+    def setUp(self):
+        """Set up a user with one future task"""
+        self.user = User.objects.create_user(username='watermarkuser', password='testpass123')
+        self.repository = TaskRepository()
+        self.future_task = self.repository.create(
+            user=self.user,
+            title="Future Task",
+            due_date=timezone.now() + timedelta(days=1)
+        )
+
+    def test_reconciliation_is_noop_until_watermark_passes(self):
+        """Once computed, the watermark short-circuits reconciliation without any UPDATE"""
+        self.assertEqual(self.repository.reconcile_overdue_tasks_for_user(self.user), 0)
+        state = self.repository.user_states.get_for_user(self.user)
+        self.assertFalse(state.is_stale)
+        self.assertEqual(state.next_due_at, self.future_task.due_date)
+        
+        with self.assertNumQueries(1):
+            self.assertEqual(self.repository.reconcile_overdue_tasks_for_user(self.user), 0)
+
+    def test_watermark_invalidated_on_create(self):
+        """Creating an already overdue task forces the next reconciliation"""
+        self.repository.reconcile_overdue_tasks_for_user(self.user)
+        overdue_task = self.repository.create(
+            user=self.user,
+            title="Overdue Task",
+            due_date=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(self.repository.reconcile_overdue_tasks_for_user(self.user), 1)
+        overdue_task.refresh_from_db()
+        self.assertEqual(overdue_task.status, "failed")
+
+    def test_watermark_invalidated_on_update_and_reactivate(self):
+        """Updating or reactivating a task invalidates the watermark"""
+        self.repository.reconcile_overdue_tasks_for_user(self.user)
+        self.repository.update(self.future_task, title="Renamed")
+        self.assertTrue(self.repository.user_states.get_for_user(self.user).is_stale)
+        
+        self.repository.reconcile_overdue_tasks_for_user(self.user)
+        self.repository.update(self.future_task, status="failed")
+        self.repository.reconcile_overdue_tasks_for_user(self.user)
+        self.repository.reactivate_task(
+            str(self.future_task.id),
+            self.user,
+            timezone.now() + timedelta(days=2)
+        )
+        self.assertTrue(self.repository.user_states.get_for_user(self.user).is_stale)
+
+    def test_watermark_passing_triggers_reconciliation(self):
+        """A watermark in the past makes the next call fail the overdue tasks"""
+        self.repository.reconcile_overdue_tasks_for_user(self.user)
+        Task.objects.filter(pk=self.future_task.pk).update(due_date=timezone.now() - timedelta(minutes=1))
+        self.repository.user_states.filter(user=self.user).update(next_due_at=timezone.now() - timedelta(minutes=1))
+        self.assertEqual(self.repository.reconcile_overdue_tasks_for_user(self.user), 1)
+        self.assertIsNone(self.repository.user_states.get_for_user(self.user).next_due_at)
+
+
+class TaskPaginationTest(TestCase):
+    def setUp(self):
+        """Set up a user with more tasks than a page holds"""
+        self.user = User.objects.create_user(username='pageuser', password='testpass123')
+        self.repository = TaskRepository()
+        self.tasks = [
+            self.repository.create(
+                user=self.user,
+                title=f"Task {i}",
+                due_date=timezone.now() + timedelta(days=1)
+            )
+            for i in range(7)
+        ]
+        # Force identical timestamps to exercise the id tie-breaker
+        Task.objects.filter(pk__in=[task.pk for task in self.tasks[:4]]).update(created_at=self.tasks[0].created_at)
+
+    def test_keyset_pages_cover_all_tasks_once(self):
+        """Walking the cursors yields every task exactly once, newest first"""
+        seen = []
+        cursor = None
+        while True:
+            page = self.repository.get_tasks_page_by_user(self.user, "active", cursor=cursor, page_size=3)
+            seen.extend(task.pk for task in page)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(set(seen), {task.pk for task in self.tasks})
+
+    def test_invalid_cursor(self):
+        """Malformed cursors are rejected"""
+        with self.assertRaises(ValueError):
+            self.repository.get_tasks_page_by_user(self.user, cursor="not-a-cursor")
+
+    def test_tampered_cursor_pk(self):
+        """A well-formed cursor with a bad primary key is rejected, never a 500"""
+        tampered = encode_cursor(timezone.now(), "zzz")
+        with self.assertRaises(ValueError):
+            self.repository.get_tasks_page_by_user(self.user, cursor=tampered)
+        
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse('tasks:api_task_list'), {'cursor': tampered}).status_code, 400)
+        response = self.client.get(reverse('tasks:task_list'), {'active_cursor': tampered})
+        self.assertRedirects(response, reverse('tasks:task_list'), fetch_redirect_response=False)
+
+    def test_api_task_list(self):
+        """The JSON listing endpoint streams through tasks page by page"""
+        self.client.force_login(self.user)
+        url = reverse('tasks:api_task_list')
+        response = self.client.get(url, {'limit': 5})
+        data = response.json()
+        self.assertEqual(len(data['results']), 5)
+        self.assertIsNotNone(data['next_cursor'])
+        
+        response = self.client.get(url, {'limit': 5, 'cursor': data['next_cursor']})
+        data = response.json()
+        self.assertEqual(len(data['results']), 2)
+        self.assertIsNone(data['next_cursor'])
+        
+        self.assertEqual(self.client.get(url, {'cursor': 'bogus'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'status': 'bogus'}).status_code, 400)
+
+    def test_task_list_view_is_paginated(self):
+        """The task list renders one page per status with a link to the next one"""
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('tasks:task_list'))
+        self.assertEqual(len(response.context['active_tasks']), 7)
+        self.assertIsNone(response.context['next_page_urls']['active'])
+        
+        page = self.repository.get_tasks_page_by_user(self.user, "active", page_size=2)
+        response = self.client.get(reverse('tasks:task_list'), {'active_cursor': page.next_cursor})
+        self.assertEqual(len(response.context['active_tasks']), 5)
+
+
+class TaskStatusCacheTest(TestCase):
+    def setUp(self):
+        """Set up a user with tasks and an empty cache"""
+        cache.clear()
+        self.user = User.objects.create_user(username='cacheuser', password='testpass123')
+        self.repository = TaskRepository()
+        self.task = self.repository.create(
+            user=self.user,
+            title="Cached Task",
+            due_date=timezone.now() + timedelta(days=1)
+        )
+
+    def test_polling_hits_cache(self):
+        """Repeated polls are served from the cache without task queries"""
+        counts, _ = self.repository.get_cached_status_counts_by_user(self.user)
+        self.assertEqual(counts['active_count'], 1)
+        state = self.repository.user_states.get_for_user(self.user)
+        with self.assertNumQueries(0):
+            counts, updated_count = self.repository.get_cached_status_counts_by_user(self.user, state)
+        self.assertEqual(counts['active_count'], 1)
+        self.assertEqual(updated_count, 0)
+
+    def test_mutations_invalidate_cache(self):
+        """Every repository mutation drops the cached counts"""
+        self.repository.get_cached_status_counts_by_user(self.user)
+        self.repository.complete_task(str(self.task.id), self.user)
+        counts, _ = self.repository.get_cached_status_counts_by_user(self.user)
+        self.assertEqual(counts['completed_count'], 1)
+        
+        self.repository.create(user=self.user, title="Another", due_date=timezone.now() + timedelta(days=1))
+        counts, _ = self.repository.get_cached_status_counts_by_user(self.user)
+        self.assertEqual(counts['active_count'], 1)
+        
+        self.repository.delete(self.task)
+        counts, _ = self.repository.get_cached_status_counts_by_user(self.user)
+        self.assertEqual(counts['completed_count'], 0)
+
+    def test_sweeper_invalidates_cache(self):
+        """Tasks failed by the sweeper are reflected on the next poll"""
+        self.repository.get_cached_status_counts_by_user(self.user)
+        Task.objects.filter(pk=self.task.pk).update(due_date=timezone.now() - timedelta(minutes=1))
+        OverdueTaskSweeper(batch_size=10).sweep()
+        counts, _ = self.repository.get_cached_status_counts_by_user(self.user)
+        self.assertEqual(counts['failed_count'], 1)
+
+    def test_writes_of_other_processes_expire_entry(self):
+        """An entry whose invalidation never arrived is dropped once the task version moved on"""
+        self.repository.get_cached_status_counts_by_user(self.user)
+        Task.objects.filter(pk=self.task.pk).update(due_date=timezone.now() - timedelta(minutes=1))
+        # The sweeper running in another process cannot reach this process's cache
+        with mock.patch.object(TaskStatusCache, 'invalidate_many'):
+            OverdueTaskSweeper(batch_size=10).sweep()
+        self.assertIsNotNone(cache.get(TaskStatusCache.key(self.user.pk)))
+        counts, _ = self.repository.get_cached_status_counts_by_user(self.user)
+        self.assertEqual(counts['failed_count'], 1)
+        self.assertEqual(counts['active_count'], 0)
+
+    def test_entry_expires_at_next_due_date(self):
+        """Entries never outlive the user's next due date"""
+        self.task = self.repository.update(self.task, due_date=timezone.now() + timedelta(seconds=30))
+        with mock.patch.object(self.repository.status_cache, 'set', wraps=self.repository.status_cache.set) as cache_set:
+            self.repository.get_cached_status_counts_by_user(self.user)
+        timeout = cache_set.call_args.args[3]
+        self.assertLessEqual(timeout, 30)
+        self.assertTrue(cache.has_key(TaskStatusCache.key(self.user.pk)))
+
+
+class TaskConditionalGetTest(TestCase):
+    def setUp(self):
+        """Set up a logged-in user with one task"""
+        cache.clear()
+        self.user = User.objects.create_user(username='etaguser', password='testpass123')
+        self.repository = TaskRepository()
+        self.task = self.repository.create(
+            user=self.user,
+            title="ETag Task",
+            due_date=timezone.now() + timedelta(days=1)
+        )
+        self.client.force_login(self.user)
+
+    def test_status_api_not_modified(self):
+        """A matching If-None-Match gets a 304 with a single state lookup"""
+        url = reverse('tasks:api_task_status')
+        self.client.get(url)
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertIn('no-cache', response['Cache-Control'])
+        
+        with self.assertNumQueries(3):  # session, user, task state
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_writes_change_etag(self):
+        """Repository writes bump the version and invalidate the ETag"""
+        url = reverse('tasks:task_detail', args=[self.task.id])
+        self.client.get(url)
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        
+        self.repository.complete_task(str(self.task.id), self.user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(self.client.get(url)['ETag'], etag)
+
+    def test_admin_edits_change_etag(self):
+        """Saving or deleting a task from the admin invalidates the ETag too"""
+        url = reverse('tasks:task_detail', args=[self.task.id])
+        self.client.get(url)
+        etag = self.client.get(url)['ETag']
+        
+        admin_user = User.objects.create_superuser(username='etagadmin', password='testpass123')
+        admin_client = Client()
+        admin_client.force_login(admin_user)
+        due_date = timezone.localtime(self.task.due_date)
+        response = admin_client.post(reverse('admin:tasks_task_change', args=[self.task.id]), {
+            'user': self.user.pk,
+            'title': 'Edited in admin',
+            'description': '',
+            'due_date_0': due_date.strftime('%Y-%m-%d'),
+            'due_date_1': due_date.strftime('%H:%M:%S'),
+            'status': self.task.status,
+        })
+        self.assertEqual(response.status_code, 302)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        
+        etag = self.client.get(reverse('tasks:task_list'))['ETag']
+        admin_client.post(reverse('admin:tasks_task_delete', args=[self.task.id]), {'post': 'yes'})
+        self.assertFalse(Task.objects.filter(pk=self.task.id).exists())
+        response = self.client.get(reverse('tasks:task_list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+    
+    def test_pending_reconciliation_disables_validators(self):
+        """No validator is emitted while the user's overdue tasks need reconciliation"""
+        url = reverse('tasks:task_list')
+        self.client.get(url)
+        etag = self.client.get(url)['ETag']
+        self.repository.user_states.filter(user=self.user).update(next_due_at=timezone.now() - timedelta(seconds=1))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(TASKS_EVENTS_HEARTBEAT=30, TASKS_EVENTS_MAX_STREAM=60)
+class TaskEventStreamTest(TestCase):
+    def setUp(self):
+        """Set up a user and a stand-in event broker"""
+        cache.clear()
+        self.broker = TaskEventBroker()
+        self.previous_broker = set_broker(self.broker)
+        self.user = User.objects.create_user(username='eventuser', password='testpass123')
+        self.repository = TaskRepository()
+        self.task = self.repository.create(
+            user=self.user,
+            title="Streamed Task",
+            due_date=timezone.now() + timedelta(days=1)
+        )
+
+    def tearDown(self):
+        set_broker(self.previous_broker)
+
+    def _complete_task(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.repository.complete_task(str(self.task.id), self.user)
+
+    async def test_stream_pushes_status_deltas(self):
+        """The stream sends a snapshot, then only the counts that changed"""
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('tasks:api_task_events'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = response.streaming_content
+        
+        self.assertTrue((await anext(stream)).startswith(b'retry:'))
+        snapshot = await asyncio.wait_for(anext(stream), 5)
+        self.assertIn(b'"active_count": 1', snapshot)
+        self.assertEqual(self.broker.subscriber_count(self.user.pk), 1)
+        
+        await sync_to_async(self._complete_task)()
+        delta = await asyncio.wait_for(anext(stream), 5)
+        self.assertIn(b'event: status', delta)
+        self.assertIn(b'"completed_count": 1', delta)
+        self.assertNotIn(b'failed_count', delta)
+        await stream.aclose()
+
+    def test_stream_requires_asgi(self):
+        """Under WSGI the endpoint tells EventSource clients to fall back to polling"""
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('tasks:api_task_events'))
+        self.assertEqual(response.status_code, 204)
+
+    async def test_broker_publishes_only_to_subscribed_users(self):
+        """Repository writes are published to the owner's subscriptions only"""
+        own = self.broker.subscribe(self.user.pk)
+        other = self.broker.subscribe(-1)
+        await sync_to_async(self._complete_task)()
+        self.assertEqual(await own.wait(1), {"type": "tasks_changed"})
+        self.assertIsNone(await other.wait(0.05))
+
+
+class DueDateSchedulerTest(TestCase):
+    def setUp(self):
+        """Set up users with staggered due dates"""
+        cache.clear()
+        self.repository = TaskRepository()
+        self.now = timezone.now()
+        self.users = [
+            User.objects.create_user(username=f'scheduleuser{i}', password='testpass123')
+            for i in range(3)
+        ]
+        for i, user in enumerate(self.users):
+            self.repository.create(user=user, title="Soon", due_date=self.now + timedelta(minutes=i + 1))
+            self.repository.create(user=user, title="Later", due_date=self.now + timedelta(days=1))
+
+    def test_rebuild_schedules_each_user_once(self):
+        """The heap holds each user's earliest due date, rebuilt from the database"""
+        legacy_user = User.objects.create_user(username='legacyuser', password='testpass123')
+        Task.objects.create(user=legacy_user, title="No state row", due_date=self.now + timedelta(hours=1))
+        
+        scheduler = DueDateScheduler()
+        self.assertEqual(scheduler.rebuild(), 4)
+        self.assertEqual(scheduler.next_due_at(), self.now + timedelta(minutes=1))
+        self.assertFalse(self.repository.user_states.get_reschedule_user_ids())
+        
+        # A fresh process loads the stored watermarks without touching tasks
+        with self.assertNumQueries(3):
+            self.assertEqual(DueDateScheduler().rebuild(), 4)
+
+    def test_run_due_fails_only_due_users(self):
+        """Only users whose due date passed are updated, then rescheduled"""
+        scheduler = DueDateScheduler()
+        scheduler.rebuild()
+        self.assertEqual(scheduler.run_due(self.now), 0)
+        
+        updated_count = scheduler.run_due(self.now + timedelta(minutes=2, seconds=30))
+        self.assertEqual(updated_count, 2)
+        self.assertEqual(self.repository.get_failed_tasks().count(), 2)
+        self.assertEqual(self.repository.get_failed_tasks_by_user(self.users[2]).count(), 0)
+        self.assertEqual(scheduler.next_due_at(), self.now + timedelta(minutes=3))
+        self.assertEqual(len(scheduler), 3)
+
+    def test_refresh_picks_up_earlier_due_dates(self):
+        """A task due sooner than the user's watermark is rescheduled on the next poll"""
+        scheduler = DueDateScheduler()
+        scheduler.rebuild()
+        self.repository.create(user=self.users[2], title="Urgent", due_date=self.now + timedelta(seconds=10))
+        
+        self.assertEqual(scheduler.refresh(), 1)
+        self.assertEqual(scheduler.next_due_at(), self.now + timedelta(seconds=10))
+        self.assertEqual(scheduler.run_due(self.now + timedelta(seconds=20)), 1)
+        self.assertEqual(self.repository.get_failed_tasks_by_user(self.users[2]).get().title, "Urgent")
+
+    def test_reconciliation_does_not_consume_the_reschedule_signal(self):
+        """A dashboard load reconciling a new early task still lets the scheduler reschedule it"""
+        user = User.objects.create_user(username='dashboarduser', password='testpass123')
+        self.repository.create(user=user, title="Far", due_date=self.now + timedelta(days=5))
+        scheduler = DueDateScheduler()
+        scheduler.rebuild()
+        
+        self.repository.create(user=user, title="Urgent", due_date=timezone.now() + timedelta(seconds=10))
+        self.client.force_login(user)
+        self.client.get(reverse('tasks:task_list'))
+        self.assertFalse(self.repository.user_states.get_for_user(user).is_stale)
+        
+        self.assertEqual(scheduler.refresh(), 1)
+        self.assertEqual(scheduler.run_due(timezone.now() + timedelta(seconds=30)), 1)
+        self.assertEqual(self.repository.get_failed_tasks_by_user(user).get().title, "Urgent")
+
+    def test_run_sleeps_until_next_due_date(self):
+        """The loop wakes up at the next due date, never later than the poll interval"""
+        sleeps = []
+        scheduler = DueDateScheduler(poll_interval=30, sleep=sleeps.append, clock=lambda: self.now)
+        scheduler.run(max_runs=2)
+        self.assertEqual(len(sleeps), 1)
+        self.assertAlmostEqual(sleeps[0], 30)
+        
+        scheduler = DueDateScheduler(poll_interval=300, clock=lambda: self.now)
+        scheduler.rebuild()
+        self.assertAlmostEqual(scheduler.seconds_until_next(), 60)
+
+    def test_command_schedule_mode(self):
+        """The management command can run the scheduler for a bounded number of runs"""
+        self.repository.create(user=self.users[0], title="Overdue", due_date=self.now - timedelta(hours=1))
+        out = StringIO()
+        call_command('update_overdue_tasks', schedule=True, max_runs=1, interval=0, stdout=out)
+        self.assertIn('Updated 1 overdue tasks', out.getvalue())
+        self.assertEqual(self.repository.get_failed_tasks().count(), 1)
+
+
+class TaskBulkOperationsTest(TestCase):
+    def setUp(self):
+        """Set up tasks for two users"""
+        cache.clear()
+        self.user = User.objects.create_user(username='bulkuser', password='testpass123')
+        self.other_user = User.objects.create_user(username='otherbulkuser', password='testpass123')
+        self.repository = TaskRepository()
+        self.tasks = [
+            self.repository.create(user=self.user, title=f"Bulk {i}", due_date=timezone.now() + timedelta(days=1))
+            for i in range(5)
+        ]
+        self.foreign_task = self.repository.create(
+            user=self.other_user, title="Foreign", due_date=timezone.now() + timedelta(days=1)
+        )
+
+    def test_complete_tasks_in_one_update(self):
+        """Completing many tasks costs a constant number of queries"""
+        task_ids = [str(task.id) for task in self.tasks] + [str(self.foreign_task.id), "bogus"]
+        self.repository.complete_task(task_ids[0], self.user)
+        with self.assertNumQueries(7):  # savepoint, select, update, events, daily stats, state touch, release
+            results = self.repository.complete_tasks(task_ids, self.user)
+        self.assertEqual(results[task_ids[0]], "invalid_status")
+        self.assertEqual([results[task_id] for task_id in task_ids[1:5]], ["completed"] * 4)
+        self.assertEqual(results[str(self.foreign_task.id)], "not_found")
+        self.assertEqual(results["bogus"], "not_found")
+        self.assertEqual(self.repository.get_completed_tasks_by_user(self.user).count(), 5)
+        self.foreign_task.refresh_from_db()
+        self.assertEqual(self.foreign_task.status, "active")
+
+    def test_reactivate_and_delete_tasks(self):
+        """Failed tasks are reactivated and any owned task can be deleted"""
+        Task.objects.filter(pk__in=[task.pk for task in self.tasks[:2]]).update(status="failed")
+        new_due_date = timezone.now() + timedelta(days=3)
+        results = self.repository.reactivate_tasks([str(task.id) for task in self.tasks[:3]], self.user, new_due_date)
+        self.assertEqual(list(results.values()), ["reactivated", "reactivated", "invalid_status"])
+        self.tasks[0].refresh_from_db()
+        self.assertEqual(self.tasks[0].reactivation_count, 1)
+        self.assertEqual(self.tasks[0].due_date, new_due_date)
+        
+        results = self.repository.delete_tasks([str(task.id) for task in self.tasks] + [str(self.foreign_task.id)], self.user)
+        self.assertEqual(list(results.values()).count("deleted"), 5)
+        self.assertFalse(self.repository.exists(user=self.user))
+        self.assertTrue(self.repository.exists(pk=self.foreign_task.pk))
+
+    def test_bulk_api(self):
+        """The bulk endpoint accepts JSON and reports per-id results"""
+        self.client.force_login(self.user)
+        url = reverse('tasks:api_task_bulk', args=['complete'])
+        response = self.client.post(
+            url,
+            json.dumps({'ids': [str(self.tasks[0].id), str(self.foreign_task.id)]}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['updated_count'], 1)
+        self.assertEqual(response.json()['results'][str(self.foreign_task.id)], 'not_found')
+        
+        response = self.client.post(
+            reverse('tasks:api_task_bulk', args=['reactivate']),
+            json.dumps({'ids': [str(self.tasks[1].id)], 'new_due_date': 'yesterday'}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.post(url, {'ids': []}).status_code, 400)
+        self.assertEqual(self.client.post(reverse('tasks:api_task_bulk', args=['archive']), {'ids': ['x']}).status_code, 404)
+
+
+class TaskImportTest(TestCase):
+    def setUp(self):
+        """Set up a user and some import rows"""
+        cache.clear()
+        self.user = User.objects.create_user(username='importuser', password='testpass123')
+        self.future = (timezone.now() + timedelta(days=2)).strftime('%Y-%m-%d %H:%M')
+        self.past = (timezone.now() - timedelta(days=2)).strftime('%Y-%m-%d %H:%M')
+
+    def _write_file(self, suffix, content):
+        handle, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(handle, 'w', encoding='utf-8') as target:
+            target.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_import_csv_command(self):
+        """CSV rows are validated like TaskForm and saved in batches"""
+        lines = ["title,description,due_date"]
+        lines += [f"Imported {i},Row {i},{self.future}" for i in range(5)]
+        lines += [f"Past task,,{self.past}", f",Missing title,{self.future}"]
+        path = self._write_file('.csv', "\n".join(lines) + "\n")
+        
+        out = StringIO()
+        call_command('import_tasks', path, user='importuser', batch_size=2, stdout=out)
+        self.assertIn('Imported 5 tasks (2 rejected)', out.getvalue())
+        self.assertIn('rows/sec', out.getvalue())
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 5)
+
+    def test_import_jsonl_upload(self):
+        """JSON Lines uploads are streamed and report per-line errors"""
+        content = "\n".join([
+            json.dumps({'title': 'Uploaded', 'due_date': self.future}),
+            '{not json',
+            json.dumps({'title': 'Too late', 'due_date': self.past}),
+        ]).encode()
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse('tasks:api_task_import'),
+            {'file': SimpleUploadedFile('tasks.jsonl', content)},
+        )
+        self.assertEqual(response.status_code, 201)
+        report = response.json()
+        self.assertEqual(report['created'], 1)
+        self.assertEqual(report['failed'], 2)
+        self.assertEqual([error['line'] for error in report['errors']], [2, 3])
+        self.assertIn('due_date', report['errors'][1]['errors'])
+
+    def test_import_latin1_upload(self):
+        """An upload that is not UTF-8 is rejected as a file-level error"""
+        content = f"title,description,due_date\nCaf\u00e9,R\u00e9sum\u00e9,{self.future}\n".encode('latin-1')
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse('tasks:api_task_import'),
+            {'file': SimpleUploadedFile('tasks.csv', content)},
+        )
+        self.assertEqual(response.status_code, 400)
+        report = response.json()
+        self.assertIn('Unreadable file', report['error'])
+        self.assertEqual(report['created'], 0)
+        self.assertFalse(Task.objects.filter(user=self.user).exists())
+
+    def test_import_command_reports_rows_committed_before_a_decoding_error(self):
+        """A decoding error stops the command, keeping and reporting the batches already saved"""
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(handle, 'wb') as target:
+            target.write(b"title,description,due_date\n")
+            # Past the text decoder's first read, so earlier batches are saved first
+            for i in range(400):
+                target.write(f"Imported {i},Row {i},{self.future}\n".encode())
+            target.write(f"Caf\u00e9,,{self.future}\n".encode('latin-1'))
+        self.addCleanup(os.remove, path)
+
+        with self.assertRaisesMessage(CommandError, 'Unreadable file') as raised:
+            call_command('import_tasks', path, user='importuser', batch_size=10, stdout=StringIO())
+        created = Task.objects.filter(user=self.user).count()
+        self.assertGreater(created, 0)
+        self.assertLess(created, 400)
+        self.assertIn(f'({created} tasks already imported', str(raised.exception))
+
+
+class TaskExportTest(TestCase):
+    def setUp(self):
+        """Set up tasks for a regular user and a staff user"""
+        self.user = User.objects.create_user(username='exportuser', password='testpass123')
+        self.staff = User.objects.create_user(username='exportstaff', password='testpass123', is_staff=True)
+        self.repository = TaskRepository()
+        for i in range(3):
+            self.repository.create(user=self.user, title=f"Export {i}", description="a, b", due_date=timezone.now() + timedelta(days=1))
+        self.repository.create(user=self.staff, title="Staff task", due_date=timezone.now() + timedelta(days=1))
+
+    def test_export_streams_user_tasks(self):
+        """The export endpoint streams only the user's tasks"""
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('tasks:api_task_export'), {'format': 'jsonl'})
+        self.assertTrue(response.streaming)
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['title'], 'Export 2')
+        self.assertEqual(self.client.get(reverse('tasks:api_task_export'), {'scope': 'all'}).status_code, 403)
+
+    def test_staff_export_all_as_csv(self):
+        """Staff can export every task, including the owner's username"""
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('tasks:api_task_export'), {'scope': 'all'})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(',')[-1], 'user__username')
+        self.assertEqual(len(lines), 5)
+        self.assertIn('"a, b"', lines[1] + lines[2] + lines[3] + lines[4])
+
+    async def test_asgi_export_streams_asynchronously(self):
+        """Under ASGI the export is an async iterator, pulled in bounded chunks"""
+        await self.async_client.aforce_login(self.user)
+        with mock.patch.object(exporters, '_next_chunk', wraps=exporters._next_chunk) as next_chunk:
+            response = await self.async_client.get(reverse('tasks:api_task_export'), {'format': 'jsonl'})
+            self.assertTrue(response.is_async)
+            body = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(body.decode().splitlines()), 3)
+        # One chunk of rows, then the empty chunk ending the stream
+        self.assertEqual(next_chunk.call_count, 2)
+
+    def test_export_command(self):
+        """The export command writes rows without instantiating models"""
+        out, err = StringIO(), StringIO()
+        with mock.patch.object(Task, '__init__', side_effect=AssertionError('model instantiated')):
+            call_command('export_tasks', user='exportuser', format='csv', stdout=out, stderr=err)
+        self.assertEqual(len(out.getvalue().splitlines()), 4)
+        self.assertIn('Exported 3 tasks', err.getvalue())
+
+
+class UserTaskRepositoryTest(TestCase):
+    def setUp(self):
+        """Set up tasks for two users"""
+        cache.clear()
+        self.user = User.objects.create_user(username='scopeduser', password='testpass123')
+        self.other_user = User.objects.create_user(username='otherscopeduser', password='testpass123')
+        self.repository = TaskRepository()
+        self.task = self.repository.create(user=self.user, title="Mine", due_date=timezone.now() + timedelta(days=1))
+        self.foreign_task = self.repository.create(
+            user=self.other_user, title="Theirs", due_date=timezone.now() + timedelta(days=1)
+        )
+        self.scoped = self.repository.for_user(self.user)
+
+    def test_scoped_queries_hide_foreign_tasks(self):
+        """Foreign and malformed ids behave like missing tasks"""
+        self.assertIsNotNone(self.scoped.get_by_id(str(self.task.id)))
+        self.assertIsNone(self.scoped.get_by_id(str(self.foreign_task.id)))
+        self.assertIsNone(self.scoped.get_by_id("not-a-uuid"))
+        self.assertFalse(self.scoped.complete_task(str(self.foreign_task.id)))
+        self.assertFalse(self.scoped.delete_task(str(self.foreign_task.id)))
+        self.foreign_task.refresh_from_db()
+        self.assertEqual(self.foreign_task.status, "active")
+
+    def test_complete_task_is_a_single_update(self):
+        """Completing a task issues no SELECT on tasks"""
+        with self.assertNumQueries(4):  # conditional UPDATE ... RETURNING, event, daily stats, task state touch
+            self.assertTrue(self.scoped.complete_task(str(self.task.id)))
+        with self.assertNumQueries(1):  # one conditional UPDATE over both completable statuses
+            self.assertIsNone(self.scoped.complete_task(str(self.task.id)))
+
+    def test_status_views_name_the_task(self):
+        """Complete, reactivate and delete messages carry the title returned by their single statement"""
+        self.client.force_login(self.user)
+        self.client.post(reverse('tasks:task_complete', args=[self.task.id]))
+        Task.objects.filter(pk=self.task.pk).update(status='failed')
+        due_date = timezone.localtime(timezone.now() + timedelta(days=2)).strftime('%Y-%m-%dT%H:%M')
+        self.client.post(reverse('tasks:reactivate_task', args=[self.task.id]), {'new_due_date': due_date})
+        response = self.client.post(reverse('tasks:task_delete', args=[self.task.id]))
+        self.assertEqual(
+            [str(message) for message in get_messages(response.wsgi_request)],
+            [format_task_message(action, "Mine") for action in ("marked as completed", "reactivated", "deleted")],
+        )
+
+    def test_detail_view_does_not_load_user(self):
+        """The detail view checks ownership in SQL and loads only the needed columns"""
+        self.client.force_login(self.user)
+        self.client.get(reverse('tasks:task_detail', args=[self.task.id]))
+        with self.assertNumQueries(4):  # session, user, task state, task
+            response = self.client.get(reverse('tasks:task_detail', args=[self.task.id]))
+        self.assertEqual(response.status_code, 200)
+        
+        response = self.client.get(reverse('tasks:task_detail', args=[self.foreign_task.id]))
+        self.assertRedirects(response, reverse('tasks:task_list'))
+
+    def test_update_and_delete_views(self):
+        """Updating and deleting go through the scoped repository"""
+        self.client.force_login(self.user)
+        due_date = (timezone.localtime() + timedelta(days=2)).strftime('%Y-%m-%dT%H:%M')
+        response = self.client.post(
+            reverse('tasks:task_update', args=[self.task.id]),
+            {'title': 'Renamed', 'description': '', 'due_date': due_date},
+        )
+        self.assertRedirects(response, reverse('tasks:task_detail', args=[self.task.id]), fetch_redirect_response=False)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.title, 'Renamed')
+        
+        self.client.post(reverse('tasks:task_delete', args=[self.foreign_task.id]))
+        self.assertTrue(Task.objects.filter(pk=self.foreign_task.pk).exists())
+        self.client.post(reverse('tasks:task_delete', args=[self.task.id]))
+        self.assertFalse(Task.objects.filter(pk=self.task.pk).exists())
+
+
+PERF_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'apps.tasks.instrumentation.TaskPerfMiddleware',
+]
+
+
+class TaskInstrumentationTest(TestCase):
+    def setUp(self):
+        """Set up a user with a few tasks and an empty metrics window"""
+        cache.clear()
+        perf_stats.reset()
+        self.user = User.objects.create_user(username='perfuser', password='testpass123')
+        self.staff = User.objects.create_user(username='perfstaff', password='testpass123', is_staff=True)
+        self.repository = TaskRepository()
+        for i in range(3):
+            self.repository.create(
+                user=self.user,
+                title=f"Task {i}",
+                description="",
+                due_date=timezone.now() + timedelta(days=i + 1),
+            )
+
+    def test_percentile_uses_nearest_rank(self):
+        """Percentiles pick an observed value"""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([], 95), 0.0)
+
+    def test_middleware_records_metrics_per_url_name(self):
+        """Each request records its query count and template time under the URL name"""
+        templates = [{**settings.TEMPLATES[0], 'BACKEND': 'apps.tasks.instrumentation.InstrumentedDjangoTemplates'}]
+        with override_settings(MIDDLEWARE=PERF_MIDDLEWARE, TEMPLATES=templates):
+            self.client.force_login(self.user)
+            self.client.get(reverse('tasks:task_list'))
+            self.client.get(reverse('tasks:api_task_status'))
+        
+        report = perf_stats.snapshot()
+        self.assertEqual(report['tasks:task_list']['requests'], 1)
+        self.assertGreater(report['tasks:task_list']['queries']['p50'], 0)
+        self.assertGreater(report['tasks:task_list']['template_ms']['max'], 0)
+        self.assertEqual(report['tasks:api_task_status']['template_ms']['max'], 0)
+
+    def test_perf_endpoint_is_staff_only(self):
+        """Only staff can read the metrics"""
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse('tasks:api_task_perf')).status_code, 403)
+        
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('tasks:api_task_perf'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('views', response.json())
+
+    def test_report_command_exercises_views(self):
+        """task_perf_report --exercise requests the main views in-process"""
+        out = StringIO()
+        call_command('task_perf_report', exercise='perfuser', requests=2, json=True, stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['tasks:task_list']['requests'], 2)
+        self.assertIn('tasks:api_task_list', report)
+
+
+# Seeded volume of the query budget suite; raise it for a realistic run, e.g.
+# TASKS_PERF_USERS=50 TASKS_PERF_TASKS_PER_USER=5000 python manage.py test apps.tasks.tests.TaskQueryBudgetTest
+PERF_USERS = int(os.environ.get('TASKS_PERF_USERS', 5))
+PERF_TASKS_PER_USER = int(os.environ.get('TASKS_PERF_TASKS_PER_USER', 200))
+# JSON file of per-case timings; cases slower than tolerance x baseline (+50ms) fail
+# when the seeded volume matches. Written when missing or when TASKS_PERF_BASELINE_UPDATE=1
+PERF_BASELINE_PATH = os.environ.get('TASKS_PERF_BASELINE')
+PERF_BASELINE_TOLERANCE = float(os.environ.get('TASKS_PERF_BASELINE_TOLERANCE', 3))
+
+
+class TaskQueryBudgetTest(TestCase):
+    """
+    Query budgets for every task endpoint against a seeded data set. The
+    budgets do not depend on the number of tasks, so an N+1 or a per-row
+    loop fails regardless of the seeded volume.
+    """
+    timings = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        """Seed users with a mix of active, overdue, completed and failed tasks"""
+        password = make_password('testpass123')
+        User.objects.bulk_create([User(username=f'budgetuser{i}', password=password) for i in range(PERF_USERS)])
+        cls.users = list(User.objects.filter(username__startswith='budgetuser').order_by('username'))
+        
+        now = timezone.now()
+        repository = TaskRepository()
+        for user in cls.users:
+            tasks = []
+            for i in range(PERF_TASKS_PER_USER):
+                bucket = i % 10
+                status = 'completed' if bucket < 2 else 'failed' if bucket == 2 else 'active'
+                due_date = now - timedelta(hours=i + 1) if bucket == 3 else now + timedelta(hours=i + 1)
+                tasks.append(Task(user=user, title=f'Task {i}', description='x' * (i % 200), due_date=due_date, status=status))
+            repository.bulk_create(tasks, batch_size=1000)
+        cls.user = cls.users[0]
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        if PERF_BASELINE_PATH and (os.environ.get('TASKS_PERF_BASELINE_UPDATE') == '1' or not os.path.exists(PERF_BASELINE_PATH)):
+            with open(PERF_BASELINE_PATH, 'w', encoding='utf-8') as baseline_file:
+                json.dump({
+                    'users': PERF_USERS,
+                    'tasks_per_user': PERF_TASKS_PER_USER,
+                    'timings': {name: round(seconds, 6) for name, seconds in sorted(cls.timings.items())},
+                }, baseline_file, indent=2)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.active_task = Task.objects.filter(user=self.user, status='active', due_date__gt=timezone.now()).first()
+        self.failed_task = Task.objects.filter(user=self.user, status='failed').first()
+
+    @contextmanager
+    def query_budget(self, name, max_queries):
+        """Fail when the block runs more than max_queries queries, and record its timing"""
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            yield
+            elapsed = time.perf_counter() - started
+        queries = "\n".join(query['sql'] for query in captured.captured_queries)
+        self.assertLessEqual(len(captured), max_queries, f'{name} ran {len(captured)} queries:\n{queries}')
+        
+        self.timings[name] = elapsed
+        baseline = self._baseline().get(name)
+        if baseline is not None:
+            self.assertLessEqual(elapsed, baseline * PERF_BASELINE_TOLERANCE + 0.05, f'{name} regressed from {baseline:.4f}s')
+
+    def _baseline(self):
+        if not PERF_BASELINE_PATH or os.environ.get('TASKS_PERF_BASELINE_UPDATE') == '1' or not os.path.exists(PERF_BASELINE_PATH):
+            return {}
+        with open(PERF_BASELINE_PATH, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        # Timings of another seeded volume are not comparable
+        if (baseline['users'], baseline['tasks_per_user']) != (PERF_USERS, PERF_TASKS_PER_USER):
+            return {}
+        return baseline['timings']
+
+    def test_task_list_budget(self):
+        """The dashboard reconciles once, then runs a fixed number of queries"""
+        # Reconciling also appends the failed events (one INSERT)
+        with self.query_budget('task_list_reconcile', 14):
+            response = self.client.get(reverse('tasks:task_list'))
+        self.assertEqual(response.status_code, 200)
+        with self.query_budget('task_list', 7):
+            self.client.get(reverse('tasks:task_list'))
+
+    def test_task_detail_budget(self):
+        with self.query_budget('task_detail_reconcile', 11):
+            self.client.get(reverse('tasks:task_detail', args=[self.active_task.id]))
+        with self.query_budget('task_detail', 4):
+            response = self.client.get(reverse('tasks:task_detail', args=[self.active_task.id]))
+        self.assertEqual(response.status_code, 200)
+
+    def test_api_budgets(self):
+        with self.query_budget('api_task_status', 13):
+            self.assertEqual(self.client.get(reverse('tasks:api_task_status')).status_code, 200)
+        with self.query_budget('api_task_status_cached', 3):
+            self.client.get(reverse('tasks:api_task_status'))
+        with self.query_budget('api_task_list', 4):
+            response = self.client.get(reverse('tasks:api_task_list'), {'limit': 200})
+        self.assertEqual(len(response.json()['results']), min(200, PERF_TASKS_PER_USER))
+
+    def test_crud_post_budgets(self):
+        due_date = (timezone.localtime() + timedelta(days=2)).strftime('%Y-%m-%dT%H:%M')
+        with self.query_budget('task_create', 5):
+            self.client.post(reverse('tasks:task_create'), {'title': 'New', 'description': '', 'due_date': due_date})
+        with self.query_budget('task_update', 5):
+            self.client.post(
+                reverse('tasks:task_update', args=[self.active_task.id]),
+                {'title': 'Renamed', 'description': '', 'due_date': due_date},
+            )
+        with self.query_budget('task_complete', 6):
+            self.client.post(reverse('tasks:task_complete', args=[self.active_task.id]))
+        with self.query_budget('reactivate_task', 6):
+            self.client.post(reverse('tasks:reactivate_task', args=[self.failed_task.id]), {'new_due_date': due_date})
+        with self.query_budget('task_delete', 4):
+            self.client.post(reverse('tasks:task_delete', args=[self.active_task.id]))
+        
+        ids = list(Task.objects.filter(user=self.user, status='active').values_list('id', flat=True)[:100])
+        with self.query_budget('api_task_bulk_complete', 9):
+            response = self.client.post(
+                reverse('tasks:api_task_bulk', args=['complete']),
+                json.dumps({'ids': [str(task_id) for task_id in ids]}),
+                content_type='application/json',
+            )
+        self.assertEqual(response.json()['updated_count'], len(ids))
+
+    def test_update_overdue_tasks_budget(self):
+        """The sweep costs a fixed number of queries per batch, never per task"""
+        batch_size = 500
+        overdue = Task.objects.filter(status='active', due_date__lt=timezone.now()).count()
+        batches = overdue // batch_size + 1
+        # Per batch: UPDATE ... RETURNING, event INSERT, daily stats upsert, state touch; plus the final status summary
+        with self.query_budget('update_overdue_tasks', batches * 4 + 2):
+            call_command('update_overdue_tasks', batch_size=batch_size, stdout=StringIO())
+        self.assertFalse(Task.objects.filter(status='active', due_date__lt=timezone.now()).exists())
+
+
+class TaskSeedingTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_seed_command_follows_distributions(self):
+        """seed_tasks creates the requested volume with the configured statuses and sizes"""
+        out = StringIO()
+        call_command(
+            'seed_tasks', users=3, tasks_per_user=40, prefix='loaduser', seed=7,
+            status_weights='active=1,failed=1', description_size='10:20', batch_size=25, stdout=out,
+        )
+        self.assertIn('Seeded 120 tasks for 3 users', out.getvalue())
+        self.assertEqual(User.objects.filter(username__startswith='loaduser').count(), 3)
+        self.assertFalse(Task.objects.filter(status='completed').exists())
+        self.assertFalse(Task.objects.filter(status='failed', due_date__gt=timezone.now()).exists())
+        self.assertTrue(all(10 <= len(description) <= 20 for description in Task.objects.values_list('description', flat=True)))
+        self.assertTrue(User.objects.get(username='loaduser0').check_password('loadtest123'))
+
+    def test_seed_is_reproducible(self):
+        """The same seed generates the same statuses"""
+        user = User.objects.create_user(username='seeduser', password='testpass123')
+        now = timezone.now()
+        first = [task.status for task in TaskSeeder(seed=3).generate_tasks([user.pk], 50, now)]
+        second = [task.status for task in TaskSeeder(seed=3).generate_tasks([user.pk], 50, now)]
+        self.assertEqual(first, second)
+
+    def test_invalid_weights_are_rejected(self):
+        with self.assertRaises(CommandError):
+            call_command('seed_tasks', status_weights='pending=1', stdout=StringIO())
+
+
+class DatabaseConfigTest(TestCase):
+    def test_sqlite_profile_uses_wal_and_persistent_connections(self):
+        config = database_config(Path('/srv/app'), env={'DJANGO_DB_CONN_MAX_AGE': '120'})
+        self.assertEqual(config['ENGINE'], 'django.db.backends.sqlite3')
+        self.assertEqual(config['NAME'], str(Path('/srv/app') / 'db.sqlite3'))
+        self.assertEqual(config['CONN_MAX_AGE'], 120)
+        self.assertTrue(config['CONN_HEALTH_CHECKS'])
+        self.assertIn('PRAGMA journal_mode=WAL', config['OPTIONS']['init_command'])
+        self.assertEqual(config['OPTIONS']['transaction_mode'], 'IMMEDIATE')
+
+    def test_postgresql_pool_profile(self):
+        config = database_config(Path('/srv/app'), env={
+            'DJANGO_DB_ENGINE': 'postgresql',
+            'DJANGO_DB_NAME': 'tasks',
+            'DJANGO_DB_POOL': '1',
+            'DJANGO_DB_POOL_MAX_SIZE': '20',
+        })
+        self.assertEqual(config['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual(config['OPTIONS']['pool']['max_size'], 20)
+        # Django rejects persistent connections combined with a pool
+        self.assertEqual(config['CONN_MAX_AGE'], 0)
+
+    def test_asgi_defaults_to_closing_connections(self):
+        config = database_config(Path('/srv/app'), env={'DJANGO_ASGI': '1'})
+        self.assertEqual(config['CONN_MAX_AGE'], 0)
+        config = database_config(Path('/srv/app'), env={'DJANGO_ASGI': '1', 'DJANGO_DB_CONN_MAX_AGE': '30'})
+        self.assertEqual(config['CONN_MAX_AGE'], 30)
+
+    def test_unknown_engine_is_rejected(self):
+        with self.assertRaises(ValueError):
+            database_config(Path('/srv/app'), env={'DJANGO_DB_ENGINE': 'oracle'})
+
+
+REPLICA_TEST_ALIAS = 'replica_test'
+
+
+@override_settings(TASKS_REPLICA_DATABASE=REPLICA_TEST_ALIAS)
+class TaskReplicaRoutingTest(TestCase):
+    """Reads and writes against two SQLite databases standing in for primary and replica"""
+    # The replica only exists for this class: registered, created and
+    # migrated in setUpClass (after the runner collected the databases to
+    # set up), then dropped again in tearDownClass
+    databases = {'default'}
+
+    @classmethod
+    def setUpClass(cls):
+        connections.settings[REPLICA_TEST_ALIAS] = {
+            **connections.settings['default'],
+            'TEST': {**connections.settings['default']['TEST'], 'MIRROR': None, 'NAME': None},
+        }
+        cls.databases = {'default', REPLICA_TEST_ALIAS}
+        cls._replica_name = connections[REPLICA_TEST_ALIAS].settings_dict['NAME']
+        connections[REPLICA_TEST_ALIAS].creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            super().setUpClass()
+        except Exception:
+            cls._drop_replica()
+            raise
+
+    @classmethod
+    def tearDownClass(cls):
+        try:
+            super().tearDownClass()
+        finally:
+            cls._drop_replica()
+
+    @classmethod
+    def _drop_replica(cls):
+        connections[REPLICA_TEST_ALIAS].creation.destroy_test_db(cls._replica_name, verbosity=0)
+        del connections[REPLICA_TEST_ALIAS]
+        del connections.settings[REPLICA_TEST_ALIAS]
+
+    def setUp(self):
+        cache.clear()
+        self.repository = TaskRepository()
+        self.user = User.objects.create_user(username='replicauser', password='testpass123')
+        self.other = User.objects.create_user(username='replicaother', password='testpass123')
+        with use_primary():
+            self.task = Task.objects.create(user=self.user, title='Primary only', due_date=timezone.now() + timedelta(days=1))
+
+    def test_reads_go_to_replica_and_writes_to_primary(self):
+        """Rows missing from the lagging replica are invisible to plain reads"""
+        self.assertFalse(self.repository.get_active_tasks_by_user(self.user).exists())
+        with use_primary():
+            self.assertTrue(self.repository.get_active_tasks_by_user(self.user).exists())
+
+    def test_writes_pin_reads_to_primary(self):
+        """A user who changed tasks reads their own writes for the sticky window"""
+        with use_primary():
+            self.repository.create(user=self.other, title='New', due_date=timezone.now() + timedelta(days=1))
+            self.assertTrue(wrote_recently(self.other.pk))
+        self.assertFalse(wrote_recently(self.user.pk))
+
+    def test_middleware_keeps_recent_writers_on_primary(self):
+        """Requests of a recent writer see the primary, others the replica"""
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('tasks:api_task_list'))
+        self.assertEqual(response.json()['results'], [])
+        
+        self.client.post(reverse('tasks:task_complete', args=[self.task.id]))
+        response = self.client.get(reverse('tasks:api_task_list'))
+        self.assertEqual([task['id'] for task in response.json()['results']], [str(self.task.id)])
+
+    def test_background_jobs_read_from_primary(self):
+        """The sweeper and the scheduler see overdue tasks the replica does not have yet"""
+        with use_primary():
+            overdue = Task.objects.create(user=self.other, title='Overdue', due_date=timezone.now() - timedelta(hours=1))
+        self.assertEqual(OverdueTaskSweeper(batch_size=10).sweep(), 1)
+
+        with use_primary():
+            Task.objects.filter(pk=overdue.pk).update(status='active')
+        scheduler = DueDateScheduler()
+        self.assertEqual(scheduler.rebuild(), 2)
+        self.assertEqual(scheduler.run_due(timezone.now()), 1)
+
+
+class TaskDueAnnotationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='dueuser', password='testpass123')
+        self.now = timezone.now()
+        self.offsets = [
+            timedelta(days=-3, hours=-1),
+            timedelta(hours=-2),
+            timedelta(minutes=-1),
+            timedelta(hours=2),
+            timedelta(days=1, hours=1),
+            timedelta(days=5),
+        ]
+        Task.objects.bulk_create([
+            Task(user=self.user, title=f"Task {i}", due_date=self.now + offset)
+            for i, offset in enumerate(self.offsets)
+        ])
+
+    def test_annotations_match_python_properties(self):
+        """The SQL values equal the Python fallback for the same instant"""
+        annotated = {task.pk: task for task in Task.objects.with_due_info(self.now)}
+        with mock.patch('apps.tasks.models.timezone.now', return_value=self.now):
+            for task in Task.objects.all():
+                self.assertEqual(annotated[task.pk].is_overdue, task.is_overdue)
+                self.assertEqual(annotated[task.pk].days_until_due, task.days_until_due)
+                self.assertEqual(annotated[task.pk].overdue_days, task.overdue_days)
+        self.assertEqual(
+            sorted(task.days_until_due for task in annotated.values()),
+            [-4, -1, -1, 0, 1, 5],
+        )
+
+    def test_annotated_rows_skip_python_date_math(self):
+        """Reading annotated properties never asks for the current time"""
+        tasks = list(Task.objects.with_due_info(self.now))
+        with mock.patch('apps.tasks.models.timezone.now') as now:
+            for task in tasks:
+                task.is_overdue, task.days_until_due, task.overdue_days
+        now.assert_not_called()
+
+    def test_dashboard_and_admin_use_annotations(self):
+        """The dashboard and the admin changelist render from annotated rows"""
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('tasks:task_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(all('_days_until_due' in task.__dict__ for task in response.context['active_tasks']))
+        
+        admin = User.objects.create_superuser(username='dueadmin', password='testpass123')
+        self.client.force_login(admin)
+        response = self.client.get(reverse('admin:tasks_task_changelist'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(all(hasattr(task, '_is_overdue') for task in response.context['cl'].result_list))
+
+
+class TaskFragmentCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='fragmentuser', password='testpass123')
+        self.repository = TaskRepository()
+        self.tasks = [
+            self.repository.create(user=self.user, title=f"Card {i}", due_date=timezone.now() + timedelta(days=3))
+            for i in range(3)
+        ]
+
+    def test_cards_are_rendered_once(self):
+        """A second dashboard render reuses every cached card"""
+        self.client.force_login(self.user)
+        with mock.patch('apps.tasks.utils.render_to_string', wraps=render_to_string) as render:
+            self.client.get(reverse('tasks:task_list'))
+            self.assertEqual(render.call_count, 3)
+            render.reset_mock()
+            response = self.client.get(reverse('tasks:task_list'))
+            render.assert_not_called()
+        self.assertContains(response, 'Card 2')
+
+    def test_writes_invalidate_cards(self):
+        """Updating or completing a task bumps its version and re-renders its card"""
+        self.client.force_login(self.user)
+        self.client.get(reverse('tasks:task_list'))
+        
+        self.repository.for_user(self.user).update(self.tasks[0], title='Renamed card')
+        self.repository.for_user(self.user).complete_task(str(self.tasks[1].id))
+        with mock.patch('apps.tasks.utils.render_to_string', wraps=render_to_string) as render:
+            response = self.client.get(reverse('tasks:task_list'))
+        self.assertEqual(render.call_count, 2)
+        self.assertContains(response, 'Renamed card')
+        self.assertEqual(len(response.context['cards']['completed']), 1)
+
+    def test_cached_cards_carry_each_session_csrf_token(self):
+        """Cards cached for one session post fine from another session"""
+        first = Client(enforce_csrf_checks=True)
+        first.force_login(self.user)
+        first.get(reverse('tasks:task_list'))
+        
+        second = Client(enforce_csrf_checks=True)
+        second.force_login(self.user)
+        response = second.get(reverse('tasks:task_list'))
+        self.assertNotContains(response, CSRF_PLACEHOLDER)
+        token = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', response.content.decode()).group(1)
+        response = second.post(reverse('tasks:task_complete', args=[self.tasks[0].id]), {'csrfmiddlewaretoken': token})
+        self.assertEqual(response.status_code, 302)
+        self.tasks[0].refresh_from_db()
+        self.assertEqual(self.tasks[0].status, 'completed')
+
+
+class TaskAsyncViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='asyncuser', password='testpass123')
+        self.repository = TaskRepository()
+        self.task = self.repository.create(user=self.user, title="Async Task", due_date=timezone.now() + timedelta(days=2))
+        self.overdue_task = self.repository.create(user=self.user, title="Late Task", due_date=timezone.now() - timedelta(hours=1))
+
+    async def test_task_list_reconciles_and_revalidates(self):
+        """The async dashboard fails overdue tasks, then answers revalidations with a 304"""
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('tasks:task_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Async Task')
+        self.assertContains(response, 'Ciao, asyncuser!')
+        self.assertEqual(response.context['statistics'].failed_count, 1)
+        
+        response = await self.async_client.get(reverse('tasks:task_list'))
+        response = await self.async_client.get(reverse('tasks:task_list'), headers={'if-none-match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_task_detail(self):
+        """The async detail view serves owned tasks and redirects otherwise"""
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('tasks:task_detail', args=[self.task.id]))
+        self.assertContains(response, 'Async Task')
+        
+        response = await self.async_client.get(reverse('tasks:task_detail', args=['not-a-uuid']))
+        self.assertRedirects(response, reverse('tasks:task_list'), fetch_redirect_response=False)
+
+    async def test_api_task_status_is_cached(self):
+        """The async status API reconciles on a miss and is then served from the cache"""
+        await self.async_client.aforce_login(self.user)
+        data = (await self.async_client.get(reverse('tasks:api_task_status'))).json()
+        self.assertEqual((data['updated_count'], data['active_count'], data['failed_count']), (1, 1, 1))
+        state = await self.repository.user_states.aget_for_user(self.user)
+        self.assertEqual(await TaskStatusCache().aget(self.user.pk, state.version), await self.repository.aget_status_counts_by_user(self.user))
+        
+        with mock.patch.object(TaskRepository, 'aget_status_counts_by_user') as counts:
+            data = (await self.async_client.get(reverse('tasks:api_task_status'))).json()
+        counts.assert_not_called()
+        self.assertEqual(data['total_count'], 2)
+
+    async def test_async_repository_matches_sync(self):
+        """Async repository methods return what their sync counterparts do"""
+        for i in range(3):
+            await self.repository.acreate(user=self.user, title=f"Paged {i}", due_date=timezone.now() + timedelta(days=1))
+        
+        sync_page = await sync_to_async(self.repository.get_tasks_page_by_user)(self.user, page_size=2)
+        async_page = await self.repository.aget_tasks_page_by_user(self.user, page_size=2)
+        self.assertEqual([task.pk for task in async_page], [task.pk for task in sync_page])
+        self.assertEqual(async_page.next_cursor, sync_page.next_cursor)
+        
+        version = (await self.repository.user_states.aget_by_user_id(self.user.pk)).version
+        self.assertTrue(await self.repository.adelete(self.task))
+        self.assertEqual((await self.repository.user_states.aget_by_user_id(self.user.pk)).version, version + 1)
+        self.assertEqual(await self.repository.acount(user=self.user), 4)
+
+
+class TaskEventTimelineTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='historyuser', password='testpass123')
+        self.other_user = User.objects.create_user(username='otherhistoryuser', password='testpass123')
+        self.repository = TaskRepository()
+        self.task = self.repository.create(user=self.user, title="Tracked", due_date=timezone.now() - timedelta(hours=1))
+        self.other_task = self.repository.create(user=self.other_user, title="Foreign", due_date=timezone.now() - timedelta(hours=1))
+
+    def test_transitions_are_recorded(self):
+        """Failing, reactivating and completing a task each append one event"""
+        self.repository.reconcile_overdue_tasks_for_user(self.user)
+        scoped = self.repository.for_user(self.user)
+        self.assertTrue(scoped.reactivate_task(str(self.task.id), timezone.now() + timedelta(days=1)))
+        self.assertTrue(scoped.complete_task(str(self.task.id)))
+        self.assertFalse(scoped.complete_task(str(self.task.id)))
+        
+        events = TaskEvent.objects.filter(task_id=self.task.id).order_by('occurred_at', 'id')
+        self.assertEqual(list(events.values_list('event', flat=True)), ['failed', 'reactivated', 'completed'])
+        self.assertFalse(TaskEvent.objects.filter(user=self.other_user).exists())
+
+    def test_instance_updates_record_status_changes(self):
+        """Repository updates record an event only when the status changes"""
+        self.repository.update(self.task, title="Renamed")
+        self.assertFalse(TaskEvent.objects.exists())
+        self.repository.update(self.task, status='failed')
+        self.assertEqual(TaskEvent.objects.get().event, 'failed')
+
+    def test_timeline_view(self):
+        """The timeline lists the user's events, newest first, per task or paginated"""
+        self.repository.ensure_overdue_tasks_are_failed()
+        self.repository.reactivate_tasks([str(self.task.id)], self.user, timezone.now() + timedelta(days=1))
+        self.repository.delete(self.repository.create(user=self.user, title="Gone", due_date=timezone.now() + timedelta(days=1)))
+        self.client.force_login(self.user)
+        
+        response = self.client.get(reverse('tasks:task_timeline'), {'task': self.task.id})
+        self.assertEqual([event.event for event in response.context['events']], ['reactivated', 'failed'])
+        self.assertContains(response, 'History of "Tracked"')
+        self.assertNotContains(response, 'Foreign')
+        
+        first_page = self.repository.for_user(self.user).get_timeline_page(page_size=1)
+        self.assertEqual(first_page.items[0].event, 'reactivated')
+        response = self.client.get(reverse('tasks:task_timeline'), {'cursor': first_page.next_cursor})
+        self.assertEqual([event.event for event in response.context['events']], ['failed'])
+        self.assertIsNone(response.context['next_page_url'])
+        
+        response = self.client.get(reverse('tasks:task_timeline'), {'task': 'bogus'})
+        self.assertRedirects(response, reverse('tasks:task_timeline'), fetch_redirect_response=False)
+
+
+class TaskDailyStatsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='statsuser', password='testpass123')
+        self.other_user = User.objects.create_user(username='otherstatsuser', password='testpass123')
+        self.repository = TaskRepository()
+        self.scoped = self.repository.for_user(self.user)
+
+    def rollups(self):
+        fields = ('user_id', 'day', 'created_count', 'completed_count', 'failed_count', 'reactivated_count', 'backlog_change')
+        return sorted(TaskDailyStats.objects.values_list(*fields))
+
+    def exercise(self):
+        """Create, fail, reactivate and complete tasks through every write path"""
+        past, future = timezone.now() - timedelta(hours=1), timezone.now() + timedelta(days=1)
+        tasks = [self.repository.create(user=self.user, title=f"Task {i}", due_date=past) for i in range(4)]
+        self.repository.bulk_create([Task(user=self.other_user, title="Other", due_date=past)])
+        self.repository.reconcile_overdue_tasks_for_user(self.user)
+        self.repository.ensure_overdue_tasks_are_failed()
+        self.assertTrue(self.scoped.complete_task(str(tasks[0].id)))
+        self.assertTrue(self.scoped.reactivate_task(str(tasks[1].id), future))
+        self.repository.complete_tasks([str(tasks[1].id), str(tasks[2].id)], self.user)
+        tasks[1].refresh_from_db()
+        self.repository.update(tasks[1], status='active')
+        return tasks
+
+    def test_writes_maintain_rollups(self):
+        """Every write path bumps the day's counters and tracks the failed backlog"""
+        tasks = self.exercise()
+        today = timezone.localdate()
+        row = TaskDailyStats.objects.get(user=self.user, day=today)
+        self.assertEqual(
+            (row.created_count, row.completed_count, row.failed_count, row.reactivated_count),
+            (4, 3, 4, 2),
+        )
+        # Only tasks[3] is still failed
+        self.assertEqual(row.backlog_change, 1)
+        
+        self.assertTrue(self.scoped.delete_task(str(tasks[3].id)))
+        row.refresh_from_db()
+        self.assertEqual(row.backlog_change, 0)
+        self.assertEqual(TaskDailyStats.objects.get(user=self.other_user).backlog_change, 1)
+
+    def test_rollups_without_returning(self):
+        """Backends without UPDATE ... RETURNING read previous statuses with the locked rows"""
+        with mock.patch('apps.tasks.repository.supports_update_returning', return_value=False):
+            self.exercise()
+        row = TaskDailyStats.objects.get(user=self.user, day=timezone.localdate())
+        self.assertEqual((row.completed_count, row.failed_count, row.reactivated_count, row.backlog_change), (3, 4, 2, 1))
+
+    def test_rebuild_matches_incremental_rollups(self):
+        """Rebuilding from tasks and events reproduces the incremental rollups"""
+        self.exercise()
+        expected = self.rollups()
+        TaskDailyStats.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_task_stats', workers=1, stdout=out)
+        self.assertIn('Rebuilt 2 daily statistics rows for 2 users', out.getvalue())
+        self.assertEqual(self.rollups(), expected)
+        
+        with self.assertRaises(CommandError):
+            call_command('rebuild_task_stats', user=['nobody'], workers=1, stdout=StringIO())
+
+    def test_rebuild_dispatches_chunks_to_workers(self):
+        """With several workers each chunk of users is rebuilt by the process pool"""
+        self.exercise()
+        chunks = []
+        
+        class InlineExecutor:
+            def __init__(self, max_workers, initializer):
+                self.max_workers = max_workers
+            def __enter__(self):
+                return self
+            def __exit__(self, *exc_info):
+                return False
+            def map(self, function, items):
+                chunks.extend(items)
+                return map(function, items)
+        
+        with mock.patch('apps.tasks.rollups.ProcessPoolExecutor', InlineExecutor), \
+                mock.patch('apps.tasks.rollups.connections.close_all') as close_all:
+            user_count, row_count = TaskStatsRebuilder(workers=4, chunk_size=1).rebuild()
+        close_all.assert_called_once()
+        self.assertEqual(sorted(chunks), [[self.user.pk], [self.other_user.pk]])
+        self.assertEqual((user_count, row_count), (2, 2))
+
+    def test_trends_read_only_rollups(self):
+        """The trends API sums the rollups per month without touching tasks"""
+        today = timezone.localdate()
+        this_month = today.replace(day=1)
+        last_month = (this_month - timedelta(days=1)).replace(day=1)
+        older = (last_month - timedelta(days=1)).replace(day=1)
+        TaskDailyStats.objects.bulk_create([
+            TaskDailyStats(user=self.user, day=older, failed_count=2, backlog_change=2),
+            TaskDailyStats(user=self.user, day=last_month, created_count=5, completed_count=3, failed_count=1, backlog_change=1),
+            TaskDailyStats(user=self.user, day=last_month + timedelta(days=1), completed_count=1, reactivated_count=1, backlog_change=-1),
+            TaskDailyStats(user=self.other_user, day=this_month, completed_count=9),
+        ])
+        self.client.force_login(self.user)
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('tasks:api_task_trends'), {'months': 2})
+        self.assertFalse([query for query in queries if 'tasks_task"' in query['sql']])
+        self.assertEqual(response.json()['results'], [
+            {
+                'month': last_month.strftime('%Y-%m'), 'created_count': 5, 'completed_count': 4, 'failed_count': 1,
+                'reactivated_count': 1, 'completion_rate': 0.8, 'overdue_backlog': 2,
+            },
+            {
+                'month': this_month.strftime('%Y-%m'), 'created_count': 0, 'completed_count': 0, 'failed_count': 0,
+                'reactivated_count': 0, 'completion_rate': None, 'overdue_backlog': 2,
+            },
+        ])
+        
+        self.assertEqual(self.client.get(reverse('tasks:api_task_trends'), {'months': 0}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('tasks:api_task_trends'), {'months': 'x'}).status_code, 400)
+        
+        response = self.client.get(reverse('tasks:task_stats'), {'months': 3})
+        self.assertEqual(len(response.context['trends']), 3)
+        self.assertContains(response, '80%')
+
+
+class TaskSearchTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='searchuser', password='testpass123')
+        self.other_user = User.objects.create_user(username='othersearchuser', password='testpass123')
+        self.repository = TaskRepository()
+        self.scoped = self.repository.for_user(self.user)
+        due_date = timezone.now() + timedelta(days=1)
+        self.in_title = self.repository.create(user=self.user, title="Quarterly budget review", description="Spreadsheets", due_date=due_date)
+        self.in_description = self.repository.create(user=self.user, title="Call finance", description="Discuss the budget", due_date=due_date)
+        self.foreign = self.repository.create(user=self.other_user, title="Budget", due_date=due_date)
+
+    def titles(self, query):
+        return [task.title for task in self.scoped.search(query)]
+
+    def test_ranked_per_user_search(self):
+        """Title matches rank above description matches; other users' tasks never match"""
+        tasks = self.scoped.search("budget")
+        self.assertEqual([task.pk for task in tasks], [self.in_title.pk, self.in_description.pk])
+        self.assertGreater(tasks[0].search_rank, tasks[1].search_rank)
+        self.assertEqual(self.titles("BUDG rev"), ["Quarterly budget review"])
+        self.assertEqual(self.titles("budget missing"), [])
+        # Query syntax in user input is ignored, never an error
+        self.assertEqual(self.titles('"budget" OR -review* NEAR('), [])
+        self.assertEqual(self.titles("*:()"), [])
+
+    def test_index_follows_task_writes(self):
+        """Creates, updates, bulk inserts and deletes on any path keep the index in sync"""
+        self.repository.update(self.in_title, title="Annual plan")
+        self.assertEqual(self.titles("quarterly"), [])
+        self.assertEqual(self.titles("annual"), ["Annual plan"])
+        
+        # Status transitions leave the text untouched
+        self.assertTrue(self.scoped.complete_task(str(self.in_description.id)))
+        self.assertEqual(self.titles("finance"), ["Call finance"])
+        
+        self.repository.bulk_create([Task(user=self.user, title="Imported invoice", due_date=timezone.now())])
+        self.assertEqual(self.titles("invoice"), ["Imported invoice"])
+        
+        self.assertTrue(self.scoped.delete_task(str(self.in_description.id)))
+        Task.objects.filter(title="Imported invoice").delete()
+        self.assertEqual(self.titles("finance"), [])
+        self.assertEqual(self.titles("invoice"), [])
+
+    def test_rebuild_command_refills_the_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        self.assertEqual(self.titles("budget"), [])
+        out = StringIO()
+        call_command('rebuild_task_search', stdout=out)
+        self.assertIn('Indexed 3 tasks', out.getvalue())
+        self.assertEqual(len(self.titles("budget")), 2)
+        
+        self.repository.create(user=self.user, title="After rebuild", due_date=timezone.now())
+        self.assertEqual(self.titles("rebuild"), ["After rebuild"])
+
+    def test_search_endpoint(self):
+        self.client.force_login(self.user)
+        with self.assertNumQueries(4):  # session, user, index, tasks
+            response = self.client.get(reverse('tasks:api_task_search'), {'q': 'budget', 'limit': 1})
+        results = response.json()['results']
+        self.assertEqual([result['id'] for result in results], [str(self.in_title.id)])
+        self.assertIsNotNone(results[0]['rank'])
+        
+        self.assertEqual(self.client.get(reverse('tasks:api_task_search'), {'q': ' !? '}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('tasks:api_task_search'), {'q': 'budget', 'limit': 'x'}).status_code, 400)
+
+    def test_admin_search_uses_the_index(self):
+        """The admin changelist searches every user's tasks through the index, and usernames exactly"""
+        admin = User.objects.create_superuser(username='searchadmin', password='testpass123')
+        self.client.force_login(admin)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin:tasks_task_changelist'), {'q': 'budget'})
+        self.assertEqual({task.pk for task in response.context['cl'].result_list}, {self.in_title.pk, self.in_description.pk, self.foreign.pk})
+        self.assertFalse([query for query in queries if 'LIKE' in query['sql']])
+        
+        response = self.client.get(reverse('admin:tasks_task_changelist'), {'q': 'othersearchuser'})
+        self.assertEqual([task.pk for task in response.context['cl'].result_list], [self.foreign.pk])
+        
+        self.assertEqual(Task.objects.filter(TaskSearchIndex().filter_q('--')).count(), 0)
+
+
+class TaskSearchMigrationTest(TransactionTestCase):
+    """The search index covers tasks created before it was installed"""
+    before = [('tasks', '0010_task_daily_stats')]
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='legacyuser', password='testpass123')
+
+    def tearDown(self):
+        # Leave the schema at the latest migration for the following tests
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_migration_indexes_existing_tasks(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        old_apps = executor.loader.project_state(self.before).apps
+        legacy = old_apps.get_model('tasks', 'Task').objects.create(
+            user_id=self.user.pk, title='Legacy budget', due_date=timezone.now() + timedelta(days=1)
+        )
+        
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+        self.assertEqual([task_id for task_id, _ in TaskSearchIndex().search('budget', user_id=self.user.pk)], [legacy.pk])
+        self.assertEqual(Task.objects.filter(TaskSearchIndex().filter_q('legacy')).count(), 1)
+
+    def test_migrate_restores_dropped_triggers(self):
+        """A table rebuild on SQLite drops the triggers; the next migrate recreates them and reindexes"""
+        task = Task.objects.create(user=self.user, title='Rebuilt table', due_date=timezone.now() + timedelta(days=1))
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER tasks_task_fts_update")
+        Task.objects.filter(pk=task.pk).update(title='Renamed while unindexed')
+        
+        call_command('migrate', verbosity=0)
+        self.assertEqual([task_id for task_id, _ in TaskSearchIndex().search('renamed')], [task.pk])
+        Task.objects.filter(pk=task.pk).update(title='Renamed again')
+        self.assertEqual([task_id for task_id, _ in TaskSearchIndex().search('again')], [task.pk])
@@ -6,8 +6,18 @@ app_name = "tasks"
 urlpatterns = [
     path("", views.task_list, name="task_list"),
     path("create/", views.task_create, name="task_create"),
+    path("timeline/", views.task_timeline, name="task_timeline"),
+    path("stats/", views.task_stats, name="task_stats"),
     # Place specific routes before parameterized ones to avoid shadowing
     path("api/status/", views.api_task_status, name="api_task_status"),
+    path("api/tasks/", views.api_task_list, name="api_task_list"),
+    path("api/tasks/search/", views.api_task_search, name="api_task_search"),
+    path("api/events/", views.api_task_events, name="api_task_events"),
+    path("api/stats/trends/", views.api_task_trends, name="api_task_trends"),
+    path("api/tasks/bulk/<slug:action>/", views.api_task_bulk, name="api_task_bulk"),
+    path("api/tasks/import/", views.api_task_import, name="api_task_import"),
+    path("api/tasks/export/", views.api_task_export, name="api_task_export"),
+    path("api/perf/", views.api_task_perf, name="api_task_perf"),
 
     path("<str:task_id>/", views.task_detail, name="task_detail"),
     path("<str:task_id>/update/", views.task_update, name="task_update"),
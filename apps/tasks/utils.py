@@ -1,6 +1,13 @@
+import asyncio
 from django.utils import timezone
 from django import forms
-from typing import Any
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
 
 
 def validate_future_datetime(datetime_value: Any, field_name: str = "datetime") -> Any:
@@ -24,28 +31,185 @@ def validate_future_datetime(datetime_value: Any, field_name: str = "datetime")
     return datetime_value
 
 
-def get_task_statistics(user) -> dict:
+@dataclass(frozen=True)
+class TaskStatistics:
+    """Per-status task counts shared by the dashboard and the status API"""
+    active_count: int = 0
+    completed_count: int = 0
+    failed_count: int = 0
+    overdue_count: int = 0
+
+    @property
+    def total_count(self) -> int:
+        return self.active_count + self.completed_count + self.failed_count
+
+    @classmethod
+    def for_user(cls, user, repository=None) -> "TaskStatistics":
+        """Build the statistics for a user with a single aggregate query"""
+        if repository is None:
+            from .repository import TaskRepository
+            repository = TaskRepository()
+        return cls(**repository.get_status_counts_by_user(user))
+
+    @classmethod
+    async def afor_user(cls, user, repository=None) -> "TaskStatistics":
+        """Async variant of for_user"""
+        if repository is None:
+            from .repository import TaskRepository
+            repository = TaskRepository()
+        return cls(**await repository.aget_status_counts_by_user(user))
+
+    def as_dict(self) -> Dict[str, int]:
+        """Serialize the counts for JSON responses"""
+        return {**asdict(self), "total_count": self.total_count}
+
+
+def get_request_now(request) -> datetime:
+    """
+    Get the current time once per request, so every due-date computation
+    of the request (annotations, templates) agrees on the same instant.
+    """
+    if not hasattr(request, "_task_now"):
+        request._task_now = timezone.now()
+    return request._task_now
+
+
+async def aget_request_user(request):
+    """
+    Resolve the requesting user in an async view. The resolved user replaces
+    the lazy request.user, which would otherwise query the database
+    synchronously when templates or messages touch it.
+    """
+    user = await request.auser()
+    request.user = user
+    return user
+
+
+def get_task_statistics(user, cursors: Optional[Dict[str, str]] = None, now: Optional[datetime] = None) -> dict:
     """
     Get task statistics for a user
     
     Args:
         user: User instance
+        cursors: Optional page cursor for each status
+        now: Optional reference time of the tasks' due-date annotations
         
     Returns:
-        dict: Dictionary with task counts
+        dict: Dictionary with one page of tasks per status and a TaskStatistics instance
+        
+    Raises:
+        ValueError: If one of the cursors is malformed
     """
     from .repository import TaskRepository
+    from .constants import TASK_STATUS_ACTIVE, TASK_STATUS_COMPLETED, TASK_STATUS_FAILED
     repository = TaskRepository()
+    statistics = TaskStatistics.for_user(user, repository)
+    cursors = cursors or {}
     
-    active_tasks = repository.get_active_tasks_by_user(user)
-    completed_tasks = repository.get_completed_tasks_by_user(user)
-    failed_tasks = repository.get_failed_tasks_by_user(user)
+    return {
+        "active_tasks": repository.get_tasks_page_by_user(user, TASK_STATUS_ACTIVE, cursors.get(TASK_STATUS_ACTIVE), now=now),
+        "completed_tasks": repository.get_tasks_page_by_user(user, TASK_STATUS_COMPLETED, cursors.get(TASK_STATUS_COMPLETED), now=now),
+        "failed_tasks": repository.get_tasks_page_by_user(user, TASK_STATUS_FAILED, cursors.get(TASK_STATUS_FAILED), now=now),
+        "statistics": statistics,
+        "total_tasks": statistics.total_count,
+    }
+
+
+async def aget_task_statistics(user, cursors: Optional[Dict[str, str]] = None, now: Optional[datetime] = None) -> dict:
+    """
+    Async variant of get_task_statistics; the statistics and the three
+    pages are independent queries awaited concurrently
     
+    Raises:
+        ValueError: If one of the cursors is malformed
+    """
+    from .repository import TaskRepository
+    from .constants import TASK_STATUS_ACTIVE, TASK_STATUS_COMPLETED, TASK_STATUS_FAILED
+    repository = TaskRepository()
+    cursors = cursors or {}
+    
+    statistics, active_tasks, completed_tasks, failed_tasks = await asyncio.gather(
+        TaskStatistics.afor_user(user, repository),
+        repository.aget_tasks_page_by_user(user, TASK_STATUS_ACTIVE, cursors.get(TASK_STATUS_ACTIVE), now=now),
+        repository.aget_tasks_page_by_user(user, TASK_STATUS_COMPLETED, cursors.get(TASK_STATUS_COMPLETED), now=now),
+        repository.aget_tasks_page_by_user(user, TASK_STATUS_FAILED, cursors.get(TASK_STATUS_FAILED), now=now),
+    )
     return {
         "active_tasks": active_tasks,
         "completed_tasks": completed_tasks,
         "failed_tasks": failed_tasks,
-        "total_tasks": active_tasks.count() + completed_tasks.count() + failed_tasks.count(),
+        "statistics": statistics,
+        "total_tasks": statistics.total_count,
+    }
+
+
+# Cards are cached without the request's CSRF token, which is spliced in per request
+CSRF_PLACEHOLDER = mark_safe("<!-- csrf_token -->")
+
+# Time-dependent parts of each card, included in its cache key
+TASK_CARD_VARIANTS = {
+    "active": lambda task: int(0 <= task.days_until_due <= 1),
+    "completed": lambda task: "",
+    "failed": lambda task: task.overdue_days,
+}
+
+
+def render_task_cards(request, tasks, status: str, fragment_cache=None) -> List[str]:
+    """
+    Render the dashboard cards of a page of tasks, reusing cached fragments
+    keyed by task version (one cache round trip per page)
+    
+    Args:
+        request: Current request, for its CSRF token
+        tasks: Tasks of one status
+        status: Status of the tasks, selecting the card template
+        fragment_cache: Optional TaskFragmentCache
+        
+    Returns:
+        list: Safe HTML of each card
+    """
+    from .cache import TaskFragmentCache
+    fragment_cache = fragment_cache or TaskFragmentCache()
+    fragments = fragment_cache.get_or_render(status, tasks, render=_task_card_renderer(status), variant=TASK_CARD_VARIANTS[status])
+    return _insert_csrf_input(request, fragments)
+
+
+async def arender_task_cards(request, tasks, status: str, fragment_cache=None) -> List[str]:
+    """Async variant of render_task_cards"""
+    from .cache import TaskFragmentCache
+    fragment_cache = fragment_cache or TaskFragmentCache()
+    fragments = await fragment_cache.aget_or_render(status, tasks, render=_task_card_renderer(status), variant=TASK_CARD_VARIANTS[status])
+    return _insert_csrf_input(request, fragments)
+
+
+def _task_card_renderer(status: str):
+    template_name = f"tasks/partials/task_card_{status}.html"
+    return lambda task: render_to_string(template_name, {"task": task, "csrf_input": CSRF_PLACEHOLDER})
+
+
+def _insert_csrf_input(request, fragments: List[str]) -> List[str]:
+    csrf_input = format_html('<input type="hidden" name="csrfmiddlewaretoken" value="{}">', get_token(request))
+    return [mark_safe(fragment.replace(CSRF_PLACEHOLDER, csrf_input)) for fragment in fragments]
+
+
+def serialize_task(task) -> Dict[str, Any]:
+    """
+    Serialize a task for JSON responses
+    
+    Args:
+        task: Task instance
+        
+    Returns:
+        dict: JSON-serializable task fields
+    """
+    return {
+        "id": str(task.id),
+        "title": task.title,
+        "description": task.description,
+        "status": task.status,
+        "due_date": task.due_date.isoformat(),
+        "created_at": task.created_at.isoformat(),
+        "reactivation_count": task.reactivation_count,
     }
 
 
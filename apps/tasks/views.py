@@ -1,30 +1,92 @@
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
 from django.views.decorators.http import require_POST
+import json
 from .models import Task
 from .repository import TaskRepository
+from .conditional import task_condition, get_request_task_state, aget_request_task_state
+from .events import stream_status_events
+from .importers import TaskImporter, detect_format, iter_task_rows, open_text_stream
+from .exporters import EXPORT_CONTENT_TYPES, arender_export, render_export
+from .search import search_terms
+from .instrumentation import perf_stats
 from .forms import TaskForm, TaskReactivationForm
-from .utils import get_task_statistics, format_task_message
-from .constants import TASK_STATUS_ACTIVE, TASK_STATUS_FAILED, VALIDATION_MESSAGES
+from .utils import (
+    TaskStatistics,
+    aget_task_statistics,
+    aget_request_user,
+    get_request_now,
+    arender_task_cards,
+    format_task_message,
+    serialize_task,
+)
+from .constants import (
+    TASK_STATUS_ACTIVE,
+    TASK_STATUS_FAILED,
+    TASK_STATUS_LABELS,
+    TASK_API_PAGE_SIZE,
+    TASK_API_MAX_PAGE_SIZE,
+    TASK_TRENDS_MONTHS,
+    SEARCH_PAGE_SIZE,
+    SEARCH_MAX_PAGE_SIZE,
+    TASK_TRENDS_MAX_MONTHS,
+    BULK_MAX_TASK_IDS,
+    TASK_FILE_FORMATS,
+    BULK_RESULT_NOT_FOUND,
+    BULK_RESULT_INVALID_STATUS,
+    TASK_FORM_FIELDS,
+    VALIDATION_MESSAGES,
+)
+
+BULK_FAILURE_RESULTS = (BULK_RESULT_NOT_FOUND, BULK_RESULT_INVALID_STATUS)
 
 @login_required
-def task_list(request):
+@task_condition
+async def task_list(request):
     """View for listing all tasks"""
     repository = TaskRepository()
+    user = await aget_request_user(request)
     
-    # Ensure all overdue tasks are properly marked as failed
-    updated_count = repository.ensure_overdue_tasks_are_failed()
+    # Only the current user's tasks are reconciled; the sweeper handles everyone else
+    updated_count = await repository.areconcile_overdue_tasks_for_user(user, await aget_request_task_state(request))
     
     if updated_count > 0:
         messages.info(request, f'{updated_count} overdue task(s) have been marked as failed.')
 
+    # Each status section is paginated independently with its own cursor
+    cursors = {status: request.GET.get(f"{status}_cursor") for status in TASK_STATUS_LABELS}
+
     # Get task statistics using utility function
-    context = get_task_statistics(request.user)
+    try:
+        context = await aget_task_statistics(user, cursors, now=get_request_now(request))
+    except ValueError:
+        messages.error(request, VALIDATION_MESSAGES['invalid_cursor'])
+        return redirect("tasks:task_list")
+    
+    # Cards are served from the fragment cache, keyed by task version
+    context["cards"] = {
+        status: await arender_task_cards(request, context[f"{status}_tasks"], status)
+        for status in TASK_STATUS_LABELS
+    }
+    context["next_page_urls"] = {
+        status: _next_page_url(request, f"{status}_cursor", context[f"{status}_tasks"].next_cursor)
+        for status in TASK_STATUS_LABELS
+    }
 
     return render(request, "tasks/task_list.html", context)
 
+def _next_page_url(request, param: str, cursor):
+    """Build the query string of the next page of a section, keeping the other cursors"""
+    if not cursor:
+        return None
+    query = request.GET.copy()
+    query[param] = cursor
+    return f"?{query.urlencode()}"
+
 @login_required
 def task_create(request):
     """View for creating a new task"""
@@ -41,8 +103,7 @@ def task_create(request):
             
             # Check if the newly created task is overdue and update it immediately
             if task.is_overdue:
-                task.status = TASK_STATUS_FAILED
-                task.save()
+                task = repository.update(task, status=TASK_STATUS_FAILED)
                 messages.success(request, format_task_message("created", task.title, "Marked as failed - overdue"))
             else:
                 messages.success(request, format_task_message("created", task.title))
@@ -54,16 +115,16 @@ def task_create(request):
     return render(request, "tasks/task_form.html", {"form" : form, "action" : "Create"})
 
 @login_required
-def task_detail(request, task_id):
+@task_condition
+async def task_detail(request, task_id):
     """Display task details"""
     repository = TaskRepository()
+    user = await aget_request_user(request)
+    await repository.areconcile_overdue_tasks_for_user(user, await aget_request_task_state(request))
     
-    # Ensure all overdue tasks are properly marked as failed
-    repository.ensure_overdue_tasks_are_failed()
-    
-    task = repository.get_by_id(task_id)
+    task = await repository.for_user(user).aget_by_id(task_id, now=get_request_now(request))
 
-    if not task or task.user != request.user:
+    if not task:
         messages.error(request, 'Task not found.')
         return redirect("tasks:task_list")
     
@@ -80,11 +141,12 @@ def task_detail(request, task_id):
 @require_POST
 def task_complete(request, task_id):
     """Mark a task as completed"""
-    repository = TaskRepository()
-    task = repository.complete_task(task_id, request.user)
+    # Single conditional UPDATE, returning the title: no SELECT
+    repository = TaskRepository().for_user(request.user)
     
-    if task:
-        messages.success(request, format_task_message("marked as completed", task.title))
+    title = repository.complete_task(task_id)
+    if title is not None:
+        messages.success(request, format_task_message("marked as completed", title))
     else:
         messages.error(request, VALIDATION_MESSAGES['unable_to_complete'])
     
@@ -94,18 +156,13 @@ def task_complete(request, task_id):
 @require_POST
 def reactivate_task(request, task_id):
     """Reactivate a failed task"""
-    repository = TaskRepository()
+    repository = TaskRepository().for_user(request.user)
     form = TaskReactivationForm(request.POST)
 
     if form.is_valid():
-        task = repository.reactivate_task(
-            task_id, 
-            request.user, 
-            form.cleaned_data["new_due_date"]
-        )
-
-        if task:
-            messages.success(request, format_task_message("reactivated", task.title))
+        title = repository.reactivate_task(task_id, form.cleaned_data["new_due_date"])
+        if title is not None:
+            messages.success(request, format_task_message("reactivated", title))
         else:
             messages.error(request, VALIDATION_MESSAGES['unable_to_reactivate'])
     else:
@@ -116,10 +173,10 @@ def reactivate_task(request, task_id):
 @login_required
 def task_update(request, task_id):
     """Update an existing task (only active tasks)"""
-    repository = TaskRepository()
-    task = repository.get_by_id(task_id)
+    repository = TaskRepository().for_user(request.user)
+    task = repository.get_by_id(task_id, fields=TASK_FORM_FIELDS)
     
-    if not task or task.user != request.user:
+    if not task:
         messages.error(request, 'Task not found.')
         return redirect("tasks:task_list")
     
@@ -147,36 +204,239 @@ def task_update(request, task_id):
 @login_required
 def task_delete(request, task_id):
     """Delete a task (any status)"""
-    repository = TaskRepository()
-    task = repository.get_by_id(task_id)
+    repository = TaskRepository().for_user(request.user)
     
-    if task and task.user == request.user:
-        task_title = task.title
-        repository.delete(task)
-        messages.success(request, format_task_message("deleted", task_title))
+    title = repository.delete_task(task_id)
+    if title is not None:
+        messages.success(request, format_task_message("deleted", title))
     else:
         messages.error(request, VALIDATION_MESSAGES['unable_to_delete'])
     
     return redirect("tasks:task_list")
 
 @login_required
-def api_task_status(request):
+def task_timeline(request):
+    """History of the user's task status changes, optionally of one task"""
+    repository = TaskRepository().for_user(request.user)
+    task_id = request.GET.get("task")
+    
+    try:
+        page = repository.get_timeline_page(task_id, cursor=request.GET.get("cursor"))
+    except ValueError:
+        messages.error(request, VALIDATION_MESSAGES['invalid_timeline_filter'])
+        return redirect("tasks:task_timeline")
+    
+    context = {
+        "events": page,
+        "task_title": page.items[0].task_title if task_id and page else None,
+        "next_page_url": _next_page_url(request, "cursor", page.next_cursor),
+    }
+    return render(request, "tasks/task_timeline.html", context)
+
+@login_required
+def task_stats(request):
+    """Monthly completion-rate and overdue backlog trends, read from the daily rollups only"""
+    try:
+        months = _trend_months(request)
+    except ValueError:
+        messages.error(request, VALIDATION_MESSAGES['invalid_trend_months'])
+        return redirect("tasks:task_stats")
+    
+    context = {
+        "trends": TaskRepository().daily_stats.get_monthly_trends(request.user, months),
+        "months": months,
+    }
+    return render(request, "tasks/task_stats.html", context)
+
+def _trend_months(request) -> int:
+    """Number of months requested with ?months=, raising ValueError when out of range"""
+    months = int(request.GET.get("months", TASK_TRENDS_MONTHS))
+    if not 1 <= months <= TASK_TRENDS_MAX_MONTHS:
+        raise ValueError(months)
+    return months
+
+@login_required
+@task_condition
+async def api_task_status(request):
     """API endpoint for task status"""
     repository = TaskRepository()
+    user = await aget_request_user(request)
 
-    # Ensure all overdue tasks are properly marked as failed
-    updated_count = repository.ensure_overdue_tasks_are_failed()
-    
-    # Get clean counts after status update
-    active_count = repository.get_active_tasks_by_user(request.user).count()
-    completed_count = repository.get_completed_tasks_by_user(request.user).count()
-    failed_count = repository.get_failed_tasks_by_user(request.user).count()
+    # Served from the per-user status cache, checked against the state task_condition
+    # already loaded; a miss reconciles and recounts
+    counts, updated_count = await repository.aget_cached_status_counts_by_user(user, await aget_request_task_state(request))
+    statistics = TaskStatistics(**counts)
 
     return JsonResponse({
         'updated_count': updated_count,
-        'active_count': active_count,
-        'completed_count': completed_count,
-        'failed_count': failed_count,
+        **statistics.as_dict(),
     })
 
+@login_required
+def api_task_list(request):
+    """API endpoint listing the user's tasks with cursor pagination"""
+    repository = TaskRepository()
+    status = request.GET.get('status')
+    if status and status not in TASK_STATUS_LABELS:
+        return JsonResponse({'error': 'Invalid status'}, status=400)
+    
+    try:
+        page_size = min(int(request.GET.get('limit', TASK_API_PAGE_SIZE)), TASK_API_MAX_PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid limit'}, status=400)
+    if page_size < 1:
+        return JsonResponse({'error': 'Invalid limit'}, status=400)
+    
+    repository.reconcile_overdue_tasks_for_user(request.user, get_request_task_state(request))
+    
+    try:
+        page = repository.get_tasks_page_by_user(
+            request.user,
+            status=status,
+            cursor=request.GET.get('cursor'),
+            page_size=page_size,
+        )
+    except ValueError:
+        return JsonResponse({'error': VALIDATION_MESSAGES['invalid_cursor']}, status=400)
+    
+    return JsonResponse({
+        'results': [serialize_task(task) for task in page],
+        'next_cursor': page.next_cursor,
+    })
 
+@login_required
+def api_task_trends(request):
+    """API endpoint with the user's monthly task trends, read from the daily rollups only"""
+    try:
+        months = _trend_months(request)
+    except ValueError:
+        return JsonResponse({'error': VALIDATION_MESSAGES['invalid_trend_months']}, status=400)
+    
+    trends = TaskRepository().daily_stats.get_monthly_trends(request.user, months)
+    return JsonResponse({
+        'results': [{**trend, 'month': trend['month'].strftime('%Y-%m')} for trend in trends],
+    })
+
+@login_required
+def api_task_search(request):
+    """API endpoint with the user's tasks matching ?q=, ranked by relevance"""
+    query = request.GET.get('q', '')
+    if not search_terms(query):
+        return JsonResponse({'error': VALIDATION_MESSAGES['search_query_required']}, status=400)
+    
+    try:
+        limit = min(int(request.GET.get('limit', SEARCH_PAGE_SIZE)), SEARCH_MAX_PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid limit'}, status=400)
+    if limit < 1:
+        return JsonResponse({'error': 'Invalid limit'}, status=400)
+    
+    tasks = TaskRepository().for_user(request.user).search(query, limit=limit)
+    return JsonResponse({
+        'results': [{**serialize_task(task), 'rank': task.search_rank} for task in tasks],
+    })
+
+@login_required
+async def api_task_events(request):
+    """Server-Sent Events stream of the user's task status counts"""
+    # Streaming an endless response needs an ASGI server; 204 tells EventSource
+    # clients to stop reconnecting and fall back to polling api_task_status
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    
+    user = await request.auser()
+    response = StreamingHttpResponse(stream_status_events(user), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+@login_required
+@require_POST
+def api_task_bulk(request, action):
+    """API endpoint completing, reactivating or deleting many tasks in one request"""
+    if action not in ("complete", "reactivate", "delete"):
+        return JsonResponse({'error': 'Unknown action'}, status=404)
+    
+    if request.content_type == "application/json":
+        try:
+            payload = json.loads(request.body or b"{}")
+        except ValueError:
+            return JsonResponse({'error': 'Invalid JSON'}, status=400)
+        if not isinstance(payload, dict):
+            return JsonResponse({'error': VALIDATION_MESSAGES['invalid_bulk_request']}, status=400)
+        task_ids = payload.get('ids')
+    else:
+        payload = request.POST
+        task_ids = payload.getlist('ids')
+    
+    if not isinstance(task_ids, list) or not task_ids:
+        return JsonResponse({'error': VALIDATION_MESSAGES['invalid_bulk_request']}, status=400)
+    if len(task_ids) > BULK_MAX_TASK_IDS:
+        return JsonResponse({'error': VALIDATION_MESSAGES['too_many_ids']}, status=400)
+    
+    repository = TaskRepository()
+    if action == "complete":
+        results = repository.complete_tasks(task_ids, request.user)
+    elif action == "delete":
+        results = repository.delete_tasks(task_ids, request.user)
+    else:
+        form = TaskReactivationForm({'new_due_date': payload.get('new_due_date')})
+        if not form.is_valid():
+            return JsonResponse({'errors': form.errors}, status=400)
+        results = repository.reactivate_tasks(task_ids, request.user, form.cleaned_data['new_due_date'])
+    
+    return JsonResponse({
+        'results': results,
+        'updated_count': sum(1 for result in results.values() if result not in BULK_FAILURE_RESULTS),
+    })
+
+@login_required
+@require_POST
+def api_task_import(request):
+    """API endpoint importing tasks from an uploaded CSV or JSON Lines file"""
+    uploaded = request.FILES.get('file')
+    if uploaded is None:
+        return JsonResponse({'error': 'Upload a file in the "file" field'}, status=400)
+    
+    file_format = request.POST.get('format') or detect_format(uploaded.name)
+    if file_format not in TASK_FILE_FORMATS:
+        return JsonResponse({'error': 'Unsupported format'}, status=400)
+    
+    # Large uploads are spooled to disk by Django and parsed line by line
+    report = TaskImporter(request.user).run(iter_task_rows(open_text_stream(uploaded.file), file_format))
+    if report.file_error:
+        # Rows of earlier batches stay imported; `created` tells how many
+        return JsonResponse({'error': report.file_error, **report.as_dict()}, status=400)
+    return JsonResponse(report.as_dict(), status=201 if report.created else 200)
+
+@login_required
+def api_task_export(request):
+    """API endpoint streaming the user's tasks (or all tasks for staff) as CSV or JSON Lines"""
+    file_format = request.GET.get('format', 'csv')
+    if file_format not in TASK_FILE_FORMATS:
+        return JsonResponse({'error': 'Unsupported format'}, status=400)
+    
+    export_all = request.GET.get('scope') == 'all'
+    if export_all and not request.user.is_staff:
+        return JsonResponse({'error': VALIDATION_MESSAGES['task_not_owned']}, status=403)
+    
+    # Under ASGI a sync iterator would be buffered whole before the first byte
+    render = arender_export if isinstance(request, ASGIRequest) else render_export
+    response = StreamingHttpResponse(
+        render(None if export_all else request.user, file_format, include_user=export_all),
+        content_type=EXPORT_CONTENT_TYPES[file_format],
+    )
+    response["Content-Disposition"] = f'attachment; filename="tasks.{file_format}"'
+    return response
+
+@login_required
+def api_task_perf(request):
+    """API endpoint reporting the per-URL request metrics of this process (staff only)"""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Staff only'}, status=403)
+    
+    return JsonResponse({
+        'enabled': getattr(settings, 'TASKS_PERF_INSTRUMENTATION', False),
+        'window': perf_stats.window,
+        'views': perf_stats.snapshot(),
+    })
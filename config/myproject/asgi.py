@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.myproject.settings')
+# Read by database.py before the settings are loaded: no persistent connections
+os.environ.setdefault('DJANGO_ASGI', '1')
 
 application = get_asgi_application()
@@ -0,0 +1,123 @@
+"""
+Environment-driven database configuration.
+
+DJANGO_DB_ENGINE selects the profile:
+
+- ``sqlite`` (default): a single file tuned for concurrent access. WAL
+  journal mode lets readers proceed while the overdue sweeper writes,
+  ``synchronous=NORMAL`` drops the fsync per commit (safe under WAL),
+  ``busy_timeout`` waits for the write lock instead of failing, and
+  write transactions start IMMEDIATE so they never deadlock on upgrade.
+- ``postgresql``: persistent connections, or a psycopg connection pool
+  with DJANGO_DB_POOL=1 (requires ``psycopg[pool]``).
+
+Both profiles honour DJANGO_DB_CONN_MAX_AGE and DJANGO_DB_CONN_HEALTH_CHECKS.
+DJANGO_ASGI (set by asgi.py) marks processes served by an ASGI server.
+
+A read replica of the same engine is added with DJANGO_DB_REPLICA_NAME (an
+SQLite file, or a PostgreSQL database) and optionally DJANGO_DB_REPLICA_HOST,
+DJANGO_DB_REPLICA_PORT, DJANGO_DB_REPLICA_USER and DJANGO_DB_REPLICA_PASSWORD.
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+SQLITE_BUSY_TIMEOUT_MS = 5000
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+# Persistent connections only pay off under WSGI, where each worker thread
+# reuses its own connection. Under ASGI sync ORM calls run in executor
+# threads, and every thread keeps a connection open until it expires, so
+# connections are closed after each request there (or borrowed from the
+# pool with DJANGO_DB_POOL=1, which Django requires CONN_MAX_AGE=0 for).
+DEFAULT_CONN_MAX_AGE = 60
+ASGI_CONN_MAX_AGE = 0
+
+
+def _flag(env: Mapping[str, str], name: str, default: bool) -> bool:
+    value = env.get(name)
+    if value is None:
+        return default
+    return value.lower() in ("1", "true", "yes", "on")
+
+
+def sqlite_init_command(busy_timeout_ms: int = SQLITE_BUSY_TIMEOUT_MS, mmap_size: int = SQLITE_MMAP_SIZE) -> str:
+    """PRAGMAs run on every new SQLite connection"""
+    return ";".join([
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA busy_timeout={busy_timeout_ms}",
+        f"PRAGMA mmap_size={mmap_size}",
+        "PRAGMA temp_store=MEMORY",
+    ])
+
+
+def database_config(base_dir: Path, env: Optional[Mapping[str, str]] = None) -> Dict[str, Any]:
+    """
+    Build the default DATABASES entry from the environment.
+
+    Raises:
+        ValueError: If DJANGO_DB_ENGINE is not supported
+    """
+    env = os.environ if env is None else env
+    engine = env.get("DJANGO_DB_ENGINE", "sqlite")
+    default_conn_max_age = ASGI_CONN_MAX_AGE if _flag(env, "DJANGO_ASGI", False) else DEFAULT_CONN_MAX_AGE
+    conn_max_age = int(env.get("DJANGO_DB_CONN_MAX_AGE", default_conn_max_age))
+    health_checks = _flag(env, "DJANGO_DB_CONN_HEALTH_CHECKS", True)
+
+    if engine == "sqlite":
+        busy_timeout_ms = int(env.get("DJANGO_SQLITE_BUSY_TIMEOUT_MS", SQLITE_BUSY_TIMEOUT_MS))
+        return {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": env.get("DJANGO_DB_NAME", str(base_dir / "db.sqlite3")),
+            "CONN_MAX_AGE": conn_max_age,
+            "CONN_HEALTH_CHECKS": health_checks,
+            "OPTIONS": {
+                "init_command": sqlite_init_command(
+                    busy_timeout_ms,
+                    int(env.get("DJANGO_SQLITE_MMAP_SIZE", SQLITE_MMAP_SIZE)),
+                ),
+                "timeout": busy_timeout_ms / 1000,
+                "transaction_mode": "IMMEDIATE",
+            },
+        }
+
+    if engine == "postgresql":
+        options: Dict[str, Any] = {}
+        if _flag(env, "DJANGO_DB_POOL", False):
+            options["pool"] = {
+                "min_size": int(env.get("DJANGO_DB_POOL_MIN_SIZE", 2)),
+                "max_size": int(env.get("DJANGO_DB_POOL_MAX_SIZE", 10)),
+                "timeout": float(env.get("DJANGO_DB_POOL_TIMEOUT", 10)),
+            }
+            # Pooled connections are returned to the pool after every request
+            conn_max_age = ASGI_CONN_MAX_AGE
+        return {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": env.get("DJANGO_DB_NAME", "task_manager"),
+            "USER": env.get("DJANGO_DB_USER", ""),
+            "PASSWORD": env.get("DJANGO_DB_PASSWORD", ""),
+            "HOST": env.get("DJANGO_DB_HOST", ""),
+            "PORT": env.get("DJANGO_DB_PORT", ""),
+            "CONN_MAX_AGE": conn_max_age,
+            "CONN_HEALTH_CHECKS": health_checks,
+            "OPTIONS": options,
+        }
+
+    raise ValueError(f"Unsupported DJANGO_DB_ENGINE: {engine}")
+
+
+def replica_database_config(base_dir: Path, env: Optional[Mapping[str, str]] = None) -> Optional[Dict[str, Any]]:
+    """Build the read replica DATABASES entry, or None when no replica is configured"""
+    env = os.environ if env is None else env
+    if not env.get("DJANGO_DB_REPLICA_NAME") and not env.get("DJANGO_DB_REPLICA_HOST"):
+        return None
+
+    config = database_config(base_dir, env)
+    for key in ("NAME", "HOST", "PORT", "USER", "PASSWORD"):
+        value = env.get(f"DJANGO_DB_REPLICA_{key}")
+        if value:
+            config[key] = value
+    # Tests run against a single database: the replica mirrors the primary
+    config["TEST"] = {"MIRROR": "default"}
+    return config
@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from .database import database_config, replica_database_config
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
@@ -47,6 +50,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.tasks.routing.ReplicaStickinessMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -73,11 +77,33 @@ WSGI_APPLICATION = 'config.myproject.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+# SQLite in WAL mode by default; set DJANGO_DB_ENGINE=postgresql (and
+# DJANGO_DB_POOL=1 for a connection pool) in production. See database.py.
 
 DATABASES = {
+    'default': database_config(BASE_DIR),
+}
+
+# Optional read replica (DJANGO_DB_REPLICA_NAME): reads of the tasks app go
+# to it, writes to the primary. Users who changed tasks read from the primary
+# for TASKS_REPLICA_STICKY_SECONDS, which should exceed the replication lag.
+DATABASE_ROUTERS = ['apps.tasks.routing.TaskReplicaRouter']
+TASKS_REPLICA_DATABASE = None
+TASKS_REPLICA_STICKY_SECONDS = 5
+if replica := replica_database_config(BASE_DIR):
+    TASKS_REPLICA_DATABASE = 'replica'
+    DATABASES[TASKS_REPLICA_DATABASE] = replica
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Defaults to the per-process local-memory backend; point DJANGO_CACHE_BACKEND
+# and DJANGO_CACHE_LOCATION at a shared backend (e.g. Redis) in production.
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': os.environ.get('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', 'task-manager'),
     }
 }
 
@@ -128,4 +154,29 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Auth settings
 LOGIN_REDIRECT_URL = "/"
 LOGOUT_REDIRECT_URL = "/accounts/login/"
-LOGIN_URL = "/accounts/login/"
\ No newline at end of file
+LOGIN_URL = "/accounts/login/"
+# Overdue task sweeper (python manage.py update_overdue_tasks --loop)
+TASKS_OVERDUE_SWEEP_INTERVAL = 60
+TASKS_OVERDUE_SWEEP_BATCH_SIZE = 500
+# Event-driven due-date scheduler (python manage.py update_overdue_tasks --schedule):
+# seconds between checks for users whose next due date changed
+TASKS_DUE_SCHEDULER_POLL_INTERVAL = 5
+
+# Per-user task status cache (see apps/tasks/cache.py)
+TASKS_CACHE_ALIAS = 'default'
+TASKS_STATUS_CACHE_TIMEOUT = 300
+# Rendered dashboard cards, keyed by task version (stale entries are never read)
+TASKS_FRAGMENT_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Server-Sent Events status stream (/tasks/api/events/, requires an ASGI server)
+TASKS_EVENTS_HEARTBEAT = 15
+TASKS_EVENTS_MAX_STREAM = 300
+
+# Opt-in request instrumentation: query count, SQL, view and template time per URL
+# name, reported at /tasks/api/perf/ (staff only) and by `manage.py task_perf_report`
+TASKS_PERF_INSTRUMENTATION = os.environ.get('DJANGO_TASKS_PERF', '') == '1'
+TASKS_PERF_WINDOW = 500
+if TASKS_PERF_INSTRUMENTATION:
+    # Last, so the measured view time covers only the view
+    MIDDLEWARE.append('apps.tasks.instrumentation.TaskPerfMiddleware')
+    TEMPLATES[0]['BACKEND'] = 'apps.tasks.instrumentation.InstrumentedDjangoTemplates'
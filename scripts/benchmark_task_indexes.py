@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Benchmark script for the Task indexes
+Seeds a throwaway SQLite database with a large number of tasks, then prints
+the query plans and timings of the list, statistics and overdue sweep queries.
+
+Usage:
+    python scripts/benchmark_task_indexes.py --tasks 1000000 --users 1000
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.myproject.settings")
+
+INDEX_MARKERS = ("USING INDEX", "USING COVERING INDEX", "Index Scan", "Index Only Scan", "Bitmap Index Scan")
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Benchmark the Task access-pattern indexes")
+    parser.add_argument("--tasks", type=int, default=1_000_000, help="Number of tasks to seed")
+    parser.add_argument("--users", type=int, default=1_000, help="Number of users owning the tasks")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="Rows per bulk_create batch")
+    parser.add_argument("--database", default=None, help="SQLite file to use (default: a temporary file)")
+    parser.add_argument("--keep", action="store_true", help="Keep the temporary database directory after the run")
+    return parser.parse_args()
+
+
+def setup_django(database_path):
+    """Point the default database at the benchmark file and set up Django"""
+    from django.conf import settings
+    settings.DATABASES["default"]["NAME"] = database_path
+
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+    call_command("migrate", verbosity=0)
+
+
+def seed(task_count, user_count, batch_size):
+    """Seed users and tasks with a realistic status and due-date mix"""
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from django.utils import timezone
+    from apps.tasks.models import Task
+    from apps.tasks.constants import TASK_STATUS_ACTIVE, TASK_STATUS_COMPLETED, TASK_STATUS_FAILED
+
+    User.objects.bulk_create(
+        [User(username=f"bench{i}", password="!") for i in range(user_count)],
+        batch_size=batch_size,
+    )
+    user_ids = list(User.objects.values_list("id", flat=True))
+
+    now = timezone.now()
+    statuses = [TASK_STATUS_ACTIVE] * 5 + [TASK_STATUS_COMPLETED] * 3 + [TASK_STATUS_FAILED] * 2
+    created = 0
+    while created < task_count:
+        size = min(batch_size, task_count - created)
+        Task.objects.bulk_create([
+            Task(
+                id=uuid.uuid4(),
+                user_id=random.choice(user_ids),
+                title=f"Task {created + i}",
+                description="Benchmark task",
+                # Roughly 2% of active tasks are overdue at benchmark time
+                due_date=now + timedelta(minutes=random.randint(-600, 30_000)),
+                status=random.choice(statuses),
+            )
+            for i in range(size)
+        ])
+        created += size
+        print(f"🔄 Seeded {created}/{task_count} tasks", end="\r", flush=True)
+    print()
+
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    return user_ids
+
+
+def benchmark(name, queryset, runs=5):
+    """Print the plan of a queryset and its average execution time"""
+    plan = queryset.explain()
+    uses_index = any(marker in plan for marker in INDEX_MARKERS)
+
+    started = time.perf_counter()
+    for _ in range(runs):
+        list(queryset)
+    elapsed_ms = (time.perf_counter() - started) / runs * 1000
+
+    print(f"\n{'✅' if uses_index else '❌'} {name}: {elapsed_ms:.2f} ms")
+    for line in plan.splitlines():
+        print(f"    {line}")
+    return uses_index
+
+
+def run_benchmarks(args, database_path):
+    """Seed the database and benchmark each query; returns whether each one uses an index"""
+    setup_django(database_path)
+
+    from django.db.models import Count, Q
+    from django.utils import timezone
+    from apps.tasks.repository import TaskRepository
+    from apps.tasks.constants import TASK_STATUS_ACTIVE, TASK_STATUS_COMPLETED, TASK_STATUS_FAILED
+
+    started = time.perf_counter()
+    user_ids = seed(args.tasks, args.users, args.batch_size)
+    print(f"✅ Seeded {args.tasks} tasks for {args.users} users in {time.perf_counter() - started:.1f}s")
+
+    repository = TaskRepository()
+    user_id = random.choice(user_ids)
+    now = timezone.now()
+
+    # Mirrors TaskRepository.get_status_counts_by_user, which returns a dict and cannot be explained
+    stats_queryset = repository.filter(user_id=user_id).values("user_id").annotate(
+        active_count=Count("id", filter=Q(status=TASK_STATUS_ACTIVE)),
+        completed_count=Count("id", filter=Q(status=TASK_STATUS_COMPLETED)),
+        failed_count=Count("id", filter=Q(status=TASK_STATUS_FAILED)),
+        overdue_count=Count("id", filter=Q(due_date__lt=now)),
+    )
+    # The rows one chunk of TaskRepository.fail_overdue_tasks_in_batches updates
+    sweep_queryset = repository.get_overdue_sweep_chunk(500, now=now).order_by().values_list("id", flat=True)
+
+    return [
+        benchmark("Task list (active tasks of a user)", repository.filter(user_id=user_id, status=TASK_STATUS_ACTIVE)),
+        benchmark("Task statistics (per-status counts of a user)", stats_queryset),
+        benchmark("Overdue sweep chunk (all users)", sweep_queryset),
+        benchmark("Per-user overdue reconciliation", repository.filter(
+            user_id=user_id, status=TASK_STATUS_ACTIVE, due_date__lt=now
+        )),
+    ]
+
+
+def main():
+    """Main benchmark function"""
+    args = parse_args()
+    # SQLite in WAL mode leaves -wal/-shm files beside the database, so the
+    # whole temporary directory is removed, even when the run fails
+    temp_dir = None if args.database else tempfile.mkdtemp(prefix="task_benchmark_")
+    database_path = args.database or os.path.join(temp_dir, "benchmark.sqlite3")
+
+    print("🚀 Task Index Benchmark")
+    print("=" * 40)
+    print(f"📦 Database: {database_path}")
+    try:
+        results = run_benchmarks(args, database_path)
+    finally:
+        if temp_dir and not args.keep:
+            from django.db import connections
+            connections.close_all()
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    print("\n" + "=" * 40)
+    if all(results):
+        print("🎉 All benchmarked queries use index scans")
+    else:
+        print("❌ Some queries fall back to full table scans")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Load driver for the task views
+Replays a mixed workload (list, detail, status polling, create, complete)
+as the seeded users and reports throughput and p50/p95/p99 latency.
+
+Requests run in-process through Django's test client against the configured
+database, or over HTTP against a running server with --base-url. A generated
+workload can be saved with --record and replayed later with --replay (the
+recorded paths contain task ids, so replay against the same database).
+
+Usage:
+    python manage.py seed_tasks --users 10 --tasks-per-user 1000 --seed 1
+    python scripts/load_test.py --requests 2000 --concurrency 4
+    python scripts/load_test.py --base-url http://127.0.0.1:8000 --record workload.jsonl
+    python scripts/load_test.py --replay workload.jsonl
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from http.cookiejar import CookieJar
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.myproject.settings")
+
+DEFAULT_MIX = "list=40,detail=20,status=30,create=5,complete=5"
+ACTIONS = ("list", "detail", "status", "create", "complete")
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Replay a mixed workload against the task views")
+    parser.add_argument("--base-url", default=None, help="Server to load over HTTP (default: in-process test client)")
+    parser.add_argument("--prefix", default="seed", help="Username prefix of the seeded users")
+    parser.add_argument("--users", type=int, default=10, help="Number of seeded users to log in as")
+    parser.add_argument("--password", default="loadtest123", help="Password of the seeded users (HTTP mode)")
+    parser.add_argument("--requests", type=int, default=1000, help="Number of requests to generate")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Relative weight of each action")
+    parser.add_argument("--concurrency", type=int, default=1, help="Worker threads")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed of the generated workload")
+    parser.add_argument("--record", default=None, help="Save the generated workload as JSON Lines")
+    parser.add_argument("--replay", default=None, help="Replay a workload saved with --record")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    return parser.parse_args()
+
+
+def setup_django():
+    """Set up Django so the test client accepts its default host"""
+    from django.conf import settings
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+
+    import django
+    django.setup()
+
+
+class InProcessTransport:
+    """Send requests through Django's test client, one client per user and thread"""
+
+    def __init__(self):
+        self.local = threading.local()
+
+    def client(self, username):
+        from django.contrib.auth.models import User
+        from django.test import Client
+
+        clients = self.local.__dict__.setdefault("clients", {})
+        if username not in clients:
+            client = Client()
+            client.force_login(User.objects.get(username=username))
+            clients[username] = client
+        return clients[username]
+
+    def request(self, username, method, path, data=None):
+        """Return the status code and body of a request"""
+        client = self.client(username)
+        response = client.post(path, data or {}) if method == "POST" else client.get(path, data or {})
+        return response.status_code, response.content
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Report redirects instead of following them, so one request is timed"""
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpTransport:
+    """Send requests to a running server, keeping a logged-in session per user"""
+
+    def __init__(self, base_url, password):
+        self.base_url = base_url.rstrip("/")
+        self.password = password
+        self.sessions = {}
+        self.lock = threading.Lock()
+
+    def session(self, username):
+        with self.lock:
+            if username not in self.sessions:
+                jar = CookieJar()
+                opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar), _NoRedirect)
+                self.sessions[username] = (opener, jar)
+                self._send(opener, jar, "GET", "/accounts/login/")
+                status, _ = self._send(opener, jar, "POST", "/accounts/login/", {
+                    "username": username, "password": self.password,
+                })
+                if status != 302:
+                    raise SystemExit(f"❌ Login failed for {username}")
+            return self.sessions[username]
+
+    def _send(self, opener, jar, method, path, data=None):
+        url = f"{self.base_url}{path}"
+        body = None
+        headers = {}
+        if method == "POST":
+            csrf_token = next((cookie.value for cookie in jar if cookie.name == "csrftoken"), "")
+            body = urllib.parse.urlencode({**(data or {}), "csrfmiddlewaretoken": csrf_token}).encode()
+            headers = {"X-CSRFToken": csrf_token, "Referer": url}
+        elif data:
+            url = f"{url}?{urllib.parse.urlencode(data)}"
+        request = urllib.request.Request(url, data=body, headers=headers, method=method)
+        try:
+            with opener.open(request) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as exc:
+            return exc.code, exc.read()
+
+    def request(self, username, method, path, data=None):
+        """Return the status code and body of a request"""
+        opener, jar = self.session(username)
+        return self._send(opener, jar, method, path, data)
+
+
+def generate_workload(transport, usernames, count, mix, rng):
+    """Build a list of requests following the action mix"""
+    from django.urls import reverse
+
+    weights = {action: 0.0 for action in ACTIONS}
+    for item in mix.split(","):
+        action, _, weight = item.partition("=")
+        if action not in weights:
+            raise SystemExit(f"❌ Unknown action in --mix: {action}")
+        weights[action] = float(weight)
+
+    # Ids of each user's active tasks, for detail and complete requests
+    task_ids = {}
+    for username in usernames:
+        _, body = transport.request(username, "GET", reverse("tasks:api_task_list"), {"status": "active", "limit": 200})
+        task_ids[username] = [task["id"] for task in json.loads(body)["results"]]
+
+    workload = []
+    for i in range(count):
+        username = rng.choice(usernames)
+        action = rng.choices(list(weights), list(weights.values()))[0]
+        if action in ("detail", "complete") and not task_ids[username]:
+            action = "list"
+
+        if action == "list":
+            entry = {"method": "GET", "path": reverse("tasks:task_list")}
+        elif action == "status":
+            entry = {"method": "GET", "path": reverse("tasks:api_task_status")}
+        elif action == "detail":
+            entry = {"method": "GET", "path": reverse("tasks:task_detail", args=[rng.choice(task_ids[username])])}
+        elif action == "complete":
+            task_id = task_ids[username].pop(rng.randrange(len(task_ids[username])))
+            entry = {"method": "POST", "path": reverse("tasks:task_complete", args=[task_id])}
+        else:
+            due_date = datetime.now() + timedelta(days=rng.randint(1, 30))
+            entry = {"method": "POST", "path": reverse("tasks:task_create"), "data": {
+                "title": f"Load test task {i}",
+                "description": "",
+                "due_date": due_date.strftime("%Y-%m-%dT%H:%M"),
+            }}
+        workload.append({"user": username, "action": action, **entry})
+    return workload
+
+
+def run(transport, workload, concurrency):
+    """Send every request and collect (action, status, seconds) samples"""
+    def send(entry):
+        started = time.perf_counter()
+        status, _ = transport.request(entry["user"], entry["method"], entry["path"], entry.get("data"))
+        return entry.get("action", entry["path"]), status, time.perf_counter() - started
+
+    from django.urls import reverse
+
+    # Log every user in before the clock starts
+    for username in {entry["user"] for entry in workload}:
+        transport.request(username, "GET", reverse("tasks:api_task_status"))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        samples = list(executor.map(send, workload))
+    return samples, time.perf_counter() - started
+
+
+def build_report(samples, elapsed):
+    """Throughput and latency percentiles, overall and per action"""
+    from apps.tasks.instrumentation import percentile
+
+    groups = defaultdict(list)
+    errors = defaultdict(int)
+    for action, status, seconds in samples:
+        groups[action].append(seconds)
+        groups["all"].append(seconds)
+        if status >= 400:
+            errors[action] += 1
+            errors["all"] += 1
+
+    report = {"elapsed": round(elapsed, 3), "throughput": round(len(samples) / elapsed, 1) if elapsed else 0, "actions": {}}
+    for action, latencies in sorted(groups.items()):
+        latencies.sort()
+        report["actions"][action] = {
+            "requests": len(latencies),
+            "errors": errors[action],
+            **{f"p{pct}_ms": round(percentile(latencies, pct) * 1000, 2) for pct in (50, 95, 99)},
+        }
+    return report
+
+
+def main():
+    """Main load test function"""
+    args = parse_args()
+    setup_django()
+
+    transport = HttpTransport(args.base_url, args.password) if args.base_url else InProcessTransport()
+    if args.replay:
+        with open(args.replay, encoding="utf-8") as replay_file:
+            workload = [json.loads(line) for line in replay_file if line.strip()]
+    else:
+        usernames = [f"{args.prefix}{i}" for i in range(args.users)]
+        workload = generate_workload(transport, usernames, args.requests, args.mix, random.Random(args.seed))
+
+    if args.record:
+        with open(args.record, "w", encoding="utf-8") as record_file:
+            for entry in workload:
+                record_file.write(json.dumps(entry) + "\n")
+
+    samples, elapsed = run(transport, workload, args.concurrency)
+    report = build_report(samples, elapsed)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print("🚀 Task Load Test")
+    print("=" * 40)
+    print(f"📦 {len(samples)} requests in {report['elapsed']}s ({report['throughput']} req/s)")
+    print(f"\n{'action':<10} {'reqs':>6} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for action, entry in report["actions"].items():
+        print(
+            f"{action:<10} {entry['requests']:>6} {entry['errors']:>6} "
+            f"{entry['p50_ms']:>9} {entry['p95_ms']:>9} {entry['p99_ms']:>9}"
+        )
+    if report["actions"].get("all", {}).get("errors"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -48,6 +48,28 @@ function showMessage(message, type = 'info') {
     }, 5000);
 }
 
+// Update the statistics cards with the latest counts
+function updateStatusCards(counts) {
+    const totalElement = document.querySelector('.card.bg-primary h3');
+    const activeElement = document.querySelector('.card.bg-success h3');
+    const completedElement = document.querySelector('.card.bg-info h3');
+    const failedElement = document.querySelector('.card.bg-danger h3');
+    
+    if (totalElement) {
+        const total = counts.active_count + counts.completed_count + counts.failed_count;
+        totalElement.textContent = total;
+    }
+    if (activeElement) {
+        activeElement.textContent = counts.active_count;
+    }
+    if (completedElement) {
+        completedElement.textContent = counts.completed_count;
+    }
+    if (failedElement) {
+        failedElement.textContent = counts.failed_count;
+    }
+}
+
 // Auto-update task status every 30 seconds
 function autoUpdateTaskStatus() {
     setInterval(function() {
@@ -60,24 +82,7 @@ function autoUpdateTaskStatus() {
         .then(response => response.json())
         .then(data => {
             // Update the statistics cards
-            const totalElement = document.querySelector('.card.bg-primary h3');
-            const activeElement = document.querySelector('.card.bg-success h3');
-            const completedElement = document.querySelector('.card.bg-info h3');
-            const failedElement = document.querySelector('.card.bg-danger h3');
-            
-            if (totalElement) {
-                const total = data.active_count + data.completed_count + data.failed_count;
-                totalElement.textContent = total;
-            }
-            if (activeElement) {
-                activeElement.textContent = data.active_count;
-            }
-            if (completedElement) {
-                completedElement.textContent = data.completed_count;
-            }
-            if (failedElement) {
-                failedElement.textContent = data.failed_count;
-            }
+            updateStatusCards(data);
             
             // If any tasks were updated, reload the page to show the changes
             if (data.updated_count > 0) {
@@ -92,6 +97,38 @@ function autoUpdateTaskStatus() {
     }, 30000); // Check every 30 seconds
 }
 
+// Receive task status changes pushed by the server, falling back to polling
+function subscribeTaskStatus() {
+    if (!window.EventSource) {
+        autoUpdateTaskStatus();
+        return;
+    }
+    
+    const counts = {};
+    let initialized = false;
+    const source = new EventSource('/tasks/api/events/');
+    
+    source.addEventListener('status', function(event) {
+        const delta = JSON.parse(event.data);
+        const tasksFailed = initialized && delta.failed_count > counts.failed_count;
+        Object.assign(counts, delta);
+        updateStatusCards(counts);
+        
+        // Reload when tasks moved to failed so the lists reflect it
+        if (delta.updated_count > 0 || tasksFailed) {
+            window.location.reload();
+        }
+        initialized = true;
+    });
+    
+    source.onerror = function() {
+        // A closed stream (e.g. no ASGI server) will not reconnect: poll instead
+        if (source.readyState === EventSource.CLOSED) {
+            autoUpdateTaskStatus();
+        }
+    };
+}
+
 
 
 
@@ -100,6 +137,6 @@ function autoUpdateTaskStatus() {
 document.addEventListener('DOMContentLoaded', function() {
     // Check if we're on the task list page
     if (window.location.pathname.includes('/tasks/') && !window.location.pathname.includes('/create') && !window.location.pathname.includes('/update')) {
-        autoUpdateTaskStatus();
+        subscribeTaskStatus();
     }
 });